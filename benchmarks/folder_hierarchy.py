@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Breadcrumb and subtree lookups on a deep folder chain and a wide tree, folder_closure vs. the recursive CTE
+used before. Needs the configured PostgreSQL database with migrations applied; folders are created in a
+transaction which is rolled back at the end.
+
+Run from repository root: python -m benchmarks.folder_hierarchy [depth] [wide_folders]
+"""
+import sys
+import time
+import timeit
+
+from sqlalchemy import select, literal, func
+from sqlalchemy.orm import aliased
+
+from database import DBSession
+from dbe.folder import Folder, ROOT_FOLDER_ID
+from dbe.folder_closure import subtree_ids
+from domain.folder_type import FolderType
+from service import file_service
+
+REPEAT = 5
+DEFAULT_DEPTH = 10000
+DEFAULT_WIDE = 10000
+WIDE_FANOUT = 10
+
+
+def _cte_breadcrumb(session, folder_id):
+    ancestors = (select(Folder.id, Folder.parent_id, literal(0).label("depth"))
+                 .where(Folder.id == folder_id)
+                 .cte(name="ancestors", recursive=True))
+    parent = aliased(Folder)
+    ancestors = ancestors.union_all(
+        select(parent.id, parent.parent_id, ancestors.c.depth + 1).join(parent, parent.id == ancestors.c.parent_id))
+    return session.scalars(select(Folder).join(ancestors, ancestors.c.id == Folder.id)
+                           .order_by(ancestors.c.depth.desc())).all()
+
+def _cte_subtree_count(session, folder_id):
+    subtree = select(Folder.id).where(Folder.id == folder_id).cte(name="subtree", recursive=True)
+    child = aliased(Folder)
+    subtree = subtree.union_all(select(child.id).join(subtree, child.parent_id == subtree.c.id))
+    return session.scalar(select(func.count()).select_from(subtree))
+
+def _closure_subtree_count(session, folder_id):
+    return session.scalar(select(func.count()).select_from(subtree_ids(folder_id).subquery()))
+
+def _per_call_ms(statement) -> float:
+    return min(timeit.repeat(statement, number=1, repeat=REPEAT)) * 1e3
+
+def _build_chain(session, depth: int):
+    start = time.perf_counter()
+    parent_id = ROOT_FOLDER_ID
+    top_id = None
+    for i in range(depth):
+        parent_id = file_service.create_folder(session, f"chain-{i}", parent_id, FolderType.COLLECTION).id
+        top_id = top_id or parent_id
+    print(f"  built {depth} deep chain in {time.perf_counter() - start:.1f} s")
+    return top_id, parent_id
+
+def _build_wide(session, count: int):
+    start = time.perf_counter()
+    top_id = file_service.create_folder(session, "wide", ROOT_FOLDER_ID, FolderType.COLLECTION).id
+    level = [top_id]
+    created = 1
+    leaf_id = top_id
+    while created < count:
+        next_level = []
+        for parent_id in level:
+            for i in range(WIDE_FANOUT):
+                if created >= count:
+                    break
+                leaf_id = file_service.create_folder(session, f"wide-{created}", parent_id, FolderType.COLLECTION).id
+                next_level.append(leaf_id)
+                created += 1
+        level = next_level
+    print(f"  built {count} folder tree (fan-out {WIDE_FANOUT}) in {time.perf_counter() - start:.1f} s")
+    return top_id, leaf_id
+
+def _measure(session, label: str, top_id, leaf_id):
+    session.flush()
+    session.connection().exec_driver_sql("ANALYZE folder, folder_closure")
+    print(f"{label}")
+    print(f"  breadcrumb of leaf    closure {_per_call_ms(lambda: file_service.get_breadcrumb(session, leaf_id)):9.2f} ms"
+          f"   recursive CTE {_per_call_ms(lambda: _cte_breadcrumb(session, leaf_id)):9.2f} ms")
+    print(f"  subtree of top        closure {_per_call_ms(lambda: _closure_subtree_count(session, top_id)):9.2f} ms"
+          f"   recursive CTE {_per_call_ms(lambda: _cte_subtree_count(session, top_id)):9.2f} ms")
+
+
+def main():
+    depth = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_DEPTH
+    wide = int(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_WIDE
+    session = DBSession()
+    try:
+        print("deep chain")
+        top_id, leaf_id = _build_chain(session, depth)
+        _measure(session, f"{depth} deep chain", top_id, leaf_id)
+        print("wide tree")
+        top_id, leaf_id = _build_wide(session, wide)
+        _measure(session, f"{wide} folder tree", top_id, leaf_id)
+    finally:
+        session.rollback()
+        session.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Parse + transform time of exiftool JSON per photo (_parse_metadata_index) and JSONB bind serialization,
+stdlib json vs. orjson. Uses tests/data/photo_metadata.json and a larger synthetic document with
+MakerNotes-sized groups, closer to real camera output.
+
+Run from repository root: python -m benchmarks.json_parse
+"""
+import json
+import timeit
+from pathlib import Path
+
+from indexing.metadata_indexing_service import _parse_metadata_index
+from service import json_service
+from root import ROOT_DIR
+
+REPEAT = 5
+
+
+def _synthetic_document(base: str) -> str:
+    document = json.loads(base)
+    photo = document[0]
+    for group in ("MakerNotes:Nikon", "MakerNotes:NikonCustom", "XMP:XMP-crs", "Composite"):
+        photo[group] = {f"Tag{i}": (f"value {i}" if i % 3 else i * 1.5) for i in range(300)}
+    photo["EXIF:IFD1"] = {"ThumbnailImage": "(Binary data 11240 bytes, use -b option to extract)"}
+    return json.dumps(document)
+
+
+def _per_call_us(statement, number: int) -> float:
+    return min(timeit.repeat(statement, number=number, repeat=REPEAT)) / number * 1e6
+
+
+def _measure(label: str, document: str, number: int):
+    parsed = _parse_metadata_index(document)
+    backends = {"json": None, "orjson": json_service.orjson}
+    if backends["orjson"] is None:
+        print("orjson is not installed - only stdlib json is measured")
+        del backends["orjson"]
+
+    print(f"{label} ({len(document)} bytes)")
+    for name, module in backends.items():
+        original = json_service.orjson
+        json_service.orjson = module
+        try:
+            parse_us = _per_call_us(lambda: _parse_metadata_index(document), number)
+            bind_us = _per_call_us(lambda: json_service.dumps(parsed), number)
+            stored = json_service.dumps(parsed)
+            result_us = _per_call_us(lambda: json_service.loads(stored), number)
+        finally:
+            json_service.orjson = original
+        print(f"  {name:<8} parse+transform {parse_us:9.1f} us   bind {bind_us:9.1f} us   result {result_us:9.1f} us")
+
+
+def main():
+    base = (Path(ROOT_DIR) / "tests" / "data" / "photo_metadata.json").read_text(encoding="utf-8")
+    _measure("tests/data/photo_metadata.json", base, 20000)
+    _measure("synthetic camera JPEG", _synthetic_document(base), 500)
+
+
+if __name__ == "__main__":
+    main()
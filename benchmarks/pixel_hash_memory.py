@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Peak RSS of pixel hashing - whole-image decode (previous implementation) vs. strip-wise hashing.
+Each measurement runs in a fresh process, the reported value is the growth of peak RSS (VmHWM)
+over the process baseline. Linux only - the peak is reset through /proc/self/clear_refs.
+
+Run from repository root: python -m benchmarks.pixel_hash_memory
+"""
+import hashlib
+import multiprocessing
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from PIL import Image, ImageOps
+
+
+def legacy_pixel_sha256(path: str) -> str:
+    with Image.open(path) as img:
+        img = ImageOps.exif_transpose(img)
+        img = img.convert("RGB")
+        h = hashlib.sha256()
+        h.update(img.tobytes())
+        return h.hexdigest()
+
+
+def _read_status_kb(field: str) -> int:
+    with open("/proc/self/status") as status:
+        for line in status:
+            if line.startswith(field + ":"):
+                return int(line.split()[1])
+    raise RuntimeError(f"{field} not found in /proc/self/status")
+
+
+def _measure(method: str, path: str, queue):
+    from service.image_service import compute_pixel_sha256
+    hash_fn = legacy_pixel_sha256 if method == "legacy" else compute_pixel_sha256
+    # Peak RSS is inherited from the parent - reset it to current RSS
+    with open("/proc/self/clear_refs", "w") as clear_refs:
+        clear_refs.write("5")
+    baseline = _read_status_kb("VmHWM")
+    start = time.perf_counter()
+    digest = hash_fn(path)
+    elapsed = time.perf_counter() - start
+    peak = _read_status_kb("VmHWM")
+    queue.put((digest, (peak - baseline) / 1024, elapsed))
+
+
+def measure(method: str, path: str):
+    ctx = multiprocessing.get_context("spawn")
+    queue = ctx.Queue()
+    process = ctx.Process(target=_measure, args=(method, path, queue))
+    process.start()
+    result = queue.get()
+    process.join()
+    return result
+
+
+def generate_images(target: Path) -> dict:
+    images = {}
+    gradient = Image.linear_gradient("L")
+
+    rgb = Image.merge("RGB", (gradient, gradient.rotate(90), gradient.rotate(180))).resize((8000, 6000))
+    exif = Image.Exif()
+    exif[0x0112] = 6  # rotated 90 CW
+    images["48MP JPEG, Orientation=6"] = target / "rgb_48mp.jpg"
+    rgb.save(images["48MP JPEG, Orientation=6"], quality=90, exif=exif)
+
+    deep = gradient.resize((6000, 4000)).convert("I").point(lambda v: v * 257).convert("I;16")
+    images["24MP 16-bit TIFF"] = target / "gray_24mp_16bit.tif"
+    deep.save(images["24MP 16-bit TIFF"])
+    return images
+
+
+def main():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        images = generate_images(Path(temp_dir))
+        print(f"{'image':<28}{'method':<10}{'peak RSS growth':>18}{'time':>10}")
+        for label, path in images.items():
+            digests = set()
+            for method in ("legacy", "streamed"):
+                digest, rss_mb, elapsed = measure(method, str(path))
+                digests.add(digest)
+                print(f"{label:<28}{method:<10}{rss_mb:>15.1f} MB{elapsed:>9.2f}s")
+            print(f"{'':<28}{'digests match' if len(digests) == 1 else 'DIGEST MISMATCH'}")
+            os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
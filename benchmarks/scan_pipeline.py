@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Scan throughput on a synthetic collection (see benchmarks.synthetic_collection). RunScanAndIndexingTask runs
+in this process against a throwaway PostgreSQL database - it must be empty, migrations and exiftool tables
+are created by the benchmark. Reports files/s, time per scan stage, DB time and query count and peak RSS
+as JSON, so results of different commits can be compared.
+
+Stages are inclusive: DB time of pixel hash cache lookups is counted in both "hash" and "db".
+
+Run from repository root:
+python -m benchmarks.scan_pipeline <db_connection_string> [--folders 20] [--images 200] [--seed 1]
+                                   [--output result.json] [--keep-files]
+"""
+import argparse
+import functools
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict
+
+from benchmarks.synthetic_collection import generate_collection, DEFAULT_FOLDERS, DEFAULT_IMAGES, DEFAULT_SEED
+
+# vial.config.app_configuration.CONFIG_PATH_ENV - importing vial here would load the default config.json
+CONFIG_PATH_ENV = "VIAL_CONFIG_PATH"
+
+
+class StageTimer:
+
+    def __init__(self):
+        self.stages: Dict[str, Dict] = dict()
+
+    def wrap(self, owner, attribute: str, stage: str):
+        """Replaces owner.attribute (module function or method) with timed version."""
+        original = getattr(owner, attribute)
+        stats = self.stages.setdefault(stage, {"seconds": 0.0, "calls": 0})
+        depth = [0] # recursive calls (walk) are timed once
+
+        @functools.wraps(original)
+        def timed(*args, **kwargs):
+            depth[0] += 1
+            start = time.perf_counter()
+            try:
+                return original(*args, **kwargs)
+            finally:
+                depth[0] -= 1
+                if depth[0] == 0:
+                    stats["seconds"] += time.perf_counter() - start
+                    stats["calls"] += 1
+
+        setattr(owner, attribute, timed)
+
+
+class QueryCounter:
+
+    def __init__(self):
+        self.seconds = 0.0
+        self.queries = 0
+
+    def install(self, engine):
+        from sqlalchemy import event
+
+        @event.listens_for(engine, "before_cursor_execute")
+        def before(conn, cursor, statement, parameters, context, executemany):
+            conn.info["benchmark_query_start"] = time.perf_counter()
+
+        @event.listens_for(engine, "after_cursor_execute")
+        def after(conn, cursor, statement, parameters, context, executemany):
+            self.seconds += time.perf_counter() - conn.info.pop("benchmark_query_start")
+            self.queries += 1
+
+
+def _write_config(work_dir: Path, db_connection_string: str) -> Path:
+    config_path = work_dir / "config.json"
+    (work_dir / "generated").mkdir()
+    with open(config_path, "w") as config_file:
+        json.dump({"db_connection_string": db_connection_string,
+                   "collection_path": str(work_dir / "collection"),
+                   "generated_path": str(work_dir / "generated")}, config_file)
+    return config_path
+
+def _generate(work_dir: Path, args) -> Dict:
+    # Separate process, so image generation doesn't count in peak RSS of the scan
+    ctx = multiprocessing.get_context("spawn")
+    with ctx.Pool(1) as pool:
+        return pool.apply(generate_collection, (work_dir / "collection", args.folders, args.images, args.seed))
+
+def _prepare_database():
+    from sqlalchemy import inspect
+    from database import engine, DBSession
+    from exiftool import exif_service
+    from service.migration_runner import MigrationRunner
+
+    if inspect(engine).has_table("photo"):
+        raise RuntimeError("Database is not empty, the benchmark needs a throwaway database")
+    if not MigrationRunner().migrate():
+        raise RuntimeError("Migrations failed")
+    session = DBSession()
+    try:
+        exif_service.create_metadata_dbe(session)
+        session.commit()
+    finally:
+        session.close()
+
+def _run_scan(timer: StageTimer, counter: QueryCounter) -> Dict:
+    from database import engine, DBSession
+    from dbe.photo import Photo
+    from dbe.task import find_by_id as find_task_by_id
+    from indexing import metadata_indexing_service
+    from service import image_facade
+    from service.task.implementation.update_collection_task import RunScanAndIndexingTask
+    from service.task_service import task_service
+
+    timer.wrap(RunScanAndIndexingTask, "_walk_folders", "walk")
+    timer.wrap(image_facade, "compute_image_hashes", "hash")
+    timer.wrap(metadata_indexing_service, "get_metadata_index_from_file", "exiftool")
+    timer.wrap(image_facade, "generate_thumbnail", "thumbnail")
+    timer.wrap(image_facade, "get_dominant_color_quantize", "color")
+    counter.install(engine)
+
+    start = time.perf_counter()
+    task_id = task_service.run_task(RunScanAndIndexingTask())
+    seconds = time.perf_counter() - start
+
+    session = DBSession()
+    try:
+        db_task = find_task_by_id(session, task_id)
+        photos = session.query(Photo).count()
+        # Timers recorded by the task itself (service.instrumentation)
+        return {"seconds": seconds, "status": db_task.status.name, "photos": photos, "task_metrics": db_task.metrics}
+    finally:
+        session.close()
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scan pipeline benchmark")
+    parser.add_argument("db_connection_string", help="Empty throwaway database")
+    parser.add_argument("--folders", type=int, default=DEFAULT_FOLDERS)
+    parser.add_argument("--images", type=int, default=DEFAULT_IMAGES)
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--output", help="JSON result file, printed to stdout when missing")
+    parser.add_argument("--keep-files", action="store_true", help="Keep generated collection and thumbnails")
+    args = parser.parse_args()
+
+    work_dir = Path(tempfile.mkdtemp(prefix="pc-scan-benchmark-"))
+    collection = _generate(work_dir, args)
+    # Application modules read config on import
+    os.environ[CONFIG_PATH_ENV] = str(_write_config(work_dir, args.db_connection_string))
+    _prepare_database()
+
+    timer = StageTimer()
+    counter = QueryCounter()
+    scan = _run_scan(timer, counter)
+    result = {
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "collection": collection,
+        "scan": scan,
+        "files_per_second": collection["images"] / scan["seconds"],
+        "stages": timer.stages,
+        "db": {"seconds": counter.seconds, "queries": counter.queries},
+        # Scan process only, ru_maxrss is in KiB on Linux
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+    output = json.dumps(result, indent=2)
+    if args.output:
+        with open(args.output, "w") as output_file:
+            output_file.write(output)
+    print(output)
+    if args.keep_files:
+        print(f"Files kept in {work_dir}", file=sys.stderr)
+    else:
+        shutil.rmtree(work_dir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Reproducible synthetic collection for scan benchmarks - nested folders with JPEG, PNG, TIFF and WebP images
+of mixed sizes, a few exact duplicates, and EXIF/XMP/IPTC metadata written by the local exiftool in one
+batch (-@ argument file). Same seed and counts give the same files and tags.
+
+Run from repository root: python -m benchmarks.synthetic_collection <target_dir> [folders] [images] [seed]
+"""
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from PIL import Image, ImageDraw
+
+DEFAULT_FOLDERS = 20
+DEFAULT_IMAGES = 200
+DEFAULT_SEED = 1
+DUPLICATE_RATIO = 0.02
+
+# (extension, Pillow format, weight)
+FORMATS = [("jpg", "JPEG", 60), ("png", "PNG", 15), ("tif", "TIFF", 10), ("webp", "WEBP", 15)]
+# (width, height, weight) - thumbnails from phones, compact cameras, 12 and 24 MP
+SIZES = [(640, 480, 20), (1600, 1200, 40), (4000, 3000, 30), (6000, 4000, 10)]
+CAMERAS = [("Canon", "Canon EOS 5D Mark IV", "EF24-105mm f/4L IS USM"),
+           ("NIKON CORPORATION", "NIKON D750", "AF-S NIKKOR 24-120mm f/4G ED VR"),
+           ("SONY", "ILCE-7M3", "FE 28-70mm F3.5-5.6 OSS"),
+           ("FUJIFILM", "X-T3", "XF18-55mmF2.8-4 R LM OIS"),
+           ("Apple", "iPhone 12", None)]
+KEYWORDS = ["family", "holiday", "mountains", "sea", "city", "birthday", "winter", "summer", "dog", "cat",
+            "architecture", "portrait", "landscape", "night", "food"]
+CITIES = ["Prague", "Brno", "Vienna", "Berlin", "Lisbon", "Oslo"]
+# IPTC can't be written to PNG and WebP
+IPTC_FORMATS = {"jpg", "tif"}
+
+
+def weighted(rng: random.Random, items: List[tuple]):
+    return rng.choices(items, weights=[item[-1] for item in items])[0]
+
+def _create_folders(rng: random.Random, root: Path, count: int) -> List[Path]:
+    folders = [root]
+    for i in range(count):
+        parent = rng.choice(folders)
+        folder = parent / f"folder-{i:04d}"
+        folder.mkdir()
+        folders.append(folder)
+    return folders
+
+def draw_image(rng: random.Random, width: int, height: int) -> Image.Image:
+    gradient = Image.linear_gradient("L")
+    bands = [gradient.rotate(rng.choice([0, 90, 180, 270])) for _ in range(3)]
+    image = Image.merge("RGB", bands).resize((width, height))
+    draw = ImageDraw.Draw(image)
+    for _ in range(12):
+        x, y = rng.randrange(width), rng.randrange(height)
+        size = rng.randrange(width // 20, width // 3)
+        color = (rng.randrange(256), rng.randrange(256), rng.randrange(256))
+        draw.ellipse((x, y, x + size, y + size), fill=color)
+    return image
+
+def _metadata_args(rng: random.Random, path: Path, extension: str) -> List[str]:
+    make, model, lens = rng.choice(CAMERAS)
+    created = datetime(2005, 1, 1) + timedelta(seconds=rng.randrange(20 * 365 * 24 * 3600))
+    keywords = rng.sample(KEYWORDS, rng.randrange(1, 4))
+    args = [f"-EXIF:Make={make}",
+            f"-EXIF:Model={model}",
+            f"-EXIF:DateTimeOriginal={created:%Y:%m:%d %H:%M:%S}",
+            f"-EXIF:ISO={rng.choice([100, 200, 400, 800, 1600, 3200])}",
+            f"-EXIF:FNumber={rng.choice([1.8, 2.8, 4, 5.6, 8, 11])}",
+            f"-EXIF:ExposureTime=1/{rng.choice([30, 60, 125, 250, 500, 1000])}",
+            f"-EXIF:FocalLength={rng.randrange(18, 200)}",
+            f"-EXIF:GPSLatitude={rng.uniform(35, 60):.6f}", "-EXIF:GPSLatitudeRef=N",
+            f"-EXIF:GPSLongitude={rng.uniform(-10, 25):.6f}", "-EXIF:GPSLongitudeRef=E",
+            f"-XMP-dc:Title={path.stem}",
+            f"-XMP-xmp:Rating={rng.randrange(0, 6)}"]
+    if lens is not None:
+        args.append(f"-EXIF:LensModel={lens}")
+    args += [f"-XMP-dc:Subject={keyword}" for keyword in keywords]
+    if extension in IPTC_FORMATS:
+        args += [f"-IPTC:Keywords={keyword}" for keyword in keywords]
+        args.append(f"-IPTC:City={rng.choice(CITIES)}")
+    return args
+
+def _write_metadata(batches: List[List[str]]):
+    """One exiftool process for all files, every file is a separate -execute block."""
+    with tempfile.NamedTemporaryFile("w", suffix=".args", encoding="utf-8", delete=False) as arg_file:
+        for args in batches:
+            arg_file.write("\n".join(["-overwrite_original", "-charset", "filename=utf8"] + args + ["-execute"]))
+            arg_file.write("\n")
+    try:
+        subprocess.run(["exiftool", "-q", "-q", "-@", arg_file.name], check=True, capture_output=True)
+    finally:
+        Path(arg_file.name).unlink()
+
+def generate_collection(root: Path, folder_count: int, image_count: int, seed: int) -> Dict:
+    """Creates the collection in empty root folder, returns its summary."""
+    if shutil.which("exiftool") is None:
+        raise RuntimeError("exiftool is needed to write metadata of the synthetic collection")
+    rng = random.Random(seed)
+    root.mkdir(parents=True, exist_ok=True)
+    folders = _create_folders(rng, root, folder_count)
+
+    originals: List[Path] = []
+    duplicates: List[Tuple[Path, Path]] = []
+    metadata_batches: List[List[str]] = []
+    formats: Dict[str, int] = dict()
+    total_bytes = 0
+    for i in range(image_count):
+        folder = rng.choice(folders)
+        if originals and rng.random() < DUPLICATE_RATIO:
+            # Exact copy, made once the original has its metadata
+            original = rng.choice(originals)
+            duplicates.append((original, folder / f"copy-{i:05d}{original.suffix}"))
+            formats["duplicate"] = formats.get("duplicate", 0) + 1
+            continue
+
+        extension, image_format, _ = weighted(rng, FORMATS)
+        width, height, _ = weighted(rng, SIZES)
+        path = folder / f"img-{i:05d}.{extension}"
+        draw_image(rng, width, height).save(path, image_format, quality=90)
+        metadata_batches.append(_metadata_args(rng, path, extension) + [str(path)])
+        originals.append(path)
+        formats[extension] = formats.get(extension, 0) + 1
+
+    _write_metadata(metadata_batches)
+    for original, path in duplicates:
+        shutil.copyfile(original, path)
+    for path in root.rglob("*"):
+        if path.is_file():
+            total_bytes += path.stat().st_size
+
+    return {"folders": folder_count, "images": image_count, "seed": seed, "formats": formats, "bytes": total_bytes}
+
+
+def main():
+    if len(sys.argv) < 2:
+        print(__doc__)
+        sys.exit(1)
+    folders = int(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_FOLDERS
+    images = int(sys.argv[3]) if len(sys.argv) > 3 else DEFAULT_IMAGES
+    seed = int(sys.argv[4]) if len(sys.argv) > 4 else DEFAULT_SEED
+    print(generate_collection(Path(sys.argv[1]), folders, images, seed))
+
+
+if __name__ == "__main__":
+    main()
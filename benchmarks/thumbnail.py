@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Thumbnail throughput - full decode and LANCZOS (previous implementation) vs. image_service.generate_thumbnail
+(JPEG draft decoding, reducing_gap, embedded RAW previews). Images are drawn like benchmarks.synthetic_collection,
+in mixed modes, no exiftool needed. Quality is PSNR of the new thumbnail against the previous one, per format
+and mode. Image.thumbnail already drafts RGB JPEGs, the gain is in images converted before resizing
+(grayscale, CMYK, alpha, palette).
+
+--extra adds files of a folder (e.g. real RAW files), the previous implementation fails on formats Pillow
+can't decode, those are reported as legacy_failed.
+
+Run from repository root: python -m benchmarks.thumbnail [--images 60] [--size 300] [--seed 1] [--extra <dir>]
+"""
+import argparse
+import json
+import math
+import random
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict
+
+from PIL import Image, ImageChops, ImageStat
+
+from benchmarks.synthetic_collection import FORMATS, SIZES, draw_image, weighted
+
+# (mode, extensions it can be saved as, weight)
+MODES = [("RGB", {"jpg", "png", "tif", "webp"}, 60),
+         ("L", {"jpg", "png", "tif", "webp"}, 10),
+         ("CMYK", {"jpg", "tif"}, 10),
+         ("RGBA", {"png", "tif", "webp"}, 10),
+         ("P", {"png", "tif"}, 10)]
+
+
+def legacy_thumbnail(photo_path: str, thumbnail_path: str, size: int, quality: int):
+    with Image.open(photo_path) as img:
+        if img.mode in ("RGBA", "LA", "P"):
+            rgb_img = Image.new("RGB", img.size, (255, 255, 255))
+            if img.mode == "P":
+                img = img.convert("RGBA")
+            rgb_img.paste(img, mask=img.split()[3] if img.mode == "RGBA" else None)
+            img = rgb_img
+        elif img.mode != "RGB":
+            img = img.convert("RGB")
+        img.thumbnail((size, size), Image.Resampling.LANCZOS)
+        img.save(thumbnail_path, "JPEG", quality=quality, optimize=True)
+
+
+def psnr(path_a: str, path_b: str) -> float:
+    with Image.open(path_a) as a, Image.open(path_b) as b:
+        a = a.convert("RGB")
+        b = b.convert("RGB")
+        if a.size != b.size:
+            # Draft decoding may round the thumbnail size differently by a pixel
+            b = b.resize(a.size, Image.Resampling.LANCZOS)
+        stat = ImageStat.Stat(ImageChops.difference(a, b))
+        mse = sum(stat.sum2) / (3 * a.size[0] * a.size[1])
+    return math.inf if mse == 0 else 10 * math.log10(255 ** 2 / mse)
+
+
+def _generate(work_dir: Path, count: int, seed: int) -> Dict[Path, str]:
+    """Returns path -> result key (extension/mode)."""
+    rng = random.Random(seed)
+    paths = dict()
+    for i in range(count):
+        extension, image_format, _ = weighted(rng, FORMATS)
+        width, height, _ = weighted(rng, SIZES)
+        mode, _, _ = weighted(rng, [m for m in MODES if extension in m[1]])
+        path = work_dir / f"img-{i:05d}.{extension}"
+        image = draw_image(rng, width, height)
+        if mode == "RGBA":
+            image.putalpha(Image.linear_gradient("L").resize((width, height)))
+        elif mode != "RGB":
+            image = image.convert(mode)
+        image.save(path, image_format, quality=90)
+        paths[path] = f"{extension}/{mode}"
+    return paths
+
+
+def _run(paths: Dict[Path, str], out_dir: Path, size: int) -> Dict[str, Dict]:
+    from service import image_service
+
+    results: Dict[str, Dict] = dict()
+    for path, key in paths.items():
+        stats = results.setdefault(key, {
+            "images": 0, "legacy_seconds": 0.0, "seconds": 0.0, "legacy_failed": 0, "identical": 0, "psnr": []})
+        stats["images"] += 1
+        legacy_path = out_dir / f"{path.stem}-legacy.jpg"
+        start = time.perf_counter()
+        try:
+            legacy_thumbnail(str(path), str(legacy_path), size, 85)
+        except (OSError, ValueError):
+            legacy_path = None
+            stats["legacy_failed"] += 1
+        stats["legacy_seconds"] += time.perf_counter() - start
+
+        start = time.perf_counter()
+        new_path = image_service.generate_thumbnail(str(path), path.stem, str(out_dir), size, 85)
+        stats["seconds"] += time.perf_counter() - start
+        if legacy_path is not None:
+            value = psnr(str(legacy_path), new_path)
+            if math.isinf(value):
+                stats["identical"] += 1
+            else:
+                stats["psnr"].append(value)
+
+    for stats in results.values():
+        # Identical thumbnails have infinite PSNR, they are counted separately
+        values = stats.pop("psnr")
+        stats["psnr_min_db"] = round(min(values), 2) if values else None
+        stats["psnr_mean_db"] = round(sum(values) / len(values), 2) if values else None
+        stats["speedup"] = stats["legacy_seconds"] / stats["seconds"]
+        stats["images_per_second"] = stats["images"] / stats["seconds"]
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Thumbnail benchmark")
+    parser.add_argument("--images", type=int, default=60)
+    parser.add_argument("--size", type=int, default=300, help="Thumbnail size in pixels")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--extra", help="Folder with additional images, e.g. RAW files")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="pc-thumbnail-benchmark-") as work_dir:
+        work_dir = Path(work_dir)
+        out_dir = work_dir / "thumbnails"
+        out_dir.mkdir()
+        paths = _generate(work_dir, args.images, args.seed)
+        if args.extra:
+            for path in sorted(Path(args.extra).iterdir()):
+                if path.is_file():
+                    paths[path] = path.suffix.lower().lstrip(".")
+        results = _run(paths, out_dir, args.size)
+
+    total_legacy = sum(stats["legacy_seconds"] for stats in results.values())
+    total = sum(stats["seconds"] for stats in results.values())
+    print(json.dumps({"size": args.size, "images": len(paths), "legacy_seconds": total_legacy, "seconds": total,
+                      "speedup": total_legacy / total, "formats": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,16 @@
+import os
+import uuid
 from uuid import UUID
-from flask import g, abort, send_file
+from flask import g, abort, send_file, Response
 from flask_smorest import Blueprint
 
 import pc_configuration
+from blueprint.api.content.content_requests import GetThumbnailsRequest
+from blueprint.request_session import read_only
+from dbe.app_data import get_app_data_val
 from dbe.photo import find_by_id as find_photo_by_id
+from domain.app_data_field import AppDataField
+from service import multipart_service, metrics_service
 from vial.config import app_config
 
 content_api = Blueprint("content", __name__, url_prefix="/content")
@@ -13,6 +20,7 @@ content_api = Blueprint("content", __name__, url_prefix="/content")
 @content_api.response(200)
 @content_api.alt_response(404)
 @content_api.alt_response(400)
+@read_only
 def get_image(photo_id: str):
     try:
         photo_uuid = UUID(photo_id)
@@ -32,6 +40,7 @@ def get_image(photo_id: str):
 @content_api.response(200)
 @content_api.alt_response(404)
 @content_api.alt_response(400)
+@read_only
 def get_thumbnail(photo_id: str):
     try:
         UUID(photo_id)
@@ -39,4 +48,38 @@ def get_thumbnail(photo_id: str):
         abort(400)
 
     file_path = app_config.get_configuration(pc_configuration.GENERATED_PATH) + "/" + photo_id + ".jpg"
-    return send_file(file_path)
\ No newline at end of file
+    if not os.path.isfile(file_path):
+        metrics_service.inc(metrics_service.THUMBNAIL_REQUESTS, ("miss",))
+        abort(404)
+    metrics_service.inc(metrics_service.THUMBNAIL_REQUESTS, ("hit",))
+    return send_file(file_path)
+
+
+@content_api.route("/thumbnails", methods=["POST"])
+@content_api.arguments(GetThumbnailsRequest, location="json")
+@content_api.response(200)
+@content_api.alt_response(400)
+@read_only
+def get_thumbnails(request: dict):
+    """
+    Thumbnails of a page of photos as one multipart/mixed response, each part has Content-ID <photo id>.
+    Photos without thumbnail are left out.
+    """
+    try:
+        photo_uuids = GetThumbnailsRequest.get_photo_ids(request)
+    except (ValueError, KeyError):
+        abort(400)
+
+    transaction_session = getattr(g, "transaction_session", None)
+    if len(photo_uuids) > get_app_data_val(transaction_session, AppDataField.PHOTO_BATCH_LIMIT):
+        abort(400)
+
+    generated_path = app_config.get_configuration(pc_configuration.GENERATED_PATH)
+    parts = [({"Content-Type": "image/jpeg", "Content-ID": f"<{photo_uuid}>"}, f"{generated_path}/{photo_uuid}.jpg")
+             for photo_uuid in dict.fromkeys(photo_uuids)]
+    hits = sum(1 for _, file_path in parts if os.path.isfile(file_path))
+    metrics_service.inc(metrics_service.THUMBNAIL_REQUESTS, ("hit",), hits)
+    metrics_service.inc(metrics_service.THUMBNAIL_REQUESTS, ("miss",), len(parts) - hits)
+    boundary = uuid.uuid4().hex
+    return Response(multipart_service.iterate_multipart(parts, boundary),
+                    mimetype=f"multipart/mixed; boundary={boundary}")
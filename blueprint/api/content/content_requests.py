@@ -0,0 +1,13 @@
+from typing import Dict, List
+from uuid import UUID
+
+from marshmallow import Schema, fields, validate
+
+
+class GetThumbnailsRequest(Schema):
+    photo_ids = fields.List(fields.Str(), required=True, load_only=True, validate=validate.Length(min=1),
+                            metadata={"description": "At most PHOTO_BATCH_LIMIT ids"})
+
+    @staticmethod
+    def get_photo_ids(request: Dict) -> List[UUID]:
+        return [UUID(photo_id) for photo_id in request.get("photo_ids")]
@@ -3,16 +3,19 @@ from flask import g, abort
 from flask_smorest import Blueprint
 
 from blueprint.transfer.pagination_to import PaginationRequest, PaginationResponse
+from blueprint.transfer.photo_cursor_to import PhotoCursorRequest, PhotoCursorPageResponse
 from dbe.app_data import get_app_data_val
 from domain.app_data_field import AppDataField
+from domain.cursor_direction import CursorDirection
 from domain.folder_type import FolderType
-from service import file_service
-from dbe.folder import find_by_id as find_folder_by_id, find_child_folders_by_parent, child_folders_by_parent_count, find_child_folder_ids_by_parent, Folder
-from dbe.photo import find_child_photos_by_folder, child_photos_by_folder_count, find_child_photo_ids_by_folder
+from service import file_service, folder_access_service
+from dbe.folder import find_by_id as find_folder_by_id, find_child_folders_by_parent, child_folders_by_parent_count, find_child_folder_ids_by_parent
+from dbe.photo import find_child_photos_by_folder, child_photos_by_folder_count, find_child_photo_ids_by_folder, find_subtree_photos
 from blueprint.api.folder.folder_responses import BreadcrumbsResponse, FolderResponse, ChildFoldersResponse, \
     ChildPhotosResponse, FolderIdsResponse, PhotoIdsResponse
-from blueprint.api.folder.folder_requests import GetFolderFoldersRequest, GetFolderPhotosRequest, GetFolderIdsRequest, GetPhotoIdsRequest, CreateFolderRequest, RemoveSelectionRequest, SelectionRequest
+from blueprint.api.folder.folder_requests import GetFolderFoldersRequest, GetFolderPhotosRequest, GetSubtreePhotosRequest, GetFolderIdsRequest, GetPhotoIdsRequest, CreateFolderRequest, RemoveSelectionRequest, SelectionRequest, MoveSelectionToFolderRequest
 from blueprint.api.photo.photo_responses import PhotoResponse
+from blueprint.request_session import read_only
 
 folder_api = Blueprint("folder", __name__, url_prefix="/folder")
 
@@ -20,6 +23,7 @@ folder_api = Blueprint("folder", __name__, url_prefix="/folder")
 @folder_api.route("/<folder_id>/breadcrumb", methods=["GET"])
 @folder_api.response(200, BreadcrumbsResponse)
 @folder_api.alt_response(400)
+@read_only
 def get_breadcrumbs(folder_id: str):
     try:
         folder_uuid = UUID(folder_id)
@@ -35,6 +39,7 @@ def get_breadcrumbs(folder_id: str):
 @folder_api.response(200, FolderResponse)
 @folder_api.alt_response(404)
 @folder_api.alt_response(400)
+@read_only
 def get_folder_info(folder_id: str):
     try:
         folder_uuid = UUID(folder_id)
@@ -45,6 +50,7 @@ def get_folder_info(folder_id: str):
     folder = find_folder_by_id(transaction_session, folder_uuid)
     if folder is None:
         abort(404)
+    folder_access_service.record_access(folder.id)
     
     return FolderResponse.to_resp(folder)
 
@@ -52,6 +58,7 @@ def get_folder_info(folder_id: str):
 @folder_api.arguments(GetFolderFoldersRequest, location="json")
 @folder_api.response(200, ChildFoldersResponse)
 @folder_api.alt_response(400)
+@read_only
 def get_child_folders(request: dict):
     try:
         folder_uuid = GetFolderFoldersRequest.get_folder_id(request)
@@ -63,6 +70,7 @@ def get_child_folders(request: dict):
     except (KeyError, ValueError):
         abort(400)
     
+    folder_access_service.record_access(folder_uuid)
     transaction_session = getattr(g, "transaction_session", None)
     folders_per_page: int = get_app_data_val(transaction_session, AppDataField.FOLDER_VIEW_FOLDERS_PAGINATION_COUNT)
     page: int = PaginationRequest.get_page(GetFolderFoldersRequest.get_pagination(request))
@@ -81,6 +89,7 @@ def get_child_folders(request: dict):
 @folder_api.arguments(GetFolderPhotosRequest, location="json")
 @folder_api.response(200, ChildPhotosResponse)
 @folder_api.alt_response(400)
+@read_only
 def get_child_photos(request: dict):
     try:
         folder_uuid = GetFolderPhotosRequest.get_folder_id(request)
@@ -92,6 +101,7 @@ def get_child_photos(request: dict):
     except (KeyError, ValueError):
         abort(400)
 
+    folder_access_service.record_access(folder_uuid)
     transaction_session = getattr(g, "transaction_session", None)
     photos_per_page: int = get_app_data_val(transaction_session, AppDataField.FOLDER_VIEW_PHOTOS_PAGINATION_COUNT)
     page: int = PaginationRequest.get_page(GetFolderPhotosRequest.get_pagination(request))
@@ -106,10 +116,36 @@ def get_child_photos(request: dict):
     photos_resp = [PhotoResponse.to_resp(p) for p in photos]
     return ChildPhotosResponse.to_resp(photos_resp, pagination_resp)
 
+@folder_api.route("/subtree-photos", methods=["POST"])
+@folder_api.arguments(GetSubtreePhotosRequest, location="json")
+@folder_api.response(200, PhotoCursorPageResponse)
+@folder_api.alt_response(400)
+@read_only
+def get_subtree_photos(request: dict):
+    try:
+        folder_uuid = GetSubtreePhotosRequest.get_folder_id(request)
+        cursor = GetSubtreePhotosRequest.get_cursor(request)
+        direction = CursorDirection.AFTER
+        created_date = None
+        photo_uuid = None
+        if cursor is not None:
+            direction = PhotoCursorRequest.get_direction(cursor)
+            created_date = PhotoCursorRequest.get_created_date(cursor)
+            photo_uuid = PhotoCursorRequest.get_photo_id(cursor)
+    except (ValueError, KeyError):
+        abort(400)
+
+    folder_access_service.record_access(folder_uuid)
+    transaction_session = getattr(g, "transaction_session", None)
+    photos_per_page: int = get_app_data_val(transaction_session, AppDataField.SUBTREE_PHOTOS_PAGINATION_COUNT)
+    photos = find_subtree_photos(transaction_session, folder_uuid, direction, created_date, photo_uuid, photos_per_page)
+    return PhotoCursorPageResponse.to_resp(photos)
+
 @folder_api.route("/folder-ids", methods=["POST"])
 @folder_api.arguments(GetFolderIdsRequest, location="json")
 @folder_api.response(200, FolderIdsResponse)
 @folder_api.alt_response(400)
+@read_only
 def get_folder_ids(request: dict):
     try:
         folder_uuid = GetFolderIdsRequest.get_folder_id(request)
@@ -126,6 +162,7 @@ def get_folder_ids(request: dict):
 @folder_api.arguments(GetPhotoIdsRequest, location="json")
 @folder_api.response(200, PhotoIdsResponse)
 @folder_api.alt_response(400)
+@read_only
 def get_photo_ids(request: dict):
     try:
         folder_uuid = GetPhotoIdsRequest.get_folder_id(request)
@@ -163,12 +200,7 @@ def create_folder(request: dict):
     if parent_folder.folder_type != FolderType.VIRTUAL:
         abort(400)
     
-    new_folder = Folder()
-    new_folder.name = folder_name
-    new_folder.parent_id = parent_uuid
-    new_folder.folder_type = FolderType.VIRTUAL
-    transaction_session.add(new_folder)
-    transaction_session.flush()
+    new_folder = file_service.create_folder(transaction_session, folder_name, parent_uuid, FolderType.VIRTUAL)
     
     return FolderResponse.to_resp(new_folder)
 
@@ -187,4 +219,34 @@ def remove_selection_endpoint(request: dict):
     transaction_session = getattr(g, "transaction_session", None)
     file_service.remove_selection(transaction_session, folder_ids, photo_ids)
     
-    return "", 204
\ No newline at end of file
+    return "", 204
+
+@folder_api.route("/move-selection", methods=["POST"])
+@folder_api.arguments(MoveSelectionToFolderRequest, location="json")
+@folder_api.response(204)
+@folder_api.alt_response(400)
+@folder_api.alt_response(404)
+def move_selection_endpoint(request: dict):
+    try:
+        selection = MoveSelectionToFolderRequest.get_selection(request)
+        folder_ids = SelectionRequest.get_folder_ids(selection)
+        photo_ids = SelectionRequest.get_photo_ids(selection)
+        target_uuid = MoveSelectionToFolderRequest.get_target_folder_id(request)
+    except (ValueError, KeyError):
+        abort(400)
+
+    transaction_session = getattr(g, "transaction_session", None)
+    target_folder = find_folder_by_id(transaction_session, target_uuid)
+    if target_folder is None:
+        abort(404)
+
+    if target_folder.folder_type != FolderType.VIRTUAL:
+        abort(400)
+
+    try:
+        file_service.move_selection(transaction_session, folder_ids, photo_ids, target_uuid)
+    except ValueError:
+        # Target folder is inside a moved folder
+        abort(400)
+
+    return "", 204
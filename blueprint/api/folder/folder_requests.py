@@ -1,9 +1,10 @@
-from typing import Dict, List
+from typing import Dict, List, Optional
 from uuid import UUID
 
 from marshmallow import Schema, fields, validate
 
 from blueprint.transfer.pagination_to import PaginationRequest
+from blueprint.transfer.photo_cursor_to import PhotoCursorRequest
 from domain.cursor_direction import CursorDirection
 from domain.ordering_type import OrderingType
 
@@ -51,6 +52,20 @@ class GetFolderPhotosRequest(Schema):
         return request.get("pagination")
 
 
+class GetSubtreePhotosRequest(Schema):
+    folder_id = fields.Str(required=True, load_only=True)
+    cursor = fields.Nested(PhotoCursorRequest, many=False, required=False, load_only=True,
+                           metadata={"description": "Missing for the first page"})
+
+    @staticmethod
+    def get_folder_id(request: Dict) -> UUID:
+        return UUID(request.get("folder_id"))
+
+    @staticmethod
+    def get_cursor(request: Dict) -> Optional[Dict]:
+        return request.get("cursor")
+
+
 class GetFolderIdsRequest(Schema):
     folder_id = fields.Str(required=True, load_only=True)
 
@@ -6,19 +6,45 @@ from marshmallow import Schema, fields, validate
 from blueprint.api.photo.photo_responses import PhotoResponse
 from blueprint.transfer.pagination_to import PaginationResponse
 from dbe.folder import Folder
+from dbe.folder_stats import FolderStats
 from domain.folder_type import FolderType
 
+class FolderStatsResponse(Schema):
+    photo_count = fields.Int(required=True, dump_only=True, metadata={"description": "Photos in the whole subtree"})
+    size_bytes = fields.Int(required=True, dump_only=True)
+    direct_photo_count = fields.Int(required=True, dump_only=True, metadata={"description": "Photos of this folder only"})
+    direct_size_bytes = fields.Int(required=True, dump_only=True)
+    created_min = fields.DateTime(required=False, dump_only=True)
+    created_max = fields.DateTime(required=False, dump_only=True)
+    cover_photo_id = fields.Str(required=False, dump_only=True)
+
+    @staticmethod
+    def to_resp(stats: FolderStats):
+        resp_dict = {"photo_count": stats.photo_count, "size_bytes": stats.size_bytes,
+                     "direct_photo_count": stats.direct_photo_count, "direct_size_bytes": stats.direct_size_bytes}
+        if stats.created_min is not None:
+            resp_dict["created_min"] = stats.created_min
+        if stats.created_max is not None:
+            resp_dict["created_max"] = stats.created_max
+        if stats.cover_photo_id is not None:
+            resp_dict["cover_photo_id"] = str(stats.cover_photo_id)
+        return resp_dict
+
+
 class FolderResponse(Schema):
     id = fields.Str(required=True, dump_only=True)
     parent_id = fields.Str(required=False, dump_only=True)
     name = fields.Str(required=True, dump_only=True)
     type = fields.Str(required=True, dump_only=True, validate=validate.OneOf([e.name for e in FolderType]))
+    stats = fields.Nested(FolderStatsResponse, many=False, required=False, metadata={"description": "Missing until first scan"})
 
     @staticmethod
     def to_resp(folder: Folder):
         resp_dict = {"id": str(folder.id), "name": folder.name, "type": folder.folder_type.name}
         if folder.parent_id is not None:
             resp_dict["parent_id"] = str(folder.parent_id)
+        if folder.stats is not None:
+            resp_dict["stats"] = FolderStatsResponse.to_resp(folder.stats)
         return resp_dict
 
 
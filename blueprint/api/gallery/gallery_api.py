@@ -0,0 +1,113 @@
+from uuid import UUID
+
+from flask import g, abort, Response
+from flask_smorest import Blueprint
+
+from blueprint.api.gallery.gallery_requests import CreateGalleryRequest, GetGalleryPhotosRequest
+from blueprint.api.gallery.gallery_responses import GalleryResponse, GalleriesResponse, CreateGalleryResponse
+from blueprint.api.search.search_requests import SearchCriteriaRequest
+from blueprint.api.task.task_responses import TaskStatusResponse
+from blueprint.transfer.photo_cursor_to import PhotoCursorRequest, PhotoCursorPageResponse
+from blueprint.request_profiling import is_profiling_requested
+from blueprint.request_session import read_only
+from dbe.app_data import get_app_data_val
+from dbe.gallery import find_by_id as find_gallery_by_id, get_all as get_all_galleries, find_gallery_photos
+from dbe.task import find_by_id as find_task_by_id
+from domain.app_data_field import AppDataField
+from domain.cursor_direction import CursorDirection
+from service import gallery_service
+from service.task.implementation.rebuild_gallery_task import RebuildGalleryTask
+from service.task_service import task_service
+
+gallery_api = Blueprint("gallery", __name__, url_prefix="/gallery")
+
+
+@gallery_api.route("/", methods=["GET"])
+@gallery_api.response(200, GalleriesResponse)
+@read_only
+def list_galleries():
+    transaction_session = getattr(g, "transaction_session", None)
+    galleries_resp = [GalleryResponse.to_resp(gallery) for gallery in get_all_galleries(transaction_session)]
+    return GalleriesResponse.to_resp(galleries_resp)
+
+@gallery_api.route("/create", methods=["POST"])
+@gallery_api.arguments(CreateGalleryRequest, location="json")
+@gallery_api.response(201, CreateGalleryResponse)
+@gallery_api.alt_response(400)
+def create_gallery(request: dict):
+    try:
+        criteria = SearchCriteriaRequest.get_criteria(CreateGalleryRequest.get_criteria(request))
+    except (ValueError, KeyError):
+        abort(400)
+
+    transaction_session = getattr(g, "transaction_session", None)
+    try:
+        gallery = gallery_service.create_gallery(transaction_session, CreateGalleryRequest.get_name(request), criteria)
+    except ValueError:
+        abort(400)
+    # Task process loads the gallery, it has to be committed before the task is queued
+    transaction_session.commit()
+
+    db_task = _queue_rebuild(transaction_session, gallery.id)
+    return CreateGalleryResponse.to_resp(gallery, db_task)
+
+@gallery_api.route("/<gallery_id>", methods=["DELETE"])
+@gallery_api.response(200)
+@gallery_api.alt_response(404)
+@gallery_api.alt_response(400)
+def delete_gallery(gallery_id: str):
+    gallery = _gallery_by_id(gallery_id)
+    transaction_session = getattr(g, "transaction_session", None)
+    transaction_session.delete(gallery)
+    return Response(status=200)
+
+@gallery_api.route("/<gallery_id>/rebuild", methods=["POST"])
+@gallery_api.response(200, TaskStatusResponse)
+@gallery_api.alt_response(404)
+@gallery_api.alt_response(400)
+def rebuild_gallery(gallery_id: str):
+    gallery = _gallery_by_id(gallery_id)
+    transaction_session = getattr(g, "transaction_session", None)
+    return TaskStatusResponse.to_resp(_queue_rebuild(transaction_session, gallery.id))
+
+@gallery_api.route("/photos", methods=["POST"])
+@gallery_api.arguments(GetGalleryPhotosRequest, location="json")
+@gallery_api.response(200, PhotoCursorPageResponse)
+@gallery_api.alt_response(400)
+@read_only
+def get_gallery_photos(request: dict):
+    try:
+        gallery_uuid = GetGalleryPhotosRequest.get_gallery_id(request)
+        cursor = GetGalleryPhotosRequest.get_cursor(request)
+        direction = CursorDirection.AFTER
+        created_date = None
+        photo_uuid = None
+        if cursor is not None:
+            direction = PhotoCursorRequest.get_direction(cursor)
+            created_date = PhotoCursorRequest.get_created_date(cursor)
+            photo_uuid = PhotoCursorRequest.get_photo_id(cursor)
+    except (ValueError, KeyError):
+        abort(400)
+
+    transaction_session = getattr(g, "transaction_session", None)
+    photos_per_page: int = get_app_data_val(transaction_session, AppDataField.GALLERY_PHOTOS_PAGINATION_COUNT)
+    photos = find_gallery_photos(transaction_session, gallery_uuid, direction, created_date, photo_uuid, photos_per_page)
+    return PhotoCursorPageResponse.to_resp(photos)
+
+def _queue_rebuild(transaction_session, gallery_id: UUID):
+    oh_task = RebuildGalleryTask(gallery_id)
+    oh_task.profile = is_profiling_requested()
+    task_id = task_service.create_task(oh_task)
+    return find_task_by_id(transaction_session, task_id)
+
+def _gallery_by_id(gallery_id: str):
+    try:
+        gallery_uuid = UUID(gallery_id)
+    except ValueError:
+        abort(400)
+
+    transaction_session = getattr(g, "transaction_session", None)
+    gallery = find_gallery_by_id(transaction_session, gallery_uuid)
+    if gallery is None:
+        abort(404)
+    return gallery
@@ -0,0 +1,34 @@
+from typing import Dict, Optional
+from uuid import UUID
+
+from marshmallow import Schema, fields, validate
+
+from blueprint.api.search.search_requests import SearchCriteriaRequest
+from blueprint.transfer.photo_cursor_to import PhotoCursorRequest
+
+
+class CreateGalleryRequest(Schema):
+    name = fields.Str(required=True, load_only=True, validate=validate.Length(min=1))
+    criteria = fields.Nested(SearchCriteriaRequest, many=False, required=True, load_only=True)
+
+    @staticmethod
+    def get_name(request: Dict) -> str:
+        return request.get("name")
+
+    @staticmethod
+    def get_criteria(request: Dict) -> Dict:
+        return request.get("criteria")
+
+
+class GetGalleryPhotosRequest(Schema):
+    gallery_id = fields.Str(required=True, load_only=True)
+    cursor = fields.Nested(PhotoCursorRequest, many=False, required=False, load_only=True,
+                           metadata={"description": "Missing for the first page"})
+
+    @staticmethod
+    def get_gallery_id(request: Dict) -> UUID:
+        return UUID(request.get("gallery_id"))
+
+    @staticmethod
+    def get_cursor(request: Dict) -> Optional[Dict]:
+        return request.get("cursor")
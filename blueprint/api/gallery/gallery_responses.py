@@ -0,0 +1,38 @@
+from typing import List
+
+from marshmallow import Schema, fields
+
+from blueprint.api.task.task_responses import TaskStatusResponse
+from dbe.gallery import Gallery
+from dbe.task import Task
+
+
+class GalleryResponse(Schema):
+    id = fields.Str(required=True, dump_only=True)
+    name = fields.Str(required=True, dump_only=True)
+    criteria = fields.Dict(required=True, dump_only=True)
+    rebuilt = fields.DateTime(required=False, dump_only=True)
+
+    @staticmethod
+    def to_resp(gallery: Gallery):
+        gallery_resp = {"id": str(gallery.id), "name": gallery.name, "criteria": gallery.criteria_json}
+        if gallery.rebuilt is not None:
+            gallery_resp["rebuilt"] = gallery.rebuilt
+        return gallery_resp
+
+
+class CreateGalleryResponse(Schema):
+    gallery = fields.Nested(GalleryResponse, many=False, required=True)
+    rebuild_task = fields.Nested(TaskStatusResponse, many=False, required=True)
+
+    @staticmethod
+    def to_resp(gallery: Gallery, rebuild_task: Task):
+        return {"gallery": GalleryResponse.to_resp(gallery), "rebuild_task": TaskStatusResponse.to_resp(rebuild_task)}
+
+
+class GalleriesResponse(Schema):
+    galleries = fields.Nested(GalleryResponse, many=True, required=True)
+
+    @staticmethod
+    def to_resp(galleries: List[GalleryResponse]):
+        return {"galleries": galleries}
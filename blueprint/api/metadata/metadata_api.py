@@ -1,10 +1,16 @@
+from typing import Dict, Optional
+
 from flask import g, abort
 from flask_smorest import Blueprint
 
-from dbe.photo import find_by_id as find_photo_by_id
-from blueprint.api.metadata.metadata_responses import PhotoMetadataIndex
-from blueprint.api.metadata.metadata_requests import GetPhotoMetadataRequest
+from dbe.app_data import get_app_data_val
+from dbe.photo import Photo, find_by_id as find_photo_by_id, find_by_ids_with_metadata
+from blueprint.api.metadata.metadata_responses import PhotoMetadataIndex, PhotoMetadataResponse, PhotosMetadataResponse
+from blueprint.api.metadata.metadata_requests import GetPhotoMetadataRequest, GetPhotosMetadataRequest
+from blueprint.request_session import read_only
+from domain.app_data_field import AppDataField
 from domain.metadata_index_type import MetadataIndexType
+from indexing import metadata_indexing_facade
 
 
 metadata_api = Blueprint("metadata", __name__, url_prefix="/metadata")
@@ -15,6 +21,7 @@ metadata_api = Blueprint("metadata", __name__, url_prefix="/metadata")
 @metadata_api.response(200, PhotoMetadataIndex)
 @metadata_api.alt_response(404)
 @metadata_api.alt_response(400)
+@read_only
 def get_photo_metadata(request: dict):
     try:
         photo_uuid = GetPhotoMetadataRequest.get_photo_id(request)
@@ -27,16 +34,48 @@ def get_photo_metadata(request: dict):
     if photo is None:
         abort(404)
     
-    if photo.metadata_index is None:
+    metadata_json = _metadata_json(photo, metadata_type)
+    if metadata_json is None:
         abort(404)
     
+    return PhotoMetadataIndex.to_resp(metadata_json)
+
+@metadata_api.route("/photos", methods=["POST"])
+@metadata_api.arguments(GetPhotosMetadataRequest, location="json")
+@metadata_api.response(200, PhotosMetadataResponse)
+@metadata_api.alt_response(400)
+@read_only
+def get_photos_metadata(request: dict):
+    try:
+        photo_uuids = GetPhotosMetadataRequest.get_photo_ids(request)
+        metadata_type = GetPhotosMetadataRequest.get_type(request)
+    except (ValueError, KeyError):
+        abort(400)
+
+    transaction_session = getattr(g, "transaction_session", None)
+    if len(photo_uuids) > get_app_data_val(transaction_session, AppDataField.PHOTO_BATCH_LIMIT):
+        abort(400)
+
+    photos = {photo.id: photo for photo in find_by_ids_with_metadata(transaction_session, photo_uuids)}
+    photos_resp = []
+    missing_ids = []
+    for photo_uuid in dict.fromkeys(photo_uuids): # request order, without duplicates
+        photo = photos.get(photo_uuid)
+        metadata_json = _metadata_json(photo, metadata_type) if photo is not None else None
+        if metadata_json is None:
+            missing_ids.append(photo_uuid)
+        else:
+            photos_resp.append(PhotoMetadataResponse.to_resp(photo_uuid, metadata_json))
+    return PhotosMetadataResponse.to_resp(photos_resp, missing_ids)
+
+def _metadata_json(photo: Photo, metadata_type: MetadataIndexType) -> Optional[Dict]:
+    if photo.metadata_index is None:
+        return None
     if metadata_type == MetadataIndexType.EXIF:
-        metadata_json = photo.metadata_index.exif_json
-    elif metadata_type == MetadataIndexType.EFFECTIVE:
+        return metadata_indexing_facade.get_full_metadata(photo.metadata_index)
+    if metadata_type == MetadataIndexType.EFFECTIVE:
         metadata_json = photo.metadata_index.effective_json
         if metadata_json is None:
-            metadata_json = photo.metadata_index.exif_json
-    else:
-        abort(400)
-    
-    return PhotoMetadataIndex.to_resp(metadata_json)
+            metadata_json = metadata_indexing_facade.get_full_metadata(photo.metadata_index)
+        return metadata_json
+    abort(400)
@@ -1,4 +1,4 @@
-from typing import Dict
+from typing import Dict, List
 from uuid import UUID
 
 from marshmallow import Schema, fields, validate
@@ -21,3 +21,21 @@ class GetPhotoMetadataRequest(Schema):
     @staticmethod
     def get_type(request: Dict) -> MetadataIndexType:
         return MetadataIndexType(request.get("type"))
+
+
+class GetPhotosMetadataRequest(Schema):
+    photo_ids = fields.List(fields.Str(), required=True, load_only=True, validate=validate.Length(min=1),
+                            metadata={"description": "At most PHOTO_BATCH_LIMIT ids"})
+    type = fields.Str(
+        required=True,
+        load_only=True,
+        validate=validate.OneOf([e.value for e in MetadataIndexType])
+    )
+
+    @staticmethod
+    def get_photo_ids(request: Dict) -> List[UUID]:
+        return [UUID(photo_id) for photo_id in request.get("photo_ids")]
+
+    @staticmethod
+    def get_type(request: Dict) -> MetadataIndexType:
+        return MetadataIndexType(request.get("type"))
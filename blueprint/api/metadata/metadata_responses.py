@@ -1,4 +1,5 @@
-from typing import Dict, Optional
+from typing import Dict, List, Optional
+from uuid import UUID
 
 from marshmallow import Schema, fields, validate
 
@@ -41,4 +42,23 @@ class PhotoMetadataIndex(Schema):
                         if isinstance(g1_tags, dict):
                             metadata_list.append(Metadata.to_resp(g0, g1_key, g1_tags))
         
-        return {"metadata": metadata_list}
\ No newline at end of file
+        return {"metadata": metadata_list}
+
+
+class PhotoMetadataResponse(Schema):
+    photo_id = fields.Str(required=True)
+    metadata = fields.Nested(Metadata, many=True, required=True)
+
+    @staticmethod
+    def to_resp(photo_id: UUID, metadata_json: Dict) -> Dict:
+        return {"photo_id": str(photo_id), **PhotoMetadataIndex.to_resp(metadata_json)}
+
+
+class PhotosMetadataResponse(Schema):
+    photos = fields.Nested(PhotoMetadataResponse, many=True, required=True)
+    missing_ids = fields.List(fields.Str(), required=True,
+                              metadata={"description": "Requested photos that don't exist or have no metadata"})
+
+    @staticmethod
+    def to_resp(photos: List[Dict], missing_ids: List[UUID]) -> Dict:
+        return {"photos": photos, "missing_ids": [str(photo_id) for photo_id in missing_ids]}
@@ -0,0 +1,83 @@
+from flask import g, abort
+from flask_smorest import Blueprint
+
+from blueprint.api.photo.photo_requests import SimilarPhotosRequest, NearDuplicatesRequest
+from blueprint.api.photo.photo_responses import SimilarPhotosResponse, SimilarPhoto, NearDuplicateClustersResponse, \
+    NearDuplicateCluster
+from blueprint.api.task.task_responses import TaskStatusResponse
+from blueprint.transfer.pagination_to import PaginationRequest, PaginationResponse
+from blueprint.request_profiling import is_profiling_requested
+from blueprint.request_session import read_only
+from dbe.app_data import get_app_data_val
+from dbe.near_duplicate import find_cluster_page, cluster_count
+from dbe.photo import find_by_id as find_photo_by_id, find_by_ids as find_photos_by_ids
+from dbe.task import find_by_id as find_task_by_id
+from domain.app_data_field import AppDataField
+from service import near_duplicate_service
+from service.task.implementation.rebuild_near_duplicates_task import RebuildNearDuplicatesTask
+from service.task_service import task_service
+
+photo_api = Blueprint("photo", __name__, url_prefix="/photo")
+
+
+@photo_api.route("/similar", methods=["POST"])
+@photo_api.arguments(SimilarPhotosRequest, location="json")
+@photo_api.response(200, SimilarPhotosResponse)
+@photo_api.alt_response(404)
+@photo_api.alt_response(400)
+@read_only
+def get_similar_photos(request: dict):
+    try:
+        photo_uuid = SimilarPhotosRequest.get_photo_id(request)
+    except (ValueError, KeyError):
+        abort(400)
+
+    transaction_session = getattr(g, "transaction_session", None)
+    photo = find_photo_by_id(transaction_session, photo_uuid)
+    if photo is None:
+        abort(404)
+
+    # Search cost grows steeply with the radius, the setting is the upper limit
+    max_distance = get_app_data_val(transaction_session, AppDataField.NEAR_DUPLICATE_MAX_DISTANCE)
+    requested_distance = SimilarPhotosRequest.get_max_distance(request)
+    if requested_distance is not None:
+        max_distance = min(requested_distance, max_distance)
+
+    similar = near_duplicate_service.find_similar_photos(transaction_session, photo, max_distance)
+    photos_by_id = {p.id: p for p in find_photos_by_ids(transaction_session, [photo_id for photo_id, _ in similar])}
+    photos_resp = [SimilarPhoto.to_resp(photos_by_id[photo_id], distance) for photo_id, distance in similar
+                   if photo_id in photos_by_id]
+    return SimilarPhotosResponse.to_resp(photos_resp)
+
+@photo_api.route("/near-duplicates", methods=["POST"])
+@photo_api.arguments(NearDuplicatesRequest, location="json")
+@photo_api.response(200, NearDuplicateClustersResponse)
+@photo_api.alt_response(400)
+@read_only
+def get_near_duplicates(request: dict):
+    # Clusters are computed by RebuildNearDuplicatesTask after each scan, see /near-duplicates/rebuild
+    transaction_session = getattr(g, "transaction_session", None)
+    clusters_per_page: int = get_app_data_val(transaction_session, AppDataField.NEAR_DUPLICATE_CLUSTERS_PAGINATION_COUNT)
+    page: int = PaginationRequest.get_page(NearDuplicatesRequest.get_pagination(request))
+
+    page_clusters = find_cluster_page(transaction_session, page - 1, clusters_per_page)
+
+    # One query for all photos on the page
+    photos_by_id = {p.id: p for p in find_photos_by_ids(transaction_session, [pid for c in page_clusters for pid in c])}
+    clusters_resp = [NearDuplicateCluster.to_resp([photos_by_id[pid] for pid in c if pid in photos_by_id])
+                     for c in page_clusters]
+
+    clusters_count = cluster_count(transaction_session)
+    has_next_page = page * clusters_per_page < clusters_count
+    page_count = (clusters_count + clusters_per_page - 1) // clusters_per_page
+    pagination_resp = PaginationResponse.to_resp(page, clusters_count, page_count, has_next_page)
+    return NearDuplicateClustersResponse.to_resp(clusters_resp, pagination_resp)
+
+@photo_api.route("/near-duplicates/rebuild", methods=["POST"])
+@photo_api.response(200, TaskStatusResponse)
+def rebuild_near_duplicates():
+    transaction_session = getattr(g, "transaction_session", None)
+    oh_task = RebuildNearDuplicatesTask()
+    oh_task.profile = is_profiling_requested()
+    task_id = task_service.create_task(oh_task)
+    return TaskStatusResponse.to_resp(find_task_by_id(transaction_session, task_id))
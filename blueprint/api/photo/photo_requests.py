@@ -1,6 +1,30 @@
+from typing import Dict, Optional
+from uuid import UUID
+
 from marshmallow import Schema, fields, validate
 
+from blueprint.transfer.pagination_to import PaginationRequest
 from domain.cursor_direction import CursorDirection
 from domain.ordering_type import OrderingType
 
 
+class SimilarPhotosRequest(Schema):
+    photo_id = fields.Str(required=True, load_only=True)
+    max_distance = fields.Int(required=False, load_only=True, validate=validate.Range(min=0, max=32),
+                              metadata={"description": "Capped at the NEAR_DUPLICATE_MAX_DISTANCE setting"})
+
+    @staticmethod
+    def get_photo_id(request: Dict) -> UUID:
+        return UUID(request.get("photo_id"))
+
+    @staticmethod
+    def get_max_distance(request: Dict) -> Optional[int]:
+        return request.get("max_distance")
+
+
+class NearDuplicatesRequest(Schema):
+    pagination = fields.Nested(PaginationRequest, many=False, required=True, load_only=True)
+
+    @staticmethod
+    def get_pagination(request: Dict) -> Dict:
+        return request.get("pagination")
@@ -1,6 +1,8 @@
 from typing import List
-from marshmallow import Schema, fields
+from marshmallow import Schema, fields, validate
+from blueprint.transfer.pagination_to import PaginationResponse
 from dbe.photo import Photo
+from domain.thumbnail_level import ThumbnailLevel
 
 class PhotoResponse(Schema):
     id = fields.Str(required=True, dump_only=True)
@@ -9,6 +11,9 @@ class PhotoResponse(Schema):
     width = fields.Int(required=True, dump_only=True)
     height = fields.Int(required=True, dump_only=True)
     use_thumbnail = fields.Bool(required=True, dump_only=True)
+    thumbnail_level = fields.Str(required=True, dump_only=True,
+                                 validate=validate.OneOf([e.name for e in ThumbnailLevel]),
+                                 metadata={"description": "EMBEDDED - camera thumbnail until rendition is generated"})
     preview_color_hex = fields.Str(required=True, dump_only=True)
 
     @staticmethod
@@ -17,8 +22,43 @@ class PhotoResponse(Schema):
         if photo.metadata_index is not None:
             photo_base["width"] = photo.metadata_index.width
             photo_base["height"] = photo.metadata_index.height
-            photo_base["use_thumbnail"] = photo.metadata_index.use_thumbnail
+            photo_base["use_thumbnail"] = photo.metadata_index.thumbnail_level != ThumbnailLevel.NONE
+            photo_base["thumbnail_level"] = photo.metadata_index.thumbnail_level.name
             photo_base["preview_color_hex"] = photo.metadata_index.preview_color_hex
             if photo.metadata_index.photo_created is not None:
                 photo_base["created_date"] = photo.metadata_index.photo_created
         return photo_base
+
+
+class SimilarPhoto(Schema):
+    photo = fields.Nested(PhotoResponse, many=False, required=True)
+    distance = fields.Int(required=True, metadata={"description": "Hamming distance of perceptual hashes"})
+
+    @staticmethod
+    def to_resp(photo: Photo, distance: int):
+        return {"photo": PhotoResponse.to_resp(photo), "distance": distance}
+
+
+class SimilarPhotosResponse(Schema):
+    photos = fields.Nested(SimilarPhoto, many=True, required=True)
+
+    @staticmethod
+    def to_resp(photos: List[SimilarPhoto]):
+        return {"photos": photos}
+
+
+class NearDuplicateCluster(Schema):
+    photos = fields.Nested(PhotoResponse, many=True, required=True)
+
+    @staticmethod
+    def to_resp(photos: List[Photo]):
+        return {"photos": [PhotoResponse.to_resp(p) for p in photos]}
+
+
+class NearDuplicateClustersResponse(Schema):
+    clusters = fields.Nested(NearDuplicateCluster, many=True, required=True)
+    pagination = fields.Nested(PaginationResponse, many=False, required=True)
+
+    @staticmethod
+    def to_resp(clusters: List[NearDuplicateCluster], pagination: PaginationResponse):
+        return {"clusters": clusters, "pagination": pagination}
@@ -0,0 +1,46 @@
+from flask import g, abort
+from flask_smorest import Blueprint
+
+from blueprint.api.photo.photo_responses import PhotoResponse
+from blueprint.api.search.search_requests import SearchPhotosRequest
+from blueprint.api.search.search_responses import SearchPhotosResponse, FacetResponse
+from blueprint.transfer.pagination_to import PaginationRequest, PaginationResponse
+from blueprint.request_session import read_only
+from dbe.app_data import get_app_data_val
+from domain.app_data_field import AppDataField
+from service import search_service
+
+search_api = Blueprint("search", __name__, url_prefix="/search")
+
+
+@search_api.route("/photos", methods=["POST"])
+@search_api.arguments(SearchPhotosRequest, location="json")
+@search_api.response(200, SearchPhotosResponse)
+@search_api.alt_response(400)
+@read_only
+def search_photos(request: dict):
+    try:
+        criteria = SearchPhotosRequest.get_criteria(request)
+        facets = SearchPhotosRequest.get_facets(request)
+    except (ValueError, KeyError):
+        abort(400)
+
+    transaction_session = getattr(g, "transaction_session", None)
+    photos_per_page: int = get_app_data_val(transaction_session, AppDataField.SEARCH_PHOTOS_PAGINATION_COUNT)
+    facet_values_count: int = get_app_data_val(transaction_session, AppDataField.SEARCH_FACET_VALUES_COUNT)
+    page: int = PaginationRequest.get_page(SearchPhotosRequest.get_pagination(request))
+
+    try:
+        photos = search_service.search_photos(transaction_session, criteria, page - 1, photos_per_page)
+        photos_count = search_service.search_photos_count(transaction_session, criteria)
+        facet_counts = search_service.count_facets(transaction_session, criteria, facets, facet_values_count)
+    except ValueError:
+        abort(400)
+
+    has_next_page = page * photos_per_page < photos_count
+    page_count = (photos_count + photos_per_page - 1) // photos_per_page
+
+    pagination_resp = PaginationResponse.to_resp(page, photos_count, page_count, has_next_page)
+    photos_resp = [PhotoResponse.to_resp(p) for p in photos]
+    facets_resp = [FacetResponse.to_resp(facet, values) for facet, values in facet_counts.items()]
+    return SearchPhotosResponse.to_resp(photos_resp, facets_resp, pagination_resp)
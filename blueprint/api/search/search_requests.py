@@ -0,0 +1,79 @@
+from typing import Dict, List, Optional
+
+from marshmallow import Schema, fields, validate
+
+from blueprint.transfer.pagination_to import PaginationRequest
+from domain.metadata.metadata_id import MetadataId
+from domain.metadata_index_type import MetadataIndexType
+from domain.search.search_criteria import SearchCriteria
+from domain.search.search_facet import SearchFacet
+from domain.search.search_operator import SearchOperator
+from domain.search.search_predicate import SearchPredicate
+
+
+class MetadataPredicateRequest(Schema):
+    g0 = fields.Str(required=True, load_only=True)
+    g1 = fields.Str(required=False, load_only=True, metadata={"description": "When missing, g0 tags and all g1 groups are searched"})
+    path = fields.Str(required=False, load_only=True)
+    tag_name = fields.Str(required=True, load_only=True)
+    operator = fields.Str(
+        required=True,
+        load_only=True,
+        validate=validate.OneOf([e.name for e in SearchOperator])
+    )
+    value = fields.Raw(required=False, load_only=True, metadata={"description": "EQ value"})
+    value_from = fields.Raw(required=False, load_only=True, metadata={"description": "RANGE lower bound, inclusive"})
+    value_to = fields.Raw(required=False, load_only=True, metadata={"description": "RANGE upper bound, inclusive"})
+
+    @staticmethod
+    def get_predicate(request: Dict) -> SearchPredicate:
+        metadata_id = MetadataId(request.get("g0"), request.get("g1"), request.get("tag_name"), path=request.get("path"))
+        operator = SearchOperator[request.get("operator")]
+        if operator == SearchOperator.EQ and request.get("value") is None:
+            raise ValueError("EQ predicate needs a value")
+        return SearchPredicate(metadata_id, operator, request.get("value"), request.get("value_from"), request.get("value_to"))
+
+
+class SearchCriteriaRequest(Schema):
+    type = fields.Str(
+        required=False,
+        load_only=True,
+        load_default=MetadataIndexType.EXIF.value,
+        validate=validate.OneOf([e.value for e in MetadataIndexType])
+    )
+    predicates = fields.Nested(MetadataPredicateRequest, many=True, required=False, load_only=True)
+    camera_make = fields.Str(required=False, load_only=True)
+    camera_model = fields.Str(required=False, load_only=True)
+    lens_model = fields.Str(required=False, load_only=True)
+    created_from = fields.DateTime(required=False, load_only=True)
+    created_to = fields.DateTime(required=False, load_only=True, metadata={"description": "Exclusive"})
+
+    @staticmethod
+    def get_criteria(request: Dict) -> SearchCriteria:
+        criteria = SearchCriteria()
+        criteria.index_type = MetadataIndexType(request.get("type"))
+        criteria.predicates = [MetadataPredicateRequest.get_predicate(p) for p in request.get("predicates", [])]
+        for facet in SearchFacet:
+            value: Optional[str] = request.get(facet.value)
+            if value is not None:
+                criteria.facet_values[facet] = value
+        criteria.created_from = request.get("created_from")
+        criteria.created_to = request.get("created_to")
+        return criteria
+
+
+class SearchPhotosRequest(SearchCriteriaRequest):
+    facets = fields.List(
+        fields.Str(validate=validate.OneOf([e.name for e in SearchFacet])),
+        required=False,
+        load_only=True
+    )
+    pagination = fields.Nested(PaginationRequest, many=False, required=True, load_only=True)
+
+    @staticmethod
+    def get_facets(request: Dict) -> List[SearchFacet]:
+        return [SearchFacet[f] for f in request.get("facets", [])]
+
+    @staticmethod
+    def get_pagination(request: Dict) -> Dict:
+        return request.get("pagination")
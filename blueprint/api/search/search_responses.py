@@ -0,0 +1,31 @@
+from typing import List, Tuple
+
+from marshmallow import Schema, fields
+
+from blueprint.api.photo.photo_responses import PhotoResponse
+from blueprint.transfer.pagination_to import PaginationResponse
+from domain.search.search_facet import SearchFacet
+
+
+class FacetValue(Schema):
+    value = fields.Str(required=True, dump_only=True)
+    count = fields.Int(required=True, dump_only=True)
+
+
+class FacetResponse(Schema):
+    facet = fields.Str(required=True, dump_only=True)
+    values = fields.Nested(FacetValue, many=True, required=True)
+
+    @staticmethod
+    def to_resp(facet: SearchFacet, values: List[Tuple[str, int]]):
+        return {"facet": facet.name, "values": [{"value": value, "count": count} for value, count in values]}
+
+
+class SearchPhotosResponse(Schema):
+    photos = fields.Nested(PhotoResponse, many=True, required=True)
+    facets = fields.Nested(FacetResponse, many=True, required=True)
+    pagination = fields.Nested(PaginationResponse, many=False, required=True)
+
+    @staticmethod
+    def to_resp(photos: List[PhotoResponse], facets: List[FacetResponse], pagination: PaginationResponse):
+        return {"photos": photos, "facets": facets, "pagination": pagination}
@@ -0,0 +1,13 @@
+from flask_smorest import Blueprint
+
+import database
+from blueprint.api.settings.database.database_responses import PoolStatusResponse
+
+
+database_api = Blueprint("database", __name__, url_prefix="/database")
+
+@database_api.route("/pool", methods=["GET"])
+@database_api.response(200, PoolStatusResponse)
+def get_pool_status():
+    """Connection pool of the web worker process that handles this request."""
+    return PoolStatusResponse.to_resp(database.pool_status())
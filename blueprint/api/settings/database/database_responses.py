@@ -0,0 +1,18 @@
+from typing import Dict
+
+from marshmallow import Schema, fields
+
+
+class PoolStatusResponse(Schema):
+    pool = fields.Str(required=True, dump_only=True)
+    checkouts = fields.Int(required=True, dump_only=True)
+    timeouts = fields.Int(required=True, dump_only=True, metadata={"description": "Checkouts that gave up waiting"})
+    wait_seconds = fields.Float(required=True, dump_only=True, metadata={"description": "Total checkout wait"})
+    max_wait_seconds = fields.Float(required=True, dump_only=True)
+    size = fields.Int(required=False, dump_only=True)
+    checked_out = fields.Int(required=False, dump_only=True)
+    overflow = fields.Int(required=False, dump_only=True)
+
+    @staticmethod
+    def to_resp(status: Dict):
+        return status
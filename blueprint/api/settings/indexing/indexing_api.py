@@ -2,6 +2,7 @@ from flask import g
 from flask_smorest import Blueprint
 
 from blueprint.api.task.task_responses import TaskStatusResponse
+from blueprint.request_profiling import is_profiling_requested
 from service.task_service import task_service
 from service.task.implementation.update_collection_task import RunScanAndIndexingTask
 from dbe.task import find_by_id as find_task_by_id
@@ -14,6 +15,7 @@ indexing_api = Blueprint("indexing", __name__, url_prefix="/indexing")
 def run_scan_indexing():
     transaction_session = getattr(g, "transaction_session", None)
     oh_task = RunScanAndIndexingTask()
+    oh_task.profile = is_profiling_requested()
     task_id = task_service.create_task(oh_task)
     db_task = find_task_by_id(transaction_session, task_id)
     return TaskStatusResponse.to_resp(db_task)
\ No newline at end of file
@@ -0,0 +1,38 @@
+import os
+from uuid import UUID
+
+from flask import abort, send_file, Response
+from flask_smorest import Blueprint
+
+from service import profiling_service
+
+profile_api = Blueprint("profile", __name__, url_prefix="/profile")
+
+
+def _profile_path(profile_id: str) -> str:
+    try:
+        profile_uuid = UUID(profile_id)
+    except ValueError:
+        abort(400)
+    file_path = profiling_service.get_profile_path(profile_uuid)
+    if not os.path.isfile(file_path):
+        abort(404)
+    return file_path
+
+@profile_api.route("/<profile_id>", methods=["GET"])
+@profile_api.response(200)
+@profile_api.alt_response(404)
+@profile_api.alt_response(400)
+def download_profile(profile_id: str):
+    """Profile of a request (X-Profile-Id response header) or a task (task id) in pstats format."""
+    file_path = _profile_path(profile_id)
+    return send_file(file_path, mimetype="application/octet-stream", as_attachment=True,
+                     download_name=os.path.basename(file_path))
+
+@profile_api.route("/<profile_id>/summary", methods=["GET"])
+@profile_api.response(200)
+@profile_api.alt_response(404)
+@profile_api.alt_response(400)
+def get_profile_summary(profile_id: str):
+    """Slowest functions by cumulative time, as plain text."""
+    return Response(profiling_service.get_summary(_profile_path(profile_id)), mimetype="text/plain")
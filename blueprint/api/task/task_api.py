@@ -1,8 +1,9 @@
 from flask import g, Response
 from flask_smorest import Blueprint
 
-from blueprint.api.task.task_responses import TaskStatusResponse, ListTasksResponse, TaskLog, TaskLogs
+from blueprint.api.task.task_responses import TaskStatusResponse, ListTasksResponse, TaskLog, TaskLogs, TaskMetrics
 from blueprint.api.api_utils import task_by_id
+from blueprint.request_session import read_only
 from dbe.task_log import find_by_task_id as find_task_logs_by_task_id
 from dbe.task import Task, get_all as list_all_tasks
 
@@ -10,6 +11,7 @@ task_api = Blueprint("task", __name__, url_prefix="/task")
 
 @task_api.route("/", methods=["GET"])
 @task_api.response(200, ListTasksResponse)
+@read_only
 def list_tasks():
     transaction_session = getattr(g, "transaction_session", None)
     tasks = list_all_tasks(transaction_session)
@@ -20,6 +22,7 @@ def list_tasks():
 @task_api.response(200, TaskStatusResponse)
 @task_api.alt_response(404)
 @task_api.alt_response(400)
+@read_only
 def get_task_status(task_id: str):
     task: Task = task_by_id(task_id)
     return TaskStatusResponse.to_resp(task)
@@ -44,10 +47,20 @@ def delete_task(task_id: str):
 @task_api.response(200, TaskLogs)
 @task_api.alt_response(404)
 @task_api.alt_response(400)
+@read_only
 def get_logs(task_id: str):
     transaction_session = getattr(g, "transaction_session", None)
     task: Task = task_by_id(task_id)
     task_logs = find_task_logs_by_task_id(transaction_session, task.id)
 
     logs_resp = [TaskLog.to_resp(l) for l in task_logs]
-    return TaskLogs.to_resp(task, logs_resp)
\ No newline at end of file
+    return TaskLogs.to_resp(task, logs_resp)
+
+@task_api.route("/<task_id>/metrics", methods=["GET"])
+@task_api.response(200, TaskMetrics)
+@task_api.alt_response(404)
+@task_api.alt_response(400)
+@read_only
+def get_metrics(task_id: str):
+    task: Task = task_by_id(task_id)
+    return TaskMetrics.to_resp(task)
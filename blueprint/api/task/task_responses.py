@@ -57,4 +57,22 @@ class TaskLogs(Schema):
 
     @staticmethod
     def to_resp(task: Task, task_logs: List[TaskLog]):
-        return {"task_id": str(task.id), "logs": task_logs}
\ No newline at end of file
+        return {"task_id": str(task.id), "logs": task_logs}
+
+class TaskTimer(Schema):
+    count = fields.Int(required=True, dump_only=True)
+    sum_ms = fields.Float(required=True, dump_only=True)
+    min_ms = fields.Float(required=False, dump_only=True, allow_none=True)
+    max_ms = fields.Float(required=False, dump_only=True, allow_none=True)
+    buckets = fields.Dict(keys=fields.Str(), values=fields.Int(), required=True, dump_only=True,
+                          metadata={"description": "Upper bound in ms (or inf) -> count, empty buckets are left out"})
+
+class TaskMetrics(Schema):
+    task_id = fields.Str(required=True)
+    timers = fields.Dict(keys=fields.Str(), values=fields.Nested(TaskTimer), required=True)
+    counters = fields.Dict(keys=fields.Str(), values=fields.Int(), required=True)
+
+    @staticmethod
+    def to_resp(task: Task):
+        metrics = task.metrics or {}
+        return {"task_id": str(task.id), "timers": metrics.get("timers", {}), "counters": metrics.get("counters", {})}
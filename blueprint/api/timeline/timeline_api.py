@@ -0,0 +1,27 @@
+from flask import g, abort
+from flask_smorest import Blueprint
+
+from blueprint.api.timeline.timeline_requests import GetTimelineRequest
+from blueprint.api.timeline.timeline_responses import TimelineResponse
+from blueprint.request_session import read_only
+from dbe.photo_timeline import find_histogram
+
+timeline_api = Blueprint("timeline", __name__, url_prefix="/timeline")
+
+
+@timeline_api.route("/", methods=["POST"])
+@timeline_api.arguments(GetTimelineRequest, location="json")
+@timeline_api.response(200, TimelineResponse)
+@timeline_api.alt_response(400)
+@read_only
+def get_timeline(request: dict):
+    try:
+        folder_uuid = GetTimelineRequest.get_folder_id(request)
+        granularity = GetTimelineRequest.get_granularity(request)
+    except (ValueError, KeyError):
+        abort(400)
+
+    transaction_session = getattr(g, "transaction_session", None)
+    buckets = find_histogram(transaction_session, folder_uuid, granularity,
+                             GetTimelineRequest.get_date_from(request), GetTimelineRequest.get_date_to(request))
+    return TimelineResponse.to_resp(granularity, buckets)
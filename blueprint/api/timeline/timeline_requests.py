@@ -0,0 +1,36 @@
+from datetime import date
+from typing import Dict, Optional
+from uuid import UUID
+
+from marshmallow import Schema, fields, validate
+
+from dbe.folder import ROOT_FOLDER_ID
+from domain.timeline_granularity import TimelineGranularity
+
+
+class GetTimelineRequest(Schema):
+    folder_id = fields.Str(required=False, load_only=True, metadata={"description": "Subtree root, whole collection when missing"})
+    granularity = fields.Str(
+        required=True,
+        load_only=True,
+        validate=validate.OneOf([e.name for e in TimelineGranularity])
+    )
+    date_from = fields.Date(required=False, load_only=True)
+    date_to = fields.Date(required=False, load_only=True, metadata={"description": "Exclusive"})
+
+    @staticmethod
+    def get_folder_id(request: Dict) -> UUID:
+        folder_id = request.get("folder_id")
+        return ROOT_FOLDER_ID if folder_id is None else UUID(folder_id)
+
+    @staticmethod
+    def get_granularity(request: Dict) -> TimelineGranularity:
+        return TimelineGranularity[request.get("granularity")]
+
+    @staticmethod
+    def get_date_from(request: Dict) -> Optional[date]:
+        return request.get("date_from")
+
+    @staticmethod
+    def get_date_to(request: Dict) -> Optional[date]:
+        return request.get("date_to")
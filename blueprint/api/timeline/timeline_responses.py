@@ -0,0 +1,23 @@
+from datetime import date
+from typing import List, Tuple
+
+from marshmallow import Schema, fields, validate
+
+from domain.timeline_granularity import TimelineGranularity
+
+
+class TimelineBucket(Schema):
+    date = fields.Date(required=True, dump_only=True, metadata={"description": "First day of the bucket"})
+    count = fields.Int(required=True, dump_only=True)
+
+
+class TimelineResponse(Schema):
+    granularity = fields.Str(required=True, dump_only=True, validate=validate.OneOf([e.name for e in TimelineGranularity]))
+    total = fields.Int(required=True, dump_only=True)
+    buckets = fields.Nested(TimelineBucket, many=True, required=True)
+
+    @staticmethod
+    def to_resp(granularity: TimelineGranularity, buckets: List[Tuple[date, int]]):
+        return {"granularity": granularity.name,
+                "total": sum(count for _, count in buckets),
+                "buckets": [{"date": bucket_date, "count": count} for bucket_date, count in buckets]}
@@ -0,0 +1,22 @@
+from typing import Any
+
+from flask.json.provider import DefaultJSONProvider
+
+from service import json_service
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider using json_service backend (orjson if installed) for API responses."""
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        indent = kwargs.pop("indent", None) is not None
+        kwargs.pop("separators", None)
+        if kwargs:
+            # Caller asked for json.dumps specific options
+            return super().dumps(obj, indent=2 if indent else None, **kwargs)
+        return json_service.dumps(obj, default=self.default, sort_keys=self.sort_keys, indent=indent)
+
+    def loads(self, s: str | bytes, **kwargs: Any) -> Any:
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return json_service.loads(s)
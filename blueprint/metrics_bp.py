@@ -0,0 +1,12 @@
+from flask import Blueprint, Response
+
+from service import metrics_service
+
+# Outside /api, Prometheus scrapes /metrics by default
+metrics_bp = Blueprint("metrics", __name__)
+
+
+@metrics_bp.route("/metrics", methods=["GET"])
+def get_metrics():
+    """Metrics of all gunicorn workers and task processes in Prometheus text format."""
+    return Response(metrics_service.collect(), mimetype="text/plain; version=0.0.4")
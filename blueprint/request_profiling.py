@@ -0,0 +1,43 @@
+import logging
+from uuid import uuid4
+
+from flask import g, request
+
+import pc_configuration
+from service import profiling_service
+from vial.config import app_config
+
+PROFILE_HEADER = "X-Profile"
+PROFILE_ID_HEADER = "X-Profile-Id"
+PROFILE_QUERY_ARG = "profile"
+_TRUE_VALUES = {"1", "true", "yes"}
+
+logger = logging.getLogger()
+
+
+def is_profiling_requested() -> bool:
+    """Request asked for profiling and profiling is enabled in config.json (there is no admin role)."""
+    if not app_config.get(pc_configuration.PROFILING_ENABLED):
+        return False
+    value = request.headers.get(PROFILE_HEADER) or request.args.get(PROFILE_QUERY_ARG) or ""
+    return value.lower() in _TRUE_VALUES
+
+def start_request_profile():
+    if is_profiling_requested():
+        g.profile_id = uuid4()
+        g.profiler = profiling_service.start_profile()
+
+def finish_request_profile(response=None):
+    """
+    Saves the profile of this request and returns its id in X-Profile-Id. Streamed bodies aren't included.
+    Without response (request failed) the profile is still saved, its id is logged.
+    """
+    profiler = getattr(g, "profiler", None)
+    if profiler is None:
+        return
+    g.profiler = None
+    profiling_service.save_profile(profiler, g.profile_id)
+    if response is not None:
+        response.headers[PROFILE_ID_HEADER] = str(g.profile_id)
+    else:
+        logger.info(f"Profile {g.profile_id} of failed request {request.path} saved")
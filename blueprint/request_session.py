@@ -0,0 +1,94 @@
+import time
+from typing import Callable, Optional
+
+from flask import g, has_app_context
+from sqlalchemy import event, text, Engine
+from sqlalchemy.orm import Session
+
+import pc_configuration
+from database import DBSession
+from vial.config import app_config
+
+
+class LazySession:
+    """
+    Stands in for the request's DBSession in g.transaction_session. The session (and connection) is created
+    on first use, so requests that never query - static files, thumbnails - don't touch the database.
+    Read-only sessions run in READ ONLY transaction and are never committed.
+    """
+
+    def __init__(self, read_only: bool):
+        self.read_only = read_only
+        self._session: Optional[Session] = None
+
+    @property
+    def started(self) -> bool:
+        return self._session is not None
+
+    def __getattr__(self, name):
+        # Only called for attributes not found on LazySession, i.e. Session API
+        if self._session is None:
+            self._session = DBSession()
+            if self.read_only:
+                # Must be the first statement of the transaction
+                self._session.execute(text("SET TRANSACTION READ ONLY"))
+            statement_timeout = app_config.get(pc_configuration.DB_STATEMENT_TIMEOUT_MS)
+            if statement_timeout > 0:
+                # Transaction scoped, so it doesn't leak to tasks or through PgBouncer
+                self._session.execute(text(f"SET LOCAL statement_timeout = {int(statement_timeout)}"))
+        return getattr(self._session, name)
+
+    def finish(self, status_code: int = 200):
+        """
+        Commits writable session of a successful response. Read-only session and session of an error response
+        (abort after a partial write) are rolled back. Raises if the commit fails.
+        """
+        if self._session is None:
+            return
+        try:
+            if self.read_only or status_code >= 400:
+                self._session.rollback()
+            else:
+                self._session.commit()
+        except BaseException:
+            self._session.rollback()
+            raise
+        finally:
+            self._session.close()
+            self._session = None
+
+
+def read_only(func: Callable) -> Callable:
+    """
+    Marks endpoint that only reads from the database. Use as the innermost decorator (right above def),
+    flask-smorest decorators copy the mark to their wrappers.
+    """
+    func.read_only = True
+    return func
+
+def is_read_only(view_function: Optional[Callable]) -> bool:
+    return getattr(view_function, "read_only", False)
+
+
+# Request timing - DB time is the sum of cursor executions of the request thread, reported in Server-Timing
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_start"].pop()
+    # Tasks and the scan run outside of Flask app context
+    if has_app_context() and "db_time" in g:
+        g.db_time += elapsed
+        g.db_queries += 1
+
+def start_timing():
+    g.request_start = time.perf_counter()
+    g.db_time = 0.0
+    g.db_queries = 0
+
+def server_timing() -> str:
+    total = time.perf_counter() - g.request_start
+    return f'db;dur={g.db_time * 1000:.1f};desc="{g.db_queries} queries", total;dur={total * 1000:.1f}'
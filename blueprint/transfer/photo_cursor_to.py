@@ -0,0 +1,58 @@
+from datetime import datetime
+from typing import Dict, List, Optional
+from uuid import UUID
+
+from marshmallow import Schema, fields, validate
+
+from blueprint.api.photo.photo_responses import PhotoResponse
+from dbe.photo import Photo
+from domain.cursor_direction import CursorDirection
+
+
+class PhotoCursorRequest(Schema):
+    """Keyset cursor over (created date DESC NULLS LAST, photo id DESC), see dbe.photo.created_keyset_page"""
+    direction = fields.Str(
+        required=True,
+        load_only=True,
+        validate=validate.OneOf([e.name for e in CursorDirection])
+    )
+    created_date = fields.DateTime(required=False, load_only=True, allow_none=True) # first breaker
+    photo_id = fields.Str(required=True, load_only=True) # second tie-breaker
+
+    @staticmethod
+    def get_direction(request: Dict) -> CursorDirection:
+        return CursorDirection[request.get("direction")]
+
+    @staticmethod
+    def get_created_date(request: Dict) -> Optional[datetime]:
+        return request.get("created_date")
+
+    @staticmethod
+    def get_photo_id(request: Dict) -> UUID:
+        return UUID(request.get("photo_id"))
+
+
+class PhotoCursorResponse(Schema):
+    created_date = fields.DateTime(required=False, dump_only=True)
+    photo_id = fields.Str(required=True, dump_only=True)
+
+    @staticmethod
+    def to_resp(photo: Photo):
+        cursor = {"photo_id": str(photo.id)}
+        if photo.metadata_index is not None and photo.metadata_index.photo_created is not None:
+            cursor["created_date"] = photo.metadata_index.photo_created
+        return cursor
+
+
+class PhotoCursorPageResponse(Schema):
+    photos = fields.Nested(PhotoResponse, many=True, required=True)
+    first = fields.Nested(PhotoCursorResponse, required=False, metadata={"description": "Cursor for BEFORE"})
+    last = fields.Nested(PhotoCursorResponse, required=False, metadata={"description": "Cursor for AFTER"})
+
+    @staticmethod
+    def to_resp(photos: List[Photo]):
+        resp = {"photos": [PhotoResponse.to_resp(p) for p in photos]}
+        if len(photos) > 0:
+            resp["first"] = PhotoCursorResponse.to_resp(photos[0])
+            resp["last"] = PhotoCursorResponse.to_resp(photos[-1])
+        return resp
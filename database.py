@@ -1,9 +1,94 @@
-from sqlalchemy import create_engine
+import os
+import threading
+import time
+from typing import Dict
+
+from sqlalchemy import create_engine, Engine
 from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.pool import NullPool, QueuePool
 
 from vial.config import app_config
 import pc_configuration
+from service import json_service
+
+
+class PoolMetrics:
+    """Counters of connection checkouts of this process, kept across pool recreation (dispose)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    def record(self, wait_seconds: float, timed_out: bool):
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.wait_seconds += wait_seconds
+            self.max_wait_seconds = max(self.max_wait_seconds, wait_seconds)
+
+
+pool_metrics = PoolMetrics()
+
+
+class MeteredQueuePool(QueuePool):
+    """QueuePool measuring how long checkouts wait for a free connection (including opening a new one)."""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except BaseException:
+            pool_metrics.record(time.perf_counter() - start, True)
+            raise
+        pool_metrics.record(time.perf_counter() - start, False)
+        return connection
+
+
+def create_db_engine() -> Engine:
+    """
+    Engine configured from config.json. In PgBouncer mode pooling is left to PgBouncer (NullPool),
+    so no idle connections are held per process and nothing relies on session state between transactions.
+    """
+    # JSONB columns are (de)serialized with the same backend as exiftool output and API responses
+    options = {"json_serializer": json_service.dumps, "json_deserializer": json_service.loads}
+    if app_config.get(pc_configuration.DB_PGBOUNCER):
+        options["poolclass"] = NullPool
+    else:
+        options["poolclass"] = MeteredQueuePool
+        options["pool_size"] = app_config.get(pc_configuration.DB_POOL_SIZE)
+        options["max_overflow"] = app_config.get(pc_configuration.DB_POOL_MAX_OVERFLOW)
+        options["pool_timeout"] = app_config.get(pc_configuration.DB_POOL_TIMEOUT)
+        options["pool_recycle"] = app_config.get(pc_configuration.DB_POOL_RECYCLE)
+        options["pool_pre_ping"] = app_config.get(pc_configuration.DB_POOL_PRE_PING)
+    return create_engine(app_config.get(pc_configuration.DB_CONNECTION_STRING), **options)
+
+def dispose_after_fork():
+    """
+    Drops connections inherited from the parent process without closing them, the parent still uses them.
+    New connections are opened on first checkout in this process.
+    """
+    engine.dispose(close=False)
+
+def pool_status() -> Dict:
+    status = {"pool": engine.pool.__class__.__name__,
+              "checkouts": pool_metrics.checkouts,
+              "timeouts": pool_metrics.timeouts,
+              "wait_seconds": pool_metrics.wait_seconds,
+              "max_wait_seconds": pool_metrics.max_wait_seconds}
+    if isinstance(engine.pool, QueuePool):
+        status["size"] = engine.pool.size()
+        status["checked_out"] = engine.pool.checkedout()
+        status["overflow"] = engine.pool.overflow()
+    return status
+
 
-engine = create_engine(app_config.get(pc_configuration.DB_CONNECTION_STRING))
+engine = create_db_engine()
 DBSession = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
+# Task processes are forked by the forkserver, gunicorn workers may be forked after import (preload_app)
+os.register_at_fork(after_in_child=dispose_after_fork)
@@ -1,34 +1,113 @@
+import logging
+import threading
 import uuid
-from typing import Optional
+from typing import Optional, Dict, Any
 
+from sqlalchemy import select, update, BigInteger, event
 from sqlalchemy.orm import mapped_column, Mapped, Session
 
 from database import Base
 from domain.app_data_field import AppDataField
 
+logger = logging.getLogger()
+
+APP_DATA_VERSION_ID = 1
+# Version seen by the session, so one transaction checks it once. Dropped when the transaction ends.
+_SESSION_VERSION_KEY = "app_data_version"
+# Set while the session has an uncommitted version bump, its values mustn't get to the process cache
+_SESSION_CHANGED_KEY = "app_data_changed"
+
 
 class AppData(Base):
     __tablename__ = "app_data"
 
     id: Mapped[uuid.UUID] = mapped_column(primary_key=True, default=uuid.uuid4)
-    field_name: Mapped[str]
+    field_name: Mapped[str] = mapped_column(unique=True)
     field_value: Mapped[Optional[str]]
 
+
+class AppDataVersion(Base):
+    """Single row counter bumped on every app_data change, processes reload their cache when it differs."""
+    __tablename__ = "app_data_version"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    version: Mapped[int] = mapped_column(BigInteger)
+
+
+class _AppDataCache:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.version: Optional[int] = None
+        self.values: Dict[str, Any] = dict()
+
+
+_cache = _AppDataCache()
+
+
 def get_app_data_val(session: Session, app_data_field: AppDataField):
-    app_data = session.query(AppData).filter_by(field_name=app_data_field.name).first()
-    if app_data is None:
+    values = _get_values(session)
+    if app_data_field.name not in values:
         return app_data_field.default_value
-    if app_data.field_value is None:
-        return None
-    return app_data_field.parse(app_data.field_value)
+    return values[app_data_field.name]
 
 def set_app_data_value(session: Session, app_data_field: AppDataField, value):
     app_data = session.query(AppData).filter_by(field_name=app_data_field.name).first()
     if app_data is not None:
-        app_data.field_value = str(value)
+        app_data.field_value = app_data_field.format(value)
     else:
         app_data = AppData()
         app_data.field_name = app_data_field.name
-        app_data.field_value = str(value)
+        app_data.field_value = app_data_field.format(value)
         session.add(app_data)
-        session.flush()
\ No newline at end of file
+    session.flush()
+    _increment_version(session)
+
+def _get_values(session: Session) -> Dict[str, Any]:
+    if session.info.get(_SESSION_CHANGED_KEY):
+        return _load_values(session)
+    version = session.info.get(_SESSION_VERSION_KEY)
+    if version is None:
+        version = session.scalar(select(AppDataVersion.version).where(AppDataVersion.id == APP_DATA_VERSION_ID)) or 0
+        session.info[_SESSION_VERSION_KEY] = version
+    with _cache.lock:
+        if _cache.version == version:
+            return _cache.values
+
+    values = _load_values(session)
+    with _cache.lock:
+        _cache.version = version
+        _cache.values = values
+    return values
+
+def _load_values(session: Session) -> Dict[str, Any]:
+    values = dict()
+    for field_name, field_value in session.execute(select(AppData.field_name, AppData.field_value)):
+        app_data_field = AppDataField.__members__.get(field_name)
+        if app_data_field is None:
+            continue
+        try:
+            values[field_name] = None if field_value is None else app_data_field.parse(field_value)
+        except Exception as ex:
+            # One bad row falls back to its default (missing key), other fields still load
+            logger.error(f"Invalid value of app data field {field_name}: {ex}")
+    return values
+
+def _increment_version(session: Session):
+    """Other processes see the new version after commit, this session reloads the values on next read."""
+    updated = session.execute(update(AppDataVersion)
+                              .where(AppDataVersion.id == APP_DATA_VERSION_ID)
+                              .values(version=AppDataVersion.version + 1))
+    if updated.rowcount == 0:
+        session.add(AppDataVersion(id=APP_DATA_VERSION_ID, version=1))
+        session.flush()
+    session.info.pop(_SESSION_VERSION_KEY, None)
+    session.info[_SESSION_CHANGED_KEY] = True
+    with _cache.lock:
+        _cache.version = None
+
+@event.listens_for(Session, "after_commit")
+@event.listens_for(Session, "after_rollback")
+def _forget_version(session: Session):
+    # Long task sessions run many transactions, each one checks the version again
+    session.info.pop(_SESSION_VERSION_KEY, None)
+    session.info.pop(_SESSION_CHANGED_KEY, None)
@@ -6,6 +6,7 @@ from sqlalchemy import ForeignKey, and_, Enum as SAEnum, desc
 from sqlalchemy.orm import Mapped, mapped_column, relationship, Session
 
 from database import Base
+from dbe.folder_stats import FolderStats
 from domain.folder_type import FolderType
 from domain.ordering_type import OrderingType
 
@@ -35,6 +36,8 @@ class Folder(Base):
             validate_strings=True,
         )
     )
+    # Optimistic locking, see Photo.version
+    version: Mapped[int] = mapped_column()
     photos: Mapped[List["Photo"]] = relationship(
         foreign_keys="[Photo.folder_id]",
         back_populates="folder"
@@ -47,6 +50,15 @@ class Folder(Base):
         back_populates="parent",
         cascade="all, delete-orphan"
     )
+    # Loaded with the folder so listings don't need extra queries
+    stats: Mapped[Optional["FolderStats"]] = relationship(
+        "FolderStats",
+        uselist=False,
+        lazy="joined",
+        passive_deletes=True
+    )
+
+    __mapper_args__ = {"version_id_col": version}
 
     def is_limbo(self):
         return self.parent is None and self.id == LIMBO_FOLDER_ID
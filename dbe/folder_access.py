@@ -0,0 +1,34 @@
+from datetime import datetime
+from typing import Dict
+from uuid import UUID
+
+from sqlalchemy import ForeignKey, DateTime, select, func
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Mapped, mapped_column, Session
+
+from database import Base
+from dbe.folder_closure import FolderClosure
+
+
+class FolderAccess(Base):
+    """Last time a folder was viewed through /folder/*, the scan indexes recently viewed folders first."""
+    __tablename__ = "folder_access"
+
+    folder_id: Mapped[UUID] = mapped_column(ForeignKey("folder.id", ondelete="CASCADE"), primary_key=True)
+    accessed: Mapped[datetime] = mapped_column(DateTime)
+
+
+def upsert_access(session: Session, folder_id: UUID, accessed: datetime):
+    upsert = insert(FolderAccess).values(folder_id=folder_id, accessed=accessed)
+    session.execute(upsert.on_conflict_do_update(index_elements=[FolderAccess.folder_id],
+                                                 set_={"accessed": upsert.excluded.accessed}))
+
+def find_accessed_since(session: Session, since: datetime) -> Dict[UUID, datetime]:
+    """Folders accessed since the given time and all their ancestors (the path to them), with the latest access."""
+    rows = session.execute(
+        select(FolderClosure.ancestor_id, func.max(FolderAccess.accessed))
+        .join(FolderAccess, FolderAccess.folder_id == FolderClosure.descendant_id)
+        .where(FolderAccess.accessed >= since)
+        .group_by(FolderClosure.ancestor_id)
+    ).all()
+    return {folder_id: accessed for folder_id, accessed in rows}
@@ -0,0 +1,60 @@
+from typing import List
+from uuid import UUID
+
+from sqlalchemy import ForeignKey, select, insert, delete, literal, and_, Select
+from sqlalchemy.orm import Mapped, mapped_column, Session, aliased
+
+from database import Base
+
+
+class FolderClosure(Base):
+    """
+    Every (ancestor, descendant) pair of the folder tree including (folder, folder) with depth 0.
+    Subtree and ancestor lookups are index range scans instead of recursive CTEs. Rows of deleted
+    folders are removed by FK cascade.
+    """
+    __tablename__ = "folder_closure"
+
+    ancestor_id: Mapped[UUID] = mapped_column(ForeignKey("folder.id", ondelete="CASCADE"), primary_key=True)
+    descendant_id: Mapped[UUID] = mapped_column(ForeignKey("folder.id", ondelete="CASCADE"), primary_key=True)
+    depth: Mapped[int]
+
+
+def insert_folder(session: Session, folder_id: UUID, parent_id: UUID | None):
+    """Adds closure rows of a new leaf folder - its own row and one row per ancestor of the parent."""
+    session.execute(insert(FolderClosure).values(ancestor_id=folder_id, descendant_id=folder_id, depth=0))
+    if parent_id is not None:
+        session.execute(insert(FolderClosure).from_select(
+            ["ancestor_id", "descendant_id", "depth"],
+            select(FolderClosure.ancestor_id, literal(folder_id), FolderClosure.depth + 1)
+            .where(FolderClosure.descendant_id == parent_id)
+        ))
+
+def move_subtree(session: Session, folder_id: UUID, new_parent_id: UUID):
+    """Re-links the subtree of folder_id under new_parent_id, Folder.parent_id is updated by the caller."""
+    subtree = select(FolderClosure.descendant_id).where(FolderClosure.ancestor_id == folder_id)
+    old_ancestors = (select(FolderClosure.ancestor_id)
+                     .where(FolderClosure.descendant_id == folder_id, FolderClosure.ancestor_id != folder_id))
+    session.execute(delete(FolderClosure).where(FolderClosure.descendant_id.in_(subtree),
+                                                FolderClosure.ancestor_id.in_(old_ancestors)))
+
+    above = aliased(FolderClosure)
+    below = aliased(FolderClosure)
+    session.execute(insert(FolderClosure).from_select(
+        ["ancestor_id", "descendant_id", "depth"],
+        select(above.ancestor_id, below.descendant_id, above.depth + below.depth + 1)
+        .join(below, and_(above.descendant_id == new_parent_id, below.ancestor_id == folder_id))
+    ))
+
+def is_descendant(session: Session, folder_id: UUID, ancestor_id: UUID) -> bool:
+    return session.execute(
+        select(FolderClosure.depth).where(FolderClosure.ancestor_id == ancestor_id, FolderClosure.descendant_id == folder_id)
+    ).first() is not None
+
+def subtree_ids(folder_id: UUID) -> Select:
+    """SELECT of the folder id and ids of all its descendants, usable in IN (...)."""
+    return select(FolderClosure.descendant_id).where(FolderClosure.ancestor_id == folder_id)
+
+def ancestor_ids(folder_ids: List[UUID]) -> Select:
+    """SELECT of given folders and all their ancestors."""
+    return select(FolderClosure.ancestor_id).where(FolderClosure.descendant_id.in_(folder_ids)).distinct()
@@ -0,0 +1,37 @@
+from datetime import datetime
+from typing import Optional, List
+from uuid import UUID
+
+from sqlalchemy import ForeignKey, BigInteger, DateTime
+from sqlalchemy.orm import Mapped, mapped_column, Session
+
+from database import Base
+
+
+class FolderStats(Base):
+    """
+    Photo statistics of a folder, maintained by folder_stats_service. Direct columns cover photos of the folder itself
+    (folder_id for COLLECTION, virtual_folder_id for VIRTUAL), the rest covers the whole subtree.
+    """
+    __tablename__ = "folder_stats"
+
+    folder_id: Mapped[UUID] = mapped_column(ForeignKey("folder.id", ondelete="CASCADE"), primary_key=True)
+
+    direct_photo_count: Mapped[int] = mapped_column(default=0)
+    direct_size_bytes: Mapped[int] = mapped_column(BigInteger, default=0)
+    direct_created_min: Mapped[Optional[datetime]] = mapped_column(DateTime)
+    direct_created_max: Mapped[Optional[datetime]] = mapped_column(DateTime)
+    direct_cover_photo_id: Mapped[Optional[UUID]] = mapped_column(ForeignKey("photo.id", ondelete="SET NULL"))
+
+    photo_count: Mapped[int] = mapped_column(default=0)
+    size_bytes: Mapped[int] = mapped_column(BigInteger, default=0)
+    created_min: Mapped[Optional[datetime]] = mapped_column(DateTime)
+    created_max: Mapped[Optional[datetime]] = mapped_column(DateTime)
+    cover_photo_id: Mapped[Optional[UUID]] = mapped_column(ForeignKey("photo.id", ondelete="SET NULL"))
+
+
+def find_by_folder_id(session: Session, folder_id: UUID) -> Optional[FolderStats]:
+    return session.query(FolderStats).filter_by(folder_id=folder_id).first()
+
+def find_by_folder_ids(session: Session, folder_ids: List[UUID]) -> List[FolderStats]:
+    return session.query(FolderStats).filter(FolderStats.folder_id.in_(folder_ids)).all()
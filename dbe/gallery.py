@@ -0,0 +1,52 @@
+import uuid
+from datetime import datetime
+from typing import Optional, List
+from uuid import UUID
+
+from sqlalchemy import ForeignKey, DateTime
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped, mapped_column, Session, contains_eager
+
+from database import Base
+from dbe.photo import Photo, created_keyset_page
+from domain.cursor_direction import CursorDirection
+
+
+class Gallery(Base):
+    """Saved search, criteria has the same structure as search request (see SearchCriteria.to_dict)."""
+    __tablename__ = "gallery"
+
+    id: Mapped[UUID] = mapped_column(primary_key=True, default=uuid.uuid4)
+    name: Mapped[str]
+    criteria_json = mapped_column(JSONB, nullable=False)
+    created: Mapped[datetime] = mapped_column(DateTime, default=datetime.now)
+    rebuilt: Mapped[Optional[datetime]] = mapped_column(DateTime)
+
+
+class GalleryPhoto(Base):
+    """Materialized gallery membership, photo_created is copied for keyset pagination without join."""
+    __tablename__ = "gallery_photo"
+
+    gallery_id: Mapped[UUID] = mapped_column(ForeignKey("gallery.id", ondelete="CASCADE"), primary_key=True)
+    photo_id: Mapped[UUID] = mapped_column(ForeignKey("photo.id", ondelete="CASCADE"), primary_key=True)
+    photo_created: Mapped[Optional[datetime]]
+
+
+def find_by_id(session: Session, id) -> Optional[Gallery]:
+    return session.query(Gallery).filter_by(id=id).first()
+
+def get_all(session: Session) -> List[Gallery]:
+    return session.query(Gallery).order_by(Gallery.name).all()
+
+def gallery_photo_count(session: Session, gallery_id: UUID) -> int:
+    return session.query(GalleryPhoto).filter_by(gallery_id=gallery_id).count()
+
+def find_gallery_photos(session: Session, gallery_id: UUID, direction: CursorDirection,
+                        created: Optional[datetime], photo_id: Optional[UUID], limit: int) -> List[Photo]:
+    """Keyset page of gallery photos, see created_keyset_page."""
+    query = (session.query(Photo)
+             .join(GalleryPhoto, GalleryPhoto.photo_id == Photo.id)
+             .outerjoin(Photo.metadata_index)
+             .options(contains_eager(Photo.metadata_index))
+             .filter(GalleryPhoto.gallery_id == gallery_id))
+    return created_keyset_page(query, GalleryPhoto.photo_created, GalleryPhoto.photo_id, direction, created, photo_id, limit)
@@ -0,0 +1,42 @@
+from typing import List, Dict
+from uuid import UUID
+
+from sqlalchemy import ForeignKey, select, delete, insert, func
+from sqlalchemy.orm import Mapped, mapped_column, Session
+
+from database import Base
+
+
+class NearDuplicate(Base):
+    """
+    Photo of a near duplicate cluster, clusters are computed by RebuildNearDuplicatesTask at the
+    NEAR_DUPLICATE_MAX_DISTANCE setting. Rank orders clusters largest first and is the page key.
+    """
+    __tablename__ = "near_duplicate"
+
+    photo_id: Mapped[UUID] = mapped_column(ForeignKey("photo.id", ondelete="CASCADE"), primary_key=True)
+    cluster_rank: Mapped[int] = mapped_column(index=True)
+
+
+def replace_clusters(session: Session, clusters: List[List[UUID]]):
+    """Clusters ordered largest first, as near_duplicate_service.cluster_by_distance returns them."""
+    session.execute(delete(NearDuplicate))
+    rows = [{"photo_id": photo_id, "cluster_rank": rank} for rank, cluster in enumerate(clusters) for photo_id in cluster]
+    if rows:
+        session.execute(insert(NearDuplicate), rows)
+
+def find_cluster_page(session: Session, page_index: int, clusters_per_page: int) -> List[List[UUID]]:
+    rows = session.execute(
+        select(NearDuplicate.cluster_rank, NearDuplicate.photo_id)
+        .where(NearDuplicate.cluster_rank >= page_index * clusters_per_page,
+               NearDuplicate.cluster_rank < (page_index + 1) * clusters_per_page)
+        .order_by(NearDuplicate.cluster_rank, NearDuplicate.photo_id)
+    )
+    clusters: Dict[int, List[UUID]] = {}
+    for rank, photo_id in rows:
+        clusters.setdefault(rank, []).append(photo_id)
+    return list(clusters.values())
+
+def cluster_count(session: Session) -> int:
+    # Pages are rank ranges, a cluster emptied by photo deletes still takes its place until the next rebuild
+    return session.scalar(select(func.coalesce(func.max(NearDuplicate.cluster_rank) + 1, 0)))
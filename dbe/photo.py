@@ -1,17 +1,23 @@
 import uuid
+from datetime import datetime
 from typing import Optional, List, Tuple
 from uuid import UUID
 
-from sqlalchemy import ForeignKey, desc, asc, nullslast
-from sqlalchemy.orm import Mapped, mapped_column, relationship, Session
+from sqlalchemy import ForeignKey, BigInteger, desc, asc, nullslast, select, and_, or_, update
+from sqlalchemy.orm import Mapped, mapped_column, relationship, Session, joinedload, contains_eager, selectinload, undefer
 
 import pc_configuration
 from database import Base
 from dbe.folder import Folder
+from dbe.folder_closure import subtree_ids
+from domain.cursor_direction import CursorDirection
 from vial.config import app_config
 from domain.ordering_type import OrderingType
 from indexing.dbe.metadata_index import MetadataIndex
 
+# Columns the scan derives from the file, it never writes other columns of existing photos
+SCANNED_COLUMNS = {"name", "file_path", "file_hash", "perceptual_hash", "file_size", "folder_id"}
+
 
 class Photo(Base):
     __tablename__ = "photo"
@@ -40,8 +46,14 @@ class Photo(Base):
 
     file_path: Mapped[str]
     file_hash: Mapped[str]
+    perceptual_hash: Mapped[Optional[int]] = mapped_column(BigInteger) # dHash for near-duplicate search
+    file_size: Mapped[Optional[int]] = mapped_column(BigInteger)
 
     name: Mapped[str]
+    # Bumped by every ORM flush (which fails with StaleDataError on a changed row) and by bulk updates
+    version: Mapped[int] = mapped_column()
+
+    __mapper_args__ = {"version_id_col": version}
 
     def get_photo_file_path(self):
         return app_config.get_configuration(pc_configuration.COLLECTION_PATH) + "/" + self.file_path
@@ -64,6 +76,84 @@ def find_by_path(session: Session, relative_path: str) -> Optional[Photo]:
 def find_by_hash(session: Session, file_hash: str):
     return session.query(Photo).filter_by(file_hash=file_hash).first()
 
+def find_version(session: Session, id: UUID) -> Optional[int]:
+    return session.scalar(select(Photo.version).where(Photo.id == id))
+
+def update_scanned_columns(session: Session, id: UUID, version: int, values: dict) -> bool:
+    """Updates SCANNED_COLUMNS of a photo still at version. False when the row changed (or isn't visible)."""
+    if not values.keys() <= SCANNED_COLUMNS:
+        raise ValueError(f"Not scanned columns: {values.keys() - SCANNED_COLUMNS}")
+    result = session.execute(update(Photo)
+                             .where(Photo.id == id, Photo.version == version)
+                             .values(**values, version=Photo.version + 1)
+                             .execution_options(synchronize_session=False))
+    return result.rowcount == 1
+
+def find_by_ids(session: Session, ids: List[UUID]) -> List[Photo]:
+    return session.query(Photo).options(joinedload(Photo.metadata_index)).filter(Photo.id.in_(ids)).all()
+
+def find_by_ids_with_metadata(session: Session, ids: List[UUID]) -> List[Photo]:
+    """Photos with metadata JSON and archive loaded in two queries, for batch metadata responses."""
+    return (session.query(Photo)
+            .options(joinedload(Photo.metadata_index).options(undefer(MetadataIndex.exif_json),
+                                                              undefer(MetadataIndex.effective_json),
+                                                              selectinload(MetadataIndex.archive)))
+            .filter(Photo.id.in_(ids))
+            .all())
+
+def iterate_perceptual_hashes(session: Session, batch_size: int = 10000):
+    """Yields (photo_id, perceptual_hash) of all hashed photos, fetched in batches."""
+    return session.execute(
+        select(Photo.id, Photo.perceptual_hash)
+        .where(Photo.perceptual_hash.isnot(None))
+        .execution_options(yield_per=batch_size)
+    )
+
+def find_subtree_photos(session: Session, folder_id: UUID, direction: CursorDirection,
+                        created: Optional[datetime], photo_id: Optional[UUID], limit: int) -> List[Photo]:
+    """
+    Keyset page of photos in the folder and all its descendants, both COLLECTION (folder_id) and VIRTUAL
+    (virtual_folder_id). Subtree is a semi-join on folder_closure. Photos without metadata (failed extraction,
+    cold folders during a scan) are listed with the undated ones, so the keyset ends with Photo.id.
+    """
+    subtree = subtree_ids(folder_id)
+    query = (session.query(Photo)
+             .outerjoin(MetadataIndex, Photo.id == MetadataIndex.photo_id)
+             .options(contains_eager(Photo.metadata_index))
+             .filter(or_(Photo.folder_id.in_(subtree), Photo.virtual_folder_id.in_(subtree))))
+    return created_keyset_page(query, MetadataIndex.photo_created, Photo.id, direction, created, photo_id, limit)
+
+def created_keyset_page(query, created_column, id_column, direction: CursorDirection,
+                        created: Optional[datetime], photo_id: Optional[UUID], limit: int) -> List:
+    """
+    Keyset page ordered by created DESC NULLS LAST, id DESC. Cursor is the first (BEFORE) or last (AFTER) item
+    of the current page, without photo_id the first page is returned.
+    """
+    if photo_id is None:
+        return query.order_by(desc(created_column).nulls_last(), desc(id_column)).limit(limit).all()
+
+    if direction == CursorDirection.AFTER:
+        if created is None:
+            keyset = and_(created_column.is_(None), id_column < photo_id)
+        else:
+            keyset = or_(created_column < created,
+                         and_(created_column == created, id_column < photo_id),
+                         created_column.is_(None))
+        return (query.filter(keyset)
+                .order_by(desc(created_column).nulls_last(), desc(id_column))
+                .limit(limit).all())
+
+    # BEFORE - walk the index backwards and flip the page
+    if created is None:
+        keyset = or_(created_column.isnot(None), and_(created_column.is_(None), id_column > photo_id))
+    else:
+        keyset = or_(created_column > created, and_(created_column == created, id_column > photo_id))
+    items = (query.filter(keyset)
+             .order_by(asc(created_column).nulls_first(), asc(id_column))
+             .limit(limit).all())
+    items.reverse()
+    return items
+
 def find_child_photos_by_folder(session: Session, folder_id: UUID, ordering: OrderingType, page: int, items_per_page: int):
     return _child_photos_by_folder_query(session, folder_id, ordering).limit(items_per_page).offset(page * items_per_page).all()
 
@@ -0,0 +1,62 @@
+from datetime import date
+from typing import Optional, List, Tuple, Iterable
+from uuid import UUID
+
+from sqlalchemy import ForeignKey, Date, func, cast, delete, insert, select
+from sqlalchemy.orm import Mapped, mapped_column, Session
+
+from database import Base
+from dbe.folder_closure import subtree_ids
+from dbe.photo import Photo
+from domain.timeline_granularity import TimelineGranularity
+from indexing.dbe.metadata_index import MetadataIndex
+
+
+class PhotoTimeline(Base):
+    """
+    Photo count per folder and created day, rebuilt by the scan task. Photos without created date are not counted.
+    Collection photos are counted by folder_id, virtual folders by virtual_folder_id like in folder_stats. Web edits
+    of virtual folders recount only the folders they changed, see refresh.
+    """
+    __tablename__ = "photo_timeline"
+
+    folder_id: Mapped[UUID] = mapped_column(ForeignKey("folder.id", ondelete="CASCADE"), primary_key=True)
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    photo_count: Mapped[int]
+
+
+def rebuild(session: Session):
+    session.execute(delete(PhotoTimeline))
+    _insert_counts(session, None)
+
+def refresh(session: Session, folder_ids: Iterable[UUID]):
+    """Recounts days of the given folders only (direct photos, histograms sum the subtree on read)."""
+    folder_ids = list(folder_ids)
+    if not folder_ids:
+        return
+    session.execute(delete(PhotoTimeline).where(PhotoTimeline.folder_id.in_(folder_ids)))
+    _insert_counts(session, folder_ids)
+
+def _insert_counts(session: Session, folder_ids: Optional[List[UUID]]):
+    day = cast(MetadataIndex.photo_created, Date)
+    # Collection and virtual trees don't share folders, a photo is counted once in any subtree
+    for folder_column in (Photo.folder_id, Photo.virtual_folder_id):
+        counts = (select(folder_column, day, func.count())
+                  .join(MetadataIndex, Photo.id == MetadataIndex.photo_id)
+                  .where(folder_column.isnot(None), MetadataIndex.photo_created.isnot(None))
+                  .group_by(folder_column, day))
+        if folder_ids is not None:
+            counts = counts.where(folder_column.in_(folder_ids))
+        session.execute(insert(PhotoTimeline).from_select(["folder_id", "day", "photo_count"], counts))
+
+def find_histogram(session: Session, folder_id: UUID, granularity: TimelineGranularity,
+                   date_from: Optional[date] = None, date_to: Optional[date] = None) -> List[Tuple[date, int]]:
+    """Returns (bucket start, photo count) of the folder subtree ordered by date, date_to is exclusive."""
+    bucket = cast(func.date_trunc(granularity.value, PhotoTimeline.day), Date)
+    query = (select(bucket, func.sum(PhotoTimeline.photo_count))
+             .where(PhotoTimeline.folder_id.in_(subtree_ids(folder_id))))
+    if date_from is not None:
+        query = query.where(PhotoTimeline.day >= date_from)
+    if date_to is not None:
+        query = query.where(PhotoTimeline.day < date_to)
+    return [(row[0], int(row[1])) for row in session.execute(query.group_by(bucket).order_by(bucket))]
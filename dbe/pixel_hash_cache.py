@@ -0,0 +1,33 @@
+import uuid
+from datetime import datetime
+from typing import Optional
+from uuid import UUID
+
+from sqlalchemy import BigInteger, DateTime
+from sqlalchemy.orm import Mapped, mapped_column, Session
+
+from database import Base
+
+
+class PixelHashCache(Base):
+    """
+    Maps a file fingerprint (size, mtime_ns, fast content hash) to the SHA-256 of its decoded pixels,
+    so unchanged files are not decoded again on every scan.
+    """
+    __tablename__ = "pixel_hash_cache"
+
+    id: Mapped[UUID] = mapped_column(primary_key=True, default=uuid.uuid4)
+    file_path: Mapped[str]
+    file_size: Mapped[int] = mapped_column(BigInteger)
+    mtime_ns: Mapped[int] = mapped_column(BigInteger)
+    content_hash: Mapped[str] # BLAKE2b of raw file bytes
+    pixel_hash: Mapped[str]
+    perceptual_hash: Mapped[Optional[int]] = mapped_column(BigInteger) # dHash, see image_service.compute_dhash
+    updated: Mapped[datetime] = mapped_column(DateTime, default=datetime.now, onupdate=datetime.now)
+
+
+def find_by_path(session: Session, file_path: str) -> Optional[PixelHashCache]:
+    return session.query(PixelHashCache).filter_by(file_path=file_path).first()
+
+def find_by_content_hash(session: Session, file_size: int, content_hash: str) -> Optional[PixelHashCache]:
+    return session.query(PixelHashCache).filter_by(file_size=file_size, content_hash=content_hash).first()
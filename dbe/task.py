@@ -6,6 +6,7 @@ from uuid import UUID
 from sqlalchemy import DateTime, nullsfirst, desc
 from sqlalchemy.orm import Mapped, mapped_column, Session
 from sqlalchemy import Enum as SAEnum
+from sqlalchemy.dialects.postgresql import JSONB
 
 from database import Base
 from domain.task.task_status import TaskStatus
@@ -41,6 +42,8 @@ class Task(Base):
     end: Mapped[Optional[datetime]] = mapped_column(DateTime)
 
     error_msg: Mapped[Optional[str]]
+    # Timers and counters of the run (service.instrumentation), loaded only by the metrics endpoint
+    metrics = mapped_column(JSONB, nullable=True, deferred=True)
 
 
 def find_by_id(session: Session, id):
@@ -43,6 +43,25 @@ class AppDataField(Enum):
     FOLDER_VIEW_FOLDERS_PAGINATION_COUNT = (auto(), int, 10)
     FOLDER_VIEW_PHOTOS_PAGINATION_COUNT = (auto(), int, 20)
     FOLDER_CONTENT_IDS_LIMIT = (auto(), int, 500)
+    NEAR_DUPLICATE_MAX_DISTANCE = (auto(), int, 6)
+    NEAR_DUPLICATE_CLUSTERS_PAGINATION_COUNT = (auto(), int, 20)
+    METADATA_INDEX_TRIMMED_GROUPS = (auto(), list, ["MakerNotes"])
+    METADATA_ARCHIVE_ZSTD = (auto(), bool, False)
+    SEARCH_PHOTOS_PAGINATION_COUNT = (auto(), int, 50)
+    SEARCH_FACET_VALUES_COUNT = (auto(), int, 20)
+    GALLERY_PHOTOS_PAGINATION_COUNT = (auto(), int, 50)
+    SUBTREE_PHOTOS_PAGINATION_COUNT = (auto(), int, 50)
+    PHOTO_BATCH_LIMIT = (auto(), int, 200)
+    TASK_METRICS = (auto(), bool, True)
+    # Scan publishes camera thumbnails, renditions are generated by a follow-up task
+    THUMBNAIL_EMBEDDED_FIRST = (auto(), bool, True)
+    # Task type name -> domain.task.throttle_policy.ThrottlePolicy fields, types missing here aren't throttled
+    TASK_THROTTLING = (auto(), dict, {
+        "UPDATE_COLLECTION": {"max_files_per_s": 0, "max_mb_per_s": 0, "latency_threshold_ms": 500,
+                              "max_backoff_s": 2.0, "nice": 10, "ionice_class": "best-effort", "ionice_level": 7},
+        "RENDER_THUMBNAILS": {"max_files_per_s": 0, "max_mb_per_s": 0, "latency_threshold_ms": 500,
+                              "max_backoff_s": 2.0, "nice": 10, "ionice_class": "best-effort", "ionice_level": 7},
+    })
 
     def __new__(cls, value, field_type, default_value):
         obj = object.__new__(cls)
@@ -53,3 +72,9 @@ class AppDataField(Enum):
 
     def parse(self, s: str):
         return parse_to(self.field_type, s)
+
+    def format(self, value) -> str:
+        """Stored form of the value, read back by parse. Lists and dicts are JSON, not Python repr."""
+        if self.field_type in (list, dict):
+            return json.dumps(value)
+        return str(value)
@@ -0,0 +1,7 @@
+from typing import Optional
+
+
+class ImageHashResult:
+    def __init__(self, pixel_hash: str, perceptual_hash: Optional[int]):
+        self.pixel_hash: str = pixel_hash # SHA-256 of decoded pixels
+        self.perceptual_hash: Optional[int] = perceptual_hash # 64-bit dHash, signed to fit PostgreSQL bigint
@@ -20,4 +20,9 @@ FILE_WIDTH = MetadataId.of(MetadataGroup0.FILE, None, MetadataName.IMAGE_WIDTH)
 FILE_HEIGHT = MetadataId.of(MetadataGroup0.FILE, None, MetadataName.IMAGE_HEIGHT)
 
 EXIF_WIDTH = MetadataId.of(MetadataGroup0.EXIF, None, MetadataName.EXIF_IMAGE_WIDTH)
-EXIF_HEIGHT = MetadataId.of(MetadataGroup0.EXIF, None, MetadataName.EXIF_IMAGE_HEIGHT)
\ No newline at end of file
+EXIF_HEIGHT = MetadataId.of(MetadataGroup0.EXIF, None, MetadataName.EXIF_IMAGE_HEIGHT)
+
+# Camera
+EXIF_MAKE = MetadataId.of(MetadataGroup0.EXIF, None, MetadataName.MAKE)
+EXIF_MODEL = MetadataId.of(MetadataGroup0.EXIF, None, MetadataName.MODEL)
+EXIF_LENS_MODEL = MetadataId.of(MetadataGroup0.EXIF, None, MetadataName.LENS_MODEL)
\ No newline at end of file
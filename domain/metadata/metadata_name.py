@@ -12,6 +12,9 @@ class MetadataName(Enum):
     IMAGE_HEIGHT = (auto(), "ImageHeight")
     EXIF_IMAGE_WIDTH = (auto(), "ExifImageWidth")
     EXIF_IMAGE_HEIGHT = (auto(), "ExifImageHeight")
+    MAKE = (auto(), "Make")
+    MODEL = (auto(), "Model")
+    LENS_MODEL = (auto(), "LensModel")
 
     def __new__(cls, value, metadata_name):
         obj = object.__new__(cls)
@@ -14,3 +14,6 @@ PHOTO_SIZE_SET = [metadata_defined.FILE_WIDTH,
               metadata_defined.EXIF_WIDTH,
               metadata_defined.EXIF_HEIGHT]
 
+CAMERA_SET = [metadata_defined.EXIF_MAKE,
+              metadata_defined.EXIF_MODEL,
+              metadata_defined.EXIF_LENS_MODEL]
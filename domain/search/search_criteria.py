@@ -0,0 +1,41 @@
+from datetime import datetime
+from typing import List, Optional, Dict
+
+from domain.metadata_index_type import MetadataIndexType
+from domain.search.search_facet import SearchFacet
+from domain.search.search_predicate import SearchPredicate
+
+
+class SearchCriteria:
+    def __init__(self):
+        self.index_type: MetadataIndexType = MetadataIndexType.EXIF
+        self.predicates: List[SearchPredicate] = list()
+        # Equality on promoted columns, these are plain btree lookups
+        self.facet_values: Dict[SearchFacet, str] = dict()
+        self.created_from: Optional[datetime] = None
+        self.created_to: Optional[datetime] = None
+
+    def to_dict(self) -> Dict:
+        """JSON friendly form with the same keys as the search request, used for saved galleries."""
+        criteria = {"type": self.index_type.value, "predicates": [p.to_dict() for p in self.predicates]}
+        for facet, value in self.facet_values.items():
+            criteria[facet.value] = value
+        if self.created_from is not None:
+            criteria["created_from"] = self.created_from.isoformat()
+        if self.created_to is not None:
+            criteria["created_to"] = self.created_to.isoformat()
+        return criteria
+
+    @staticmethod
+    def from_dict(input_dict: Dict) -> "SearchCriteria":
+        criteria = SearchCriteria()
+        criteria.index_type = MetadataIndexType(input_dict.get("type", MetadataIndexType.EXIF.value))
+        criteria.predicates = [SearchPredicate.from_dict(p) for p in input_dict.get("predicates", [])]
+        for facet in SearchFacet:
+            if input_dict.get(facet.value) is not None:
+                criteria.facet_values[facet] = input_dict.get(facet.value)
+        if input_dict.get("created_from") is not None:
+            criteria.created_from = datetime.fromisoformat(input_dict.get("created_from"))
+        if input_dict.get("created_to") is not None:
+            criteria.created_to = datetime.fromisoformat(input_dict.get("created_to"))
+        return criteria
@@ -0,0 +1,8 @@
+from enum import Enum
+
+
+class SearchFacet(Enum):
+    # value is the promoted photo_metadata column
+    CAMERA_MAKE = "camera_make"
+    CAMERA_MODEL = "camera_model"
+    LENS_MODEL = "lens_model"
@@ -0,0 +1,7 @@
+from enum import Enum
+
+
+class SearchOperator(Enum):
+    EQ = "EQ"
+    RANGE = "RANGE"
+    EXISTS = "EXISTS"
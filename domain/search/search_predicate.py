@@ -0,0 +1,32 @@
+from typing import Any, Dict
+
+from domain.metadata.metadata_id import MetadataId
+from domain.search.search_operator import SearchOperator
+
+
+class SearchPredicate:
+    def __init__(self, metadata_id: MetadataId, operator: SearchOperator, value: Any = None,
+                 value_from: Any = None, value_to: Any = None):
+        self.metadata_id: MetadataId = metadata_id
+        self.operator: SearchOperator = operator
+        self.value: Any = value # EQ
+        # RANGE, either bound can be None
+        self.value_from: Any = value_from
+        self.value_to: Any = value_to
+
+    def to_dict(self) -> Dict:
+        predicate = {"g0": self.metadata_id.group_0, "tag_name": self.metadata_id.tag_name, "operator": self.operator.name}
+        if self.metadata_id.group_1 is not None:
+            predicate["g1"] = self.metadata_id.group_1
+        if self.metadata_id.path is not None:
+            predicate["path"] = self.metadata_id.path
+        for key, value in (("value", self.value), ("value_from", self.value_from), ("value_to", self.value_to)):
+            if value is not None:
+                predicate[key] = value
+        return predicate
+
+    @staticmethod
+    def from_dict(input_dict: Dict) -> "SearchPredicate":
+        metadata_id = MetadataId(input_dict.get("g0"), input_dict.get("g1"), input_dict.get("tag_name"), path=input_dict.get("path"))
+        return SearchPredicate(metadata_id, SearchOperator[input_dict.get("operator")], input_dict.get("value"),
+                               input_dict.get("value_from"), input_dict.get("value_to"))
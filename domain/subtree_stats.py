@@ -0,0 +1,31 @@
+from datetime import datetime
+from typing import Optional, List
+from uuid import UUID
+
+
+class SubtreeStats:
+    def __init__(self, photo_count: int = 0, size_bytes: int = 0, created_min: Optional[datetime] = None,
+                 created_max: Optional[datetime] = None, cover_photo_id: Optional[UUID] = None):
+        self.photo_count: int = photo_count
+        self.size_bytes: int = size_bytes
+        self.created_min: Optional[datetime] = created_min
+        self.created_max: Optional[datetime] = created_max
+        # newest photo, cover of the part with the newest photo when combined
+        self.cover_photo_id: Optional[UUID] = cover_photo_id
+
+    @staticmethod
+    def combine(parts: List["SubtreeStats"]) -> "SubtreeStats":
+        result = SubtreeStats()
+        cover_created = None
+        for part in parts:
+            result.photo_count += part.photo_count
+            result.size_bytes += part.size_bytes
+            if part.created_min is not None and (result.created_min is None or part.created_min < result.created_min):
+                result.created_min = part.created_min
+            if part.cover_photo_id is None:
+                continue
+            if result.cover_photo_id is None or (part.created_max is not None and (cover_created is None or part.created_max > cover_created)):
+                result.cover_photo_id = part.cover_photo_id
+                cover_created = part.created_max
+        result.created_max = max((p.created_max for p in parts if p.created_max is not None), default=None)
+        return result
@@ -1,5 +1,6 @@
 from abc import ABC, abstractmethod
 from datetime import datetime
+from typing import List
 
 from database import DBSession
 from dbe.task_log import TaskLog
@@ -7,12 +8,22 @@ from domain.task.task_log_severity import TaskLogSeverity
 from domain.task.task_status import TaskStatus
 from domain.task.task_type import TaskType
 from dbe import task
+from service.instrumentation import MetricsRecorder
 
 
 class PhotoCabinetTask(ABC):
     def __init__(self):
         self.db_task_id = None
         self.task_transaction = None
+        # cProfile of execute() is saved under the task id, see service.profiling_service
+        self.profile = False
+        # service.task_throttle.TaskThrottle, set in the task process if the task type is throttled
+        self.throttle = None
+
+    def pace(self, bytes_read: int):
+        """Called by tasks after each file they read, sleeps as the throttle policy of the task type says."""
+        if self.throttle is not None:
+            self.throttle.pace(bytes_read)
 
     def log_message(self, message: str, severity=TaskLogSeverity.INFO):
         transaction = DBSession()
@@ -77,6 +88,20 @@ class PhotoCabinetTask(ABC):
         transaction.close()
         self.task_transaction.commit()
 
+    def save_metrics(self, recorder: MetricsRecorder):
+        transaction = DBSession()
+        db_task = task.find_by_id(transaction, self.db_task_id)
+        db_task.metrics = recorder.to_dict()
+        transaction.add(db_task)
+        transaction.commit()
+        transaction.close()
+        if len(recorder.histograms) > 0:
+            self.log_message("Timing breakdown: " + recorder.summary())
+
+    def get_follow_up_tasks(self) -> List["PhotoCabinetTask"]:
+        """Tasks to queue after this one finished successfully, see TaskService.create_task."""
+        return []
+
     @abstractmethod
     def get_type(self) -> TaskType:
         pass
@@ -2,4 +2,7 @@ from enum import Enum
 
 
 class TaskType(Enum):
-    UPDATE_COLLECTION = "UPDATE_COLL"
\ No newline at end of file
+    UPDATE_COLLECTION = "UPDATE_COLL"
+    REBUILD_GALLERY = "REBUILD_GALLERY"
+    RENDER_THUMBNAILS = "RENDER_THUMBS"
+    NEAR_DUPLICATES = "NEAR_DUPS"
\ No newline at end of file
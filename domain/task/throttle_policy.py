@@ -0,0 +1,28 @@
+from typing import Optional
+
+
+class ThrottlePolicy:
+    """Throttling of one task type, see AppDataField.TASK_THROTTLING. Zero or None disables the limit."""
+
+    def __init__(self, max_files_per_s: float = 0, max_mb_per_s: float = 0, latency_threshold_ms: float = 0,
+                 max_backoff_s: float = 2.0, nice: int = 0, ionice_class: Optional[str] = None,
+                 ionice_level: Optional[int] = None):
+        self.max_files_per_s: float = max_files_per_s
+        self.max_mb_per_s: float = max_mb_per_s
+        # Task backs off while mean web request latency is above this
+        self.latency_threshold_ms: float = latency_threshold_ms
+        self.max_backoff_s: float = max_backoff_s
+        # Added to the task process niceness, tasks run in a fresh process each
+        self.nice: int = nice
+        # "idle", "best-effort" or "realtime" (root only), level 0-7 for the last two, Linux only
+        self.ionice_class: Optional[str] = ionice_class
+        self.ionice_level: Optional[int] = ionice_level
+
+    @staticmethod
+    def from_dict(values: dict) -> "ThrottlePolicy":
+        """Unknown keys are ignored, so settings of newer versions don't break the task."""
+        policy = ThrottlePolicy()
+        for key, value in values.items():
+            if hasattr(policy, key):
+                setattr(policy, key, value)
+        return policy
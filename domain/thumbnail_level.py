@@ -0,0 +1,9 @@
+from enum import Enum
+
+
+class ThumbnailLevel(Enum):
+    NONE = "NONE"
+    # Thumbnail embedded in EXIF by the camera (usually 160 px), published during scan
+    EMBEDDED = "EMBEDDED"
+    # Generated in configured size and quality
+    RENDITION = "RENDITION"
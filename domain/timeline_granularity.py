@@ -0,0 +1,8 @@
+from enum import Enum
+
+
+class TimelineGranularity(Enum):
+    # value is the date_trunc field
+    YEAR = "year"
+    MONTH = "month"
+    DAY = "day"
@@ -1,10 +1,14 @@
-import subprocess
+from typing import List, Optional, Tuple
 
 from sqlalchemy.orm import Session
-from exiftool.exiftool_command import ExiftoolCommand
+from exiftool.exiftool_command import ExiftoolCommand, PREVIEW_TAGS, THUMBNAIL_TAGS
+from exiftool.exiftool_process import get_process
 from exiftool.exiftool_data_parser import ExiftoolDataParser
+from service import instrumentation
 
-## Service for working with Exiftool
+## Service for working with Exiftool, commands run in the persistent exiftool process (see exiftool_process)
+
+COMMAND_TIMEOUT_S = 30
 
 ## Creates definitions of groups, tags and values from exiftool
 def create_metadata_dbe(session: Session):
@@ -13,16 +17,42 @@ def create_metadata_dbe(session: Session):
     parser.parse_metadata_db(xml_data)
 
 def run_command(exiftool_command: ExiftoolCommand) -> str:
-    try:
-        result = subprocess.run(
-            exiftool_command.get_command(),
-            capture_output=True,
-            text=True,
-            check=True,
-            timeout=30
-        )
-        return result.stdout.strip()
-    except subprocess.TimeoutExpired:
-        raise TimeoutError("exiftool tags list timed out")
-    except subprocess.CalledProcessError as e:
-        raise RuntimeError(f"Failed to get exiftool tags: {e.stderr}")
\ No newline at end of file
+    stdout, stderr = _execute(exiftool_command, "exiftool.run_command")
+    output = stdout.decode("utf-8", errors="replace").strip()
+    if not output and _has_error(stderr):
+        raise RuntimeError(f"Failed to get exiftool tags: {stderr.decode(errors='replace')}")
+    return output
+
+def extract_preview(file_path: str) -> Optional[bytes]:
+    """Largest embedded JPEG preview of a RAW file, None if it has none."""
+    return _extract_binary(file_path, PREVIEW_TAGS)
+
+def extract_thumbnail(file_path: str) -> Optional[bytes]:
+    """Small JPEG thumbnail embedded by the camera (ThumbnailImage), None if it has none."""
+    return _extract_binary(file_path, THUMBNAIL_TAGS)
+
+def get_image_data_hash(file_path: str) -> Optional[str]:
+    """
+    SHA-256 of the image data only (sensor data of RAW files), stable across metadata edits.
+    None if exiftool can't hash the format or is older than 12.58.
+    """
+    stdout, _ = _execute(ExiftoolCommand.image_data_hash(file_path), "exiftool.image_data_hash")
+    data_hash = stdout.decode("ascii", errors="replace").strip()
+    return data_hash or None
+
+def _extract_binary(file_path: str, tag_names: List[str]) -> Optional[bytes]:
+    for tag_name in tag_names:
+        stdout, stderr = _execute(ExiftoolCommand.read_binary_tag(file_path, tag_name), "exiftool.extract_binary")
+        if len(stdout) > 0:
+            return stdout
+        if _has_error(stderr):
+            raise RuntimeError(f"Failed to extract {tag_name}: {stderr.decode(errors='replace')}")
+    return None
+
+def _execute(exiftool_command: ExiftoolCommand, timer: str) -> Tuple[bytes, bytes]:
+    with instrumentation.timed(timer):
+        return get_process().execute(exiftool_command.get_args(), COMMAND_TIMEOUT_S)
+
+def _has_error(stderr: bytes) -> bool:
+    # Warnings don't fail the command, e.g. "Warning: [minor] Unrecognized MakerNotes"
+    return any(line.startswith(b"Error") for line in stderr.splitlines())
@@ -13,6 +13,17 @@ EXIFTOOL_STRUCT_OPT = "-struct"
 EXIFTOOL_XML_OPT = "-listx"
 # with -listx, output flags (parent struct, isList)
 EXIFTOOL_FLAGS_OPT = "-f"
+# raw binary value of the requested tag (embedded previews)
+EXIFTOOL_BINARY_OPT = "-b"
+# embedded JPEG previews of RAW files, from the largest one
+PREVIEW_TAGS = ["JpgFromRaw", "PreviewImage", "OtherImage"]
+THUMBNAIL_TAGS = ["ThumbnailImage"]
+# print values only, no tag names
+EXIFTOOL_VALUE_ONLY_OPT = "-s3"
+# hash of image data only, requested explicitly with the hash type API option
+IMAGE_DATA_HASH_TAG = "ImageDataHash"
+EXIFTOOL_API_OPT = "-api"
+IMAGE_HASH_TYPE_SHA256 = "ImageHashType=SHA256"
 
 
 class ExiftoolCommand:
@@ -43,7 +54,11 @@ class ExiftoolCommand:
         return self
 
     def get_command(self) -> List[str]:
-        command = [EXIFTOOL_CMD]
+        return [EXIFTOOL_CMD] + self.get_args()
+
+    def get_args(self) -> List[str]:
+        """Arguments without the executable, for the -stay_open process."""
+        command = []
         if len(self.options) > 0:
             command.extend(self.options)
         if len(self.tag_allow) > 0:
@@ -63,6 +78,22 @@ class ExiftoolCommand:
                 .with_option(EXIFTOOL_STRUCT_OPT)
                 .with_file(file_path))
 
+    @staticmethod
+    def read_binary_tag(file_path: str, tag_name: str) -> "ExiftoolCommand":
+        return (ExiftoolCommand()
+                .with_option(EXIFTOOL_BINARY_OPT)
+                .include_tag(None, None, tag_name)
+                .with_file(file_path))
+
+    @staticmethod
+    def image_data_hash(file_path: str) -> "ExiftoolCommand":
+        return (ExiftoolCommand()
+                .with_option(EXIFTOOL_VALUE_ONLY_OPT)
+                .with_option(EXIFTOOL_API_OPT)
+                .with_option(IMAGE_HASH_TYPE_SHA256)
+                .include_tag(None, None, IMAGE_DATA_HASH_TAG)
+                .with_file(file_path))
+
     @staticmethod
     def list_supported_metadata():
         return ExiftoolCommand().with_option(EXIFTOOL_XML_OPT).with_option(EXIFTOOL_FLAGS_OPT)
\ No newline at end of file
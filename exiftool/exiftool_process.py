@@ -0,0 +1,98 @@
+import atexit
+import os
+import select
+import subprocess
+import threading
+import time
+from typing import List, Optional, Tuple
+
+from exiftool.exiftool_command import EXIFTOOL_CMD
+
+READ_SIZE = 64 * 1024
+
+
+class ExiftoolProcess:
+    """
+    One exiftool -stay_open process reading commands from its argument file (stdin), so a photo doesn't pay
+    for starting Perl and loading exiftool modules. Commands end with -execute<n>, exiftool answers
+    with {ready<n>} on stdout and -echo4 puts the same marker on stderr once the command is done.
+    """
+
+    def __init__(self, command: Optional[List[str]] = None):
+        self._lock = threading.Lock()
+        self._sequence = 0
+        self._process = subprocess.Popen((command or [EXIFTOOL_CMD]) + ["-stay_open", "True", "-@", "-"],
+                                         stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+
+    def is_alive(self) -> bool:
+        return self._process.poll() is None
+
+    def execute(self, args: List[str], timeout: float) -> Tuple[bytes, bytes]:
+        """Runs one command, returns its (stdout, stderr). Raises TimeoutError and kills the process on timeout."""
+        with self._lock:
+            self._sequence += 1
+            marker = f"{{ready{self._sequence}}}"
+            lines = args + ["-echo4", marker, f"-execute{self._sequence}"]
+            self._process.stdin.write(("\n".join(lines) + "\n").encode("utf-8"))
+            self._process.stdin.flush()
+            return self._read_response(marker.encode("ascii") + b"\n", timeout)
+
+    def close(self):
+        if self.is_alive():
+            try:
+                self._process.stdin.write(b"-stay_open\nFalse\n")
+                self._process.stdin.flush()
+                self._process.wait(timeout=5)
+            except (OSError, subprocess.TimeoutExpired):
+                self._process.kill()
+                self._process.wait()
+        for stream in (self._process.stdin, self._process.stdout, self._process.stderr):
+            stream.close()
+
+    def _read_response(self, marker: bytes, timeout: float) -> Tuple[bytes, bytes]:
+        # Both pipes are read together, exiftool would block on a full stderr pipe otherwise
+        buffers = {self._process.stdout.fileno(): bytearray(), self._process.stderr.fileno(): bytearray()}
+        pending = set(buffers)
+        deadline = time.monotonic() + timeout
+        while pending:
+            remaining = deadline - time.monotonic()
+            readable = select.select(list(pending), [], [], max(remaining, 0))[0] if remaining > 0 else []
+            if not readable:
+                self._process.kill()
+                raise TimeoutError(f"exiftool didn't answer in {timeout} s")
+            for fd in readable:
+                chunk = os.read(fd, READ_SIZE)
+                if not chunk:
+                    raise RuntimeError(f"exiftool exited with code {self._process.wait()}")
+                buffers[fd] += chunk
+                # Binary output (-b) is followed directly by the marker, only the end of the buffer is checked
+                if buffers[fd].endswith(marker):
+                    pending.discard(fd)
+        stdout = buffers[self._process.stdout.fileno()]
+        stderr = buffers[self._process.stderr.fileno()]
+        return bytes(stdout[:-len(marker)]), bytes(stderr[:-len(marker)])
+
+
+_process: Optional[ExiftoolProcess] = None
+_process_pid: Optional[int] = None
+_process_lock = threading.Lock()
+
+
+def get_process() -> ExiftoolProcess:
+    """exiftool worker of this process, started on first use and after it died. Forked children start their own."""
+    global _process, _process_pid
+    with _process_lock:
+        if _process is None or _process_pid != os.getpid() or not _process.is_alive():
+            if _process is not None and _process_pid == os.getpid():
+                # Died or killed after timeout
+                _process.close()
+            _process = ExiftoolProcess()
+            _process_pid = os.getpid()
+        return _process
+
+def _close_process():
+    if _process is not None and _process_pid == os.getpid():
+        _process.close()
+
+
+atexit.register(_close_process)
@@ -1,5 +1,6 @@
-from flask import Flask, g
+from flask import Flask, g, request
 import logging
+import time
 
 from flask_cors import CORS
 from flask_smorest import Api
@@ -7,21 +8,36 @@ from blueprint.api import api_blueprint
 from blueprint.api.content.content_api import content_api
 from blueprint.api.config.config_api import config_api
 from blueprint.api.folder.folder_api import folder_api
+from blueprint.api.gallery.gallery_api import gallery_api
 from blueprint.api.metadata.metadata_api import metadata_api
+from blueprint.api.photo.photo_api import photo_api
+from blueprint.api.search.search_api import search_api
+from blueprint.api.settings.database.database_api import database_api
 from blueprint.api.settings.indexing.indexing_api import indexing_api
+from blueprint.api.settings.profile.profile_api import profile_api
 from blueprint.api.task.task_api import task_api
+from blueprint.api.timeline.timeline_api import timeline_api
 from blueprint.api.settings.settings_api import settings_api
-from database import DBSession
+from blueprint.json_provider import FastJSONProvider
+from blueprint.metrics_bp import metrics_bp
+from blueprint.request_profiling import start_request_profile, finish_request_profile
+from blueprint.request_session import LazySession, is_read_only, start_timing, server_timing
 
-from dbe import task_log, task, folder, photo, app_data
-from indexing.dbe import metadata_index, metadata_indexing_group, metadata_indexing_tag
+from dbe import task_log, task, folder, photo, app_data, pixel_hash_cache, gallery, photo_timeline, folder_stats, folder_closure, near_duplicate
+from indexing.dbe import metadata_index, metadata_indexing_group, metadata_indexing_tag, metadata_archive
 from exiftool.dbe import et_tag, et_group, et_value
+from service import metrics_service
 
 logger = logging.getLogger()
 
 
 def create_app():
+    try:
+        metrics_service.clear_previous_run()
+    except OSError as ex:
+        logger.error("Clearing metrics failed with error: " + str(ex))
     app = Flask(__name__, template_folder="templates")
+    app.json = FastJSONProvider(app)
     app.config["API_TITLE"] = "Gallery API"
     app.config["API_VERSION"] = "v1"
     app.config["OPENAPI_VERSION"] = "3.0.3"
@@ -31,25 +47,35 @@ def create_app():
 
     @app.before_request
     def before_request():
-        g.transaction_session = DBSession()
+        start_timing()
+        g.transaction_session = LazySession(is_read_only(app.view_functions.get(request.endpoint)))
+        start_request_profile()
 
     @app.after_request
     def shutdown_session(response):
         transaction_session = getattr(g, "transaction_session", None)
 
-        if transaction_session is None:
-            return response
+        if transaction_session is not None:
+            try:
+                transaction_session.finish(response.status_code)
+            except BaseException as ex:
+                logger.error("Commit failed with error: " + str(ex))
 
-        try:
-            transaction_session.commit()
-        except BaseException as ex:
-            transaction_session.rollback()
-            logger.error("Commit failed with error: " + str(ex))
-        finally:
-            transaction_session.close()
+        finish_request_profile(response)
 
+        response.headers["Server-Timing"] = server_timing()
+        record_request_metrics(response)
         return response
 
+    @app.teardown_request
+    def teardown_session(ex):
+        # after_request is skipped on unhandled exceptions, session must still go back to pool
+        finish_request_profile()
+        transaction_session = getattr(g, "transaction_session", None)
+        if transaction_session is not None and transaction_session.started:
+            transaction_session.rollback()
+            transaction_session.close()
+
     CORS(
         app,
         resources={r"/api/*": {"origins": ["http://localhost:5173"]}},
@@ -60,14 +86,31 @@ def create_app():
     )
     return app
 
+def record_request_metrics(response):
+    # Blueprint name is the full dotted name, e.g. api.settings.task
+    blueprint = request.blueprint or "none"
+    metrics_service.observe(metrics_service.HTTP_REQUEST_DURATION, time.perf_counter() - g.request_start, (blueprint,))
+    metrics_service.inc(metrics_service.HTTP_REQUESTS, (blueprint, request.method, str(response.status_code)))
+    try:
+        metrics_service.maybe_flush()
+    except OSError as ex:
+        logger.error("Metrics flush failed with error: " + str(ex))
+
 def register_blueprints(app: Flask):
     api = Api(app)
     settings_api.register_blueprint(task_api)
     settings_api.register_blueprint(indexing_api)
+    settings_api.register_blueprint(database_api)
+    settings_api.register_blueprint(profile_api)
     api_blueprint.register_blueprint(settings_api)
     api_blueprint.register_blueprint(folder_api)
     api_blueprint.register_blueprint(content_api)
     api_blueprint.register_blueprint(config_api)
     api_blueprint.register_blueprint(metadata_api)
+    api_blueprint.register_blueprint(photo_api)
+    api_blueprint.register_blueprint(search_api)
+    api_blueprint.register_blueprint(gallery_api)
+    api_blueprint.register_blueprint(timeline_api)
 
     api.register_blueprint(api_blueprint)
+    app.register_blueprint(metrics_bp)
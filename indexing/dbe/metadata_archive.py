@@ -0,0 +1,29 @@
+import uuid
+from typing import Optional
+from uuid import UUID
+
+from sqlalchemy import ForeignKey, LargeBinary
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped, mapped_column, Session
+
+from database import Base
+
+
+class MetadataArchive(Base):
+    """
+    Full exiftool output of a photo, kept out of photo_metadata so listing queries don't read it.
+    Either exif_json or exif_zstd (zstd compressed JSON) is filled.
+    """
+    __tablename__ = "photo_metadata_archive"
+
+    id: Mapped[UUID] = mapped_column(primary_key=True, default=uuid.uuid4)
+    metadata_index_id: Mapped[UUID] = mapped_column(
+        ForeignKey("photo_metadata.id", ondelete="CASCADE")
+    )
+
+    exif_json = mapped_column(JSONB, nullable=True)
+    exif_zstd: Mapped[Optional[bytes]] = mapped_column(LargeBinary)
+
+
+def find_by_metadata_index_id(session: Session, metadata_index_id: UUID) -> Optional[MetadataArchive]:
+    return session.query(MetadataArchive).filter_by(metadata_index_id=metadata_index_id).first()
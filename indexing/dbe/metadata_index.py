@@ -3,11 +3,13 @@ from datetime import datetime
 from typing import Optional, List
 from uuid import UUID
 
-from sqlalchemy import ForeignKey, UniqueConstraint
+from sqlalchemy import ForeignKey, UniqueConstraint, Enum as SAEnum, select, func
 from sqlalchemy.dialects.postgresql import JSONB
-from sqlalchemy.orm import Mapped, mapped_column, Session
+from sqlalchemy.orm import Mapped, mapped_column, relationship, Session
 
 from database import Base
+from domain.thumbnail_level import ThumbnailLevel
+from indexing.dbe.metadata_archive import MetadataArchive
 
 
 class MetadataIndex(Base):
@@ -18,9 +20,17 @@ class MetadataIndex(Base):
         ForeignKey("photo.id", ondelete="CASCADE")
     )
 
-    exif_json = mapped_column(JSONB, nullable=False)
-    user_json = mapped_column(JSONB, nullable=True)
-    effective_json = mapped_column(JSONB, nullable=True)
+    # Trimmed exiftool output used for tag search, full output is in archive.
+    # JSON is loaded only when accessed, listings read just the scalar columns.
+    exif_json = mapped_column(JSONB, nullable=False, deferred=True)
+    user_json = mapped_column(JSONB, nullable=True, deferred=True)
+    effective_json = mapped_column(JSONB, nullable=True, deferred=True)
+    archive: Mapped[Optional["MetadataArchive"]] = relationship(
+        "MetadataArchive",
+        uselist=False,
+        lazy="select",
+        cascade="all, delete-orphan"
+    )
 
     photo_created: Mapped[Optional[datetime]]
     photo_created_origin: Mapped[Optional[str]] # MetadataId key
@@ -29,10 +39,31 @@ class MetadataIndex(Base):
     height: Mapped[Optional[int]]
     size_origin: Mapped[Optional[str]]
 
-    use_thumbnail: Mapped[bool] = mapped_column(default=False)
+    # Promoted from exif_json for search filters and facet counts
+    camera_make: Mapped[Optional[str]]
+    camera_model: Mapped[Optional[str]]
+    lens_model: Mapped[Optional[str]]
+
+    thumbnail_level: Mapped[ThumbnailLevel] = mapped_column(
+        SAEnum(
+            ThumbnailLevel,
+            native_enum=False,
+            create_constraint=False,
+            validate_strings=True,
+        ), default=ThumbnailLevel.NONE
+    )
     preview_color_hex: Mapped[Optional[str]]
 
 def find_by_photo_id(session: Session, photo_id: UUID):
     return session.query(MetadataIndex).filter_by(photo_id=photo_id).first()
 
+def find_photo_ids_by_thumbnail_level(session: Session, thumbnail_level: ThumbnailLevel,
+                                      after_photo_id: Optional[UUID], limit: int) -> List[UUID]:
+    """Page of photo ids with the thumbnail level, ordered by photo id (keyset after after_photo_id)."""
+    query = select(MetadataIndex.photo_id).where(MetadataIndex.thumbnail_level == thumbnail_level)
+    if after_photo_id is not None:
+        query = query.where(MetadataIndex.photo_id > after_photo_id)
+    return list(session.scalars(query.order_by(MetadataIndex.photo_id).limit(limit)))
 
+def count_by_thumbnail_level(session: Session, thumbnail_level: ThumbnailLevel) -> int:
+    return session.scalar(select(func.count()).where(MetadataIndex.thumbnail_level == thumbnail_level))
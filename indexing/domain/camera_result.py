@@ -0,0 +1,8 @@
+from typing import Optional
+
+
+class CameraResult:
+    def __init__(self, make: Optional[str], model: Optional[str], lens_model: Optional[str]):
+        self.make: Optional[str] = make
+        self.model: Optional[str] = model
+        self.lens_model: Optional[str] = lens_model
@@ -1,11 +1,15 @@
-from typing import List
+from typing import List, Dict, Any
 
 from sqlalchemy.orm import Session
 
+from dbe.app_data import get_app_data_val
 from dbe.photo import Photo
-from domain.metadata.metadata_sets import CREATE_DATE_SET, PHOTO_SIZE_SET
+from domain.app_data_field import AppDataField
+from domain.metadata.metadata_sets import CREATE_DATE_SET, PHOTO_SIZE_SET, CAMERA_SET
+from indexing.dbe.metadata_archive import MetadataArchive
 from indexing.dbe.metadata_index import MetadataIndex
 from indexing.dbe.metadata_indexing_group import find_matching_groups, MetadataIndexingGroup
+from indexing.domain.camera_result import CameraResult
 from indexing.domain.created_date_result import CreatedDateResult
 from indexing.domain.group_type import GroupType
 from indexing import metadata_indexing_service
@@ -25,7 +29,30 @@ def create_update_metadata_index(session: Session, photo: Photo):
         session.add(metadata_index)
         photo.metadata_index = metadata_index
 
-    photo.metadata_index.exif_json = parsed_metadata
+    trimmed_groups = get_app_data_val(session, AppDataField.METADATA_INDEX_TRIMMED_GROUPS)
+    photo.metadata_index.exif_json = metadata_indexing_service.trim_metadata_index(parsed_metadata, trimmed_groups)
+    _archive_metadata(session, photo.metadata_index, parsed_metadata)
+
+def _archive_metadata(session: Session, metadata_index: MetadataIndex, parsed_metadata: Dict[str, Any]):
+    if metadata_index.archive is None:
+        metadata_index.archive = MetadataArchive()
+
+    compress = get_app_data_val(session, AppDataField.METADATA_ARCHIVE_ZSTD)
+    if compress and metadata_indexing_service.is_compression_available():
+        metadata_index.archive.exif_zstd = metadata_indexing_service.compress_metadata(parsed_metadata)
+        metadata_index.archive.exif_json = None
+    else:
+        metadata_index.archive.exif_json = parsed_metadata
+        metadata_index.archive.exif_zstd = None
+
+def get_full_metadata(metadata_index: MetadataIndex) -> Dict[str, Any]:
+    """Full exiftool output from archive, trimmed index for photos not rescanned since archive was added."""
+    archive = metadata_index.archive
+    if archive is None:
+        return metadata_index.exif_json
+    if archive.exif_zstd is not None:
+        return metadata_indexing_service.decompress_metadata(archive.exif_zstd)
+    return archive.exif_json
 
 def search_created_date_tags(session: Session, photo: Photo) -> SearchedTagsResult:
     groups: List[MetadataIndexingGroup] = find_matching_groups(session, photo.file_path, GroupType.CREATED_DATE_GROUP)
@@ -34,6 +61,12 @@ def search_created_date_tags(session: Session, photo: Photo) -> SearchedTagsResu
 def get_created_date(result: SearchedTagsResult) -> CreatedDateResult:
     return metadata_indexing_service.get_created_date(result)
 
+def search_camera_tags(photo: Photo) -> SearchedTagsResult:
+    return metadata_indexing_service.search_tag_value_by_tags(photo, CAMERA_SET)
+
+def get_camera(result: SearchedTagsResult) -> CameraResult:
+    return metadata_indexing_service.get_camera(result)
+
 def search_photo_size_tags(session: Session, photo: Photo) -> SearchedTagsResult:
     groups: List[MetadataIndexingGroup] = find_matching_groups(session, photo.file_path, GroupType.PHOTO_SIZE_GROUP)
     return metadata_indexing_service.search_tag_value(photo, groups, PHOTO_SIZE_SET)
@@ -1,11 +1,11 @@
-import json
 from datetime import datetime
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 
 from glom import glom, PathAccessError, T
 
 from dbe.photo import Photo
 from domain.metadata.metadata_id import MetadataId
+from indexing.domain.camera_result import CameraResult
 from indexing.domain.created_date_result import CreatedDateResult
 from indexing.domain.filter_type import FilterType
 from indexing.dbe.metadata_indexing_group import MetadataIndexingGroup
@@ -14,6 +14,17 @@ from exiftool.exiftool_command import ExiftoolCommand, EXIFTOOL_JSON_OPT, EXIFTO
 from indexing.domain.photo_size_result import PhotoSizeResult
 from indexing.domain.searched_tags_result import SearchedTagsResult
 from domain.metadata import metadata_parsers, metadata_defined
+from service import json_service, instrumentation
+
+# Optional zstd compression of archived metadata
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+ZSTD_LEVEL = 9
+BINARY_PLACEHOLDER_PREFIX = "(Binary data "
+BINARY_PLACEHOLDER_HINT = "use -b option to extract"
 
 def get_photo_size(result: SearchedTagsResult) -> PhotoSizeResult:
     width = None
@@ -37,6 +48,18 @@ def get_photo_size(result: SearchedTagsResult) -> PhotoSizeResult:
                 height_origin = found_metadata_id.get_key()
     return PhotoSizeResult(width, height, width_origin, height_origin)
 
+def get_camera(result: SearchedTagsResult) -> CameraResult:
+    return CameraResult(_get_text_value(result, metadata_defined.EXIF_MAKE),
+                        _get_text_value(result, metadata_defined.EXIF_MODEL),
+                        _get_text_value(result, metadata_defined.EXIF_LENS_MODEL))
+
+def _get_text_value(result: SearchedTagsResult, metadata_id: MetadataId) -> Optional[str]:
+    value = result.get_value(metadata_id).value
+    if value is None:
+        return None
+    value = str(value).strip()
+    return value if value else None
+
 # returns one parsed created date from result
 def get_created_date(result: SearchedTagsResult) -> CreatedDateResult:
     for requested_tag in result.requested_tags:
@@ -99,17 +122,18 @@ def search_tag_value_by_tags(photo: Photo, requested_tags: [MetadataId]) -> Sear
     if photo.metadata_index is None:
         return result
     
-    for requested_tag in requested_tags:
-        try:
-            # First try: search in tags (if g1 is None) or exact g1 path
-            value = search_index_value(photo.metadata_index.exif_json, requested_tag)
-            result.add_result(requested_tag, requested_tag, value)
-        except PathAccessError:
-            # If g1 is not defined and tags search failed, try searching in all g1 keys
-            if requested_tag.group_1 is None:
-                g1_results = _search_in_all_g1(photo.metadata_index.exif_json, requested_tag)
-                for g1_result in g1_results:
-                    result.add_result(requested_tag, g1_result[0], g1_result[1])
+    with instrumentation.timed("metadata.tag_lookup"): # glom lookups
+        for requested_tag in requested_tags:
+            try:
+                # First try: search in tags (if g1 is None) or exact g1 path
+                value = search_index_value(photo.metadata_index.exif_json, requested_tag)
+                result.add_result(requested_tag, requested_tag, value)
+            except PathAccessError:
+                # If g1 is not defined and tags search failed, try searching in all g1 keys
+                if requested_tag.group_1 is None:
+                    g1_results = _search_in_all_g1(photo.metadata_index.exif_json, requested_tag)
+                    for g1_result in g1_results:
+                        result.add_result(requested_tag, g1_result[0], g1_result[1])
     return result
 
 def _search_in_all_g1(index_data: Dict, metadata_id: MetadataId) -> List:
@@ -162,7 +186,8 @@ def get_metadata_index_from_file(photo_path: str, filtering_groups: List[Metadat
     # Run the command to get JSON data
     json_data: str = run_command(command)
     # Parse index
-    return _parse_metadata_index(json_data)
+    with instrumentation.timed("exiftool.parse"):
+        return _parse_metadata_index(json_data)
 
 def _parse_metadata_index(json_data: str) -> Dict[str, Any]:
     """
@@ -178,7 +203,7 @@ def _parse_metadata_index(json_data: str) -> Dict[str, Any]:
     }
     Keys without colons go into "tags" under the g0 key.
     """
-    data = json.loads(json_data)
+    data = json_service.loads(json_data)
     result: Dict[str, Any] = {}
     
     # Handle both single object and array of objects
@@ -196,28 +221,51 @@ def _parse_metadata_index(json_data: str) -> Dict[str, Any]:
                 continue
             
             # Split key by colon to get g0 and optionally g1
-            parts = key.split(":", 1)
-            g0 = parts[0]
-            g1 = parts[1] if len(parts) > 1 else None
+            g0, separator, g1 = key.partition(":")
             
             # Initialize g0 entry if it doesn't exist
-            if g0 not in result:
-                result[g0] = {}
+            g0_entry = result.setdefault(g0, {})
             
-            if g1 is not None:
+            if separator:
                 # Has g1: add to g1 structure
-                if "g1" not in result[g0]:
-                    result[g0]["g1"] = {}
-                result[g0]["g1"][g1] = value
+                g0_entry.setdefault("g1", {})[g1] = value
             else:
                 # No g1: add to tags
-                if "tags" not in result[g0]:
-                    result[g0]["tags"] = {}
-                result[g0]["tags"].update(value)
+                g0_entry.setdefault("tags", {}).update(value)
     
     return result
 
 
+def trim_metadata_index(metadata_index: Dict[str, Any], trimmed_groups: List[str]) -> Dict[str, Any]:
+    """
+    Returns copy of v4 metadata index without trimmed g0 groups (e.g. MakerNotes) and without exiftool
+    binary placeholders like "(Binary data 11240 bytes, use -b option to extract)".
+    """
+    return {g0: _without_binary_placeholders(g0_data) for g0, g0_data in metadata_index.items()
+            if g0 not in trimmed_groups}
+
+def _without_binary_placeholders(value):
+    if isinstance(value, dict):
+        return {k: _without_binary_placeholders(v) for k, v in value.items() if not _is_binary_placeholder(v)}
+    if isinstance(value, list):
+        return [_without_binary_placeholders(v) for v in value if not _is_binary_placeholder(v)]
+    return value
+
+def _is_binary_placeholder(value) -> bool:
+    return isinstance(value, str) and value.startswith(BINARY_PLACEHOLDER_PREFIX) and BINARY_PLACEHOLDER_HINT in value
+
+def compress_metadata(metadata_index: Dict[str, Any]) -> bytes:
+    return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(json_service.dumps(metadata_index).encode("utf-8"))
+
+def decompress_metadata(data: bytes) -> Dict[str, Any]:
+    if zstandard is None:
+        raise RuntimeError("Metadata archive is zstd compressed but zstandard is not installed")
+    return json_service.loads(zstandard.ZstdDecompressor().decompress(data))
+
+def is_compression_available() -> bool:
+    return zstandard is not None
+
+
 # Get one out of multiple groups based on which file path match is more close. We assume input groups are already
 # matched by path - for example None, folder1/, folder1/folder2/
 def _get_closest_match(matched_groups: [MetadataIndexingGroup]) -> MetadataIndexingGroup:
@@ -1,6 +1,6 @@
 from database import Base, engine
-from dbe import task_log, task, folder, photo, app_data
-from indexing.dbe import metadata_index, metadata_indexing_group, metadata_indexing_tag
+from dbe import task_log, task, folder, photo, app_data, pixel_hash_cache, gallery, photo_timeline, folder_stats, folder_closure, folder_access, near_duplicate
+from indexing.dbe import metadata_index, metadata_indexing_group, metadata_indexing_tag, metadata_archive
 from exiftool.dbe import et_tag, et_group, et_value
 
 if __name__ == "__main__":
@@ -0,0 +1,23 @@
+-- public.pixel_hash_cache definition
+
+-- Drop table
+
+-- DROP TABLE public.pixel_hash_cache;
+
+CREATE TABLE public.pixel_hash_cache (
+	id uuid NOT NULL,
+	file_path varchar NOT NULL,
+	file_size int8 NOT NULL,
+	mtime_ns int8 NOT NULL,
+	content_hash varchar NOT NULL,
+	pixel_hash varchar NOT NULL,
+	updated timestamp NOT NULL,
+	CONSTRAINT pixel_hash_cache_pkey PRIMARY KEY (id)
+);
+
+CREATE UNIQUE INDEX pixel_hash_cache_file_path_idx ON public.pixel_hash_cache USING btree (file_path);
+CREATE INDEX pixel_hash_cache_content_idx ON public.pixel_hash_cache USING btree (file_size, content_hash);
+
+-- Lookups used by the scan task
+CREATE INDEX photo_file_path_idx ON public.photo USING btree (file_path);
+CREATE INDEX photo_file_hash_idx ON public.photo USING btree (file_hash);
@@ -0,0 +1,3 @@
+-- Perceptual hash (64-bit dHash) for near-duplicate detection
+ALTER TABLE public.photo ADD perceptual_hash int8 NULL;
+ALTER TABLE public.pixel_hash_cache ADD perceptual_hash int8 NULL;
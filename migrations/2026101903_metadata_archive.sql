@@ -0,0 +1,24 @@
+-- public.photo_metadata_archive definition
+
+-- Drop table
+
+-- DROP TABLE public.photo_metadata_archive;
+
+CREATE TABLE public.photo_metadata_archive (
+	id uuid NOT NULL,
+	metadata_index_id uuid NOT NULL,
+	exif_json jsonb NULL,
+	exif_zstd bytea NULL,
+	CONSTRAINT photo_metadata_archive_pkey PRIMARY KEY (id),
+	CONSTRAINT photo_metadata_archive_metadata_index_id_fkey FOREIGN KEY (metadata_index_id) REFERENCES public.photo_metadata(id) ON DELETE CASCADE
+);
+
+CREATE UNIQUE INDEX photo_metadata_archive_metadata_index_id_idx ON public.photo_metadata_archive USING btree (metadata_index_id);
+CREATE INDEX photo_metadata_photo_id_idx ON public.photo_metadata USING btree (photo_id);
+
+-- Move full exiftool output to the archive
+INSERT INTO public.photo_metadata_archive (id, metadata_index_id, exif_json)
+SELECT gen_random_uuid(), id, exif_json FROM public.photo_metadata;
+
+-- Trim the index, binary placeholders are removed on the next scan
+UPDATE public.photo_metadata SET exif_json = exif_json - 'MakerNotes' WHERE exif_json ? 'MakerNotes';
@@ -0,0 +1,23 @@
+-- Promoted columns for search filters and facets
+
+ALTER TABLE public.photo_metadata ADD camera_make varchar NULL;
+ALTER TABLE public.photo_metadata ADD camera_model varchar NULL;
+ALTER TABLE public.photo_metadata ADD lens_model varchar NULL;
+
+-- Filled by the next scan, this covers the common EXIF layout
+UPDATE public.photo_metadata SET
+	camera_make = NULLIF(btrim(exif_json #>> '{EXIF,g1,IFD0,Make}'), ''),
+	camera_model = NULLIF(btrim(exif_json #>> '{EXIF,g1,IFD0,Model}'), ''),
+	lens_model = NULLIF(btrim(exif_json #>> '{EXIF,g1,ExifIFD,LensModel}'), '');
+
+-- "path == constant" predicates (@@, @>) of search_service
+CREATE INDEX photo_metadata_exif_json_gin_idx ON public.photo_metadata USING gin (exif_json jsonb_path_ops);
+CREATE INDEX photo_metadata_effective_json_gin_idx ON public.photo_metadata USING gin (effective_json jsonb_path_ops);
+
+-- Facet counts and filters, photo_id makes index-only scans possible with a join to photo
+CREATE INDEX photo_metadata_camera_make_idx ON public.photo_metadata USING btree (camera_make, photo_id);
+CREATE INDEX photo_metadata_camera_model_idx ON public.photo_metadata USING btree (camera_model, photo_id);
+CREATE INDEX photo_metadata_lens_model_idx ON public.photo_metadata USING btree (lens_model, photo_id);
+
+-- Search result ordering
+CREATE INDEX photo_metadata_photo_created_idx ON public.photo_metadata USING btree (photo_created DESC NULLS LAST, photo_id DESC);
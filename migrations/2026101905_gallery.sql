@@ -0,0 +1,35 @@
+-- public.gallery definition
+
+-- Drop table
+
+-- DROP TABLE public.gallery;
+
+CREATE TABLE public.gallery (
+	id uuid NOT NULL,
+	"name" varchar NOT NULL,
+	criteria_json jsonb NOT NULL,
+	created timestamp NOT NULL,
+	rebuilt timestamp NULL,
+	CONSTRAINT gallery_pkey PRIMARY KEY (id)
+);
+
+
+-- public.gallery_photo definition
+
+-- Drop table
+
+-- DROP TABLE public.gallery_photo;
+
+CREATE TABLE public.gallery_photo (
+	gallery_id uuid NOT NULL,
+	photo_id uuid NOT NULL,
+	photo_created timestamp NULL,
+	CONSTRAINT gallery_photo_pkey PRIMARY KEY (gallery_id, photo_id),
+	CONSTRAINT gallery_photo_gallery_id_fkey FOREIGN KEY (gallery_id) REFERENCES public.gallery(id) ON DELETE CASCADE,
+	CONSTRAINT gallery_photo_photo_id_fkey FOREIGN KEY (photo_id) REFERENCES public.photo(id) ON DELETE CASCADE
+);
+
+-- Keyset pagination of gallery listing
+CREATE INDEX gallery_photo_listing_idx ON public.gallery_photo USING btree (gallery_id, photo_created DESC NULLS LAST, photo_id DESC);
+-- Incremental updates and photo delete cascade
+CREATE INDEX gallery_photo_photo_id_idx ON public.gallery_photo USING btree (photo_id);
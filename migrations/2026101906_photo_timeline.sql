@@ -0,0 +1,20 @@
+-- public.photo_timeline definition
+
+-- Drop table
+
+-- DROP TABLE public.photo_timeline;
+
+CREATE TABLE public.photo_timeline (
+	folder_id uuid NOT NULL,
+	"day" date NOT NULL,
+	photo_count int4 NOT NULL,
+	CONSTRAINT photo_timeline_pkey PRIMARY KEY (folder_id, day),
+	CONSTRAINT photo_timeline_folder_id_fkey FOREIGN KEY (folder_id) REFERENCES public.folder(id) ON DELETE CASCADE
+);
+
+-- Initial fill, the scan task rebuilds it afterwards
+INSERT INTO public.photo_timeline (folder_id, "day", photo_count)
+SELECT p.folder_id, CAST(m.photo_created AS date), count(*)
+FROM public.photo p JOIN public.photo_metadata m ON p.id = m.photo_id
+WHERE m.photo_created IS NOT NULL
+GROUP BY p.folder_id, CAST(m.photo_created AS date);
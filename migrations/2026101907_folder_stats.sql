@@ -0,0 +1,28 @@
+ALTER TABLE public.photo ADD file_size int8 NULL;
+
+
+-- public.folder_stats definition
+
+-- Drop table
+
+-- DROP TABLE public.folder_stats;
+
+CREATE TABLE public.folder_stats (
+	folder_id uuid NOT NULL,
+	direct_photo_count int4 NOT NULL,
+	direct_size_bytes int8 NOT NULL,
+	direct_created_min timestamp NULL,
+	direct_created_max timestamp NULL,
+	direct_cover_photo_id uuid NULL,
+	photo_count int4 NOT NULL,
+	size_bytes int8 NOT NULL,
+	created_min timestamp NULL,
+	created_max timestamp NULL,
+	cover_photo_id uuid NULL,
+	CONSTRAINT folder_stats_pkey PRIMARY KEY (folder_id),
+	CONSTRAINT folder_stats_folder_id_fkey FOREIGN KEY (folder_id) REFERENCES public.folder(id) ON DELETE CASCADE,
+	CONSTRAINT folder_stats_direct_cover_photo_id_fkey FOREIGN KEY (direct_cover_photo_id) REFERENCES public.photo(id) ON DELETE SET NULL,
+	CONSTRAINT folder_stats_cover_photo_id_fkey FOREIGN KEY (cover_photo_id) REFERENCES public.photo(id) ON DELETE SET NULL
+);
+
+-- Sizes and stats are filled by the next scan, folders without stats are returned without them
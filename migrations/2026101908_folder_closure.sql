@@ -0,0 +1,29 @@
+-- public.folder_closure definition
+
+-- Drop table
+
+-- DROP TABLE public.folder_closure;
+
+CREATE TABLE public.folder_closure (
+	ancestor_id uuid NOT NULL,
+	descendant_id uuid NOT NULL,
+	"depth" int4 NOT NULL,
+	CONSTRAINT folder_closure_pkey PRIMARY KEY (ancestor_id, descendant_id),
+	CONSTRAINT folder_closure_ancestor_id_fkey FOREIGN KEY (ancestor_id) REFERENCES public.folder(id) ON DELETE CASCADE,
+	CONSTRAINT folder_closure_descendant_id_fkey FOREIGN KEY (descendant_id) REFERENCES public.folder(id) ON DELETE CASCADE
+);
+
+-- Breadcrumbs and ancestor lookups, pkey serves subtree lookups
+CREATE INDEX folder_closure_descendant_idx ON public.folder_closure USING btree (descendant_id, depth);
+-- Child lookups used by folder listing and stats refresh
+CREATE INDEX folder_parent_id_idx ON public.folder USING btree (parent_id);
+
+-- Backfill existing folders
+INSERT INTO public.folder_closure (ancestor_id, descendant_id, "depth")
+WITH RECURSIVE closure(ancestor_id, descendant_id, "depth") AS (
+	SELECT id, id, 0 FROM public.folder
+	UNION ALL
+	SELECT c.ancestor_id, f.id, c."depth" + 1
+	FROM public.folder f JOIN closure c ON f.parent_id = c.descendant_id
+)
+SELECT ancestor_id, descendant_id, "depth" FROM closure;
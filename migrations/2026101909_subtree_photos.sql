@@ -0,0 +1,6 @@
+-- Subtree photo listing (POST /folder/subtree-photos)
+-- Small subtrees: closure pkey (ancestor_id, descendant_id) -> photo by folder, then sort of the few matching rows
+-- Large subtrees: walk photo_metadata_photo_created_idx in keyset order and stop after one page,
+-- membership is a semi-join probe of the folder ids below
+CREATE INDEX photo_folder_id_idx ON public.photo USING btree (folder_id);
+CREATE INDEX photo_virtual_folder_id_idx ON public.photo USING btree (virtual_folder_id) WHERE virtual_folder_id IS NOT NULL;
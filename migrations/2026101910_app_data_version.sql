@@ -0,0 +1,20 @@
+-- public.app_data_version definition
+
+-- Drop table
+
+-- DROP TABLE public.app_data_version;
+
+CREATE TABLE public.app_data_version (
+	id int4 NOT NULL,
+	"version" int8 NOT NULL,
+	CONSTRAINT app_data_version_pkey PRIMARY KEY (id)
+);
+
+INSERT INTO public.app_data_version (id, "version") VALUES (1, 0);
+
+-- Keep the newest duplicate of each field, unique constraint backs the upsert by field name
+DELETE FROM public.app_data a
+USING public.app_data b
+WHERE a.field_name = b.field_name AND a.ctid < b.ctid;
+
+ALTER TABLE public.app_data ADD CONSTRAINT app_data_field_name_key UNIQUE (field_name);
@@ -0,0 +1,2 @@
+-- Timers and counters of a task run, see service.instrumentation
+ALTER TABLE public.task ADD metrics jsonb NULL;
@@ -0,0 +1,8 @@
+-- use_thumbnail becomes thumbnail level, see domain.thumbnail_level.ThumbnailLevel
+ALTER TABLE public.photo_metadata ADD thumbnail_level varchar(9) NOT NULL DEFAULT 'NONE';
+UPDATE public.photo_metadata SET thumbnail_level = 'RENDITION' WHERE use_thumbnail;
+ALTER TABLE public.photo_metadata ALTER COLUMN thumbnail_level DROP DEFAULT;
+ALTER TABLE public.photo_metadata DROP COLUMN use_thumbnail;
+
+-- Photos waiting for their rendition
+CREATE INDEX photo_metadata_thumbnail_embedded_idx ON public.photo_metadata USING btree (photo_id) WHERE thumbnail_level = 'EMBEDDED';
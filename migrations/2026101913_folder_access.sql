@@ -0,0 +1,14 @@
+-- public.folder_access definition
+
+-- Drop table
+
+-- DROP TABLE public.folder_access;
+
+CREATE TABLE public.folder_access (
+	folder_id uuid NOT NULL,
+	accessed timestamp NOT NULL,
+	CONSTRAINT folder_access_pkey PRIMARY KEY (folder_id),
+	CONSTRAINT folder_access_folder_id_fkey FOREIGN KEY (folder_id) REFERENCES public.folder(id) ON DELETE CASCADE
+);
+
+CREATE INDEX folder_access_accessed_idx ON public.folder_access USING btree (accessed);
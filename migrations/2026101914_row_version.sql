@@ -0,0 +1,3 @@
+-- Optimistic locking of photo and folder rows, see version_id_col of dbe.photo.Photo and dbe.folder.Folder
+ALTER TABLE public.photo ADD "version" int4 NOT NULL DEFAULT 1;
+ALTER TABLE public.folder ADD "version" int4 NOT NULL DEFAULT 1;
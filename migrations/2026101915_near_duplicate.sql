@@ -0,0 +1,14 @@
+-- public.near_duplicate definition
+
+-- Drop table
+
+-- DROP TABLE public.near_duplicate;
+
+CREATE TABLE public.near_duplicate (
+	photo_id uuid NOT NULL,
+	cluster_rank int4 NOT NULL,
+	CONSTRAINT near_duplicate_pkey PRIMARY KEY (photo_id),
+	CONSTRAINT near_duplicate_photo_id_fkey FOREIGN KEY (photo_id) REFERENCES public.photo(id) ON DELETE CASCADE
+);
+
+CREATE INDEX ix_near_duplicate_cluster_rank ON public.near_duplicate USING btree (cluster_rank);
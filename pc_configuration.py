@@ -1,3 +1,25 @@
+import os
+import tempfile
+
 DB_CONNECTION_STRING = ["db_connection_string", None]
 COLLECTION_PATH = ["collection_path", None]
-GENERATED_PATH = ["generated_path", None]
\ No newline at end of file
+GENERATED_PATH = ["generated_path", None]
+# Pillow decompression bomb limit, images above 2x this value are refused
+MAX_IMAGE_PIXELS = ["max_image_pixels", 89478485]
+# Connection pool of each process (gunicorn worker, task process)
+DB_POOL_SIZE = ["db.pool_size", 5]
+DB_POOL_MAX_OVERFLOW = ["db.max_overflow", 5]
+DB_POOL_TIMEOUT = ["db.pool_timeout", 30] # seconds to wait for a free connection
+DB_POOL_RECYCLE = ["db.pool_recycle", 1800] # seconds, older connections are reopened
+DB_POOL_PRE_PING = ["db.pool_pre_ping", True]
+# Pooling is left to PgBouncer (transaction mode), no connections are kept by the app
+DB_PGBOUNCER = ["db.pgbouncer", False]
+# Statement timeout of API requests in milliseconds, 0 disables it. Tasks are not limited.
+DB_STATEMENT_TIMEOUT_MS = ["db.statement_timeout_ms", 0]
+# Folder shared by all processes (gunicorn workers, task processes) for /metrics, each process writes its own file.
+# Files of exited processes are merged into one, files of the previous run are removed when the service starts.
+METRICS_PATH = ["metrics_path", os.path.join(tempfile.gettempdir(), "photo-cabinet-metrics")]
+# Profiling of single requests (X-Profile header or ?profile=1) and tasks started by them, off in production.
+# Profiles are written to <generated_path>/profiles unless profiling.path is set.
+PROFILING_ENABLED = ["profiling.enabled", False]
+PROFILING_PATH = ["profiling.path", ""]
@@ -0,0 +1,60 @@
+from typing import Any, Dict, List, Tuple
+
+from service.image_service import hamming_distance
+
+
+class _BKNode:
+    __slots__ = ("key", "values", "children")
+
+    def __init__(self, key: int, value: Any):
+        self.key: int = key
+        self.values: List[Any] = [value]
+        self.children: Dict[int, "_BKNode"] = {}
+
+
+class BKTree:
+    """
+    Burkhard-Keller tree over 64-bit hashes with Hamming distance. A search for distance k only visits
+    children whose edge distance is within k of the query distance, so most of the tree is skipped.
+    Values with identical hash share one node.
+    """
+
+    def __init__(self):
+        self.root = None
+        self.size = 0
+
+    def add(self, key: int, value: Any):
+        self.size += 1
+        if self.root is None:
+            self.root = _BKNode(key, value)
+            return
+
+        node = self.root
+        while True:
+            distance = hamming_distance(key, node.key)
+            if distance == 0:
+                node.values.append(value)
+                return
+            child = node.children.get(distance)
+            if child is None:
+                node.children[distance] = _BKNode(key, value)
+                return
+            node = child
+
+    def search(self, key: int, max_distance: int) -> List[Tuple[int, Any]]:
+        """Returns (distance, value) of all values within max_distance, closest first."""
+        if self.root is None:
+            return []
+
+        found = []
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            distance = hamming_distance(key, node.key)
+            if distance <= max_distance:
+                found.extend((distance, value) for value in node.values)
+            for edge, child in node.children.items():
+                if distance - max_distance <= edge <= distance + max_distance:
+                    stack.append(child)
+        found.sort(key=lambda item: item[0])
+        return found
@@ -2,46 +2,83 @@ import uuid
 from typing import Tuple, List, Optional, Set
 from uuid import UUID
 
-from sqlalchemy import select, literal, desc, asc, nullslast, update
-from sqlalchemy.orm import Session, aliased
+from sqlalchemy import select, desc, asc, nullslast, update
+from sqlalchemy.orm import Session
 
+from dbe import folder_closure, photo_timeline
 from dbe.folder import Folder
+from dbe.folder_closure import FolderClosure
 from dbe.photo import Photo
 from domain.folder_content import FolderContent
 from domain.folder_type import FolderType
 from domain.ordering_type import OrderingType
 from indexing.dbe.metadata_index import MetadataIndex
+from service import folder_stats_service
 
 
 def get_breadcrumb(session: Session, folder_id: uuid.UUID) -> List[Folder]:
-    # WITH RECURSIVE ancestors(id, parent_id, name, depth) AS (
-    #   SELECT id, parent_id, name, 0 FROM folder WHERE id = :folder_id
-    #   UNION ALL
-    #   SELECT p.id, p.parent_id, p.name, a.depth + 1
-    #   FROM folder p JOIN ancestors a ON p.id = a.parent_id
-    # )
-    # SELECT * FROM ancestors ORDER BY depth DESC;
-    ancestors = (
-        select(
-            Folder.id, Folder.parent_id, Folder.name, literal(0).label("depth")
-        )
-        .where(Folder.id == folder_id)
-        .cte(name="ancestors", recursive=True)
-    )
-
-    parent = aliased(Folder)
-    ancestors = ancestors.union_all(
-        select(parent.id, parent.parent_id, parent.name, ancestors.c.depth + 1)
-        .join(parent, parent.id == ancestors.c.parent_id)
-    )
-
-    # Map CTE rows back to Folder instances ordered root → current
+    # Folders root → current, one range scan of folder_closure by descendant
     return session.scalars(
         select(Folder)
-        .join(ancestors, ancestors.c.id == Folder.id)
-        .order_by(ancestors.c.depth.desc())
+        .join(FolderClosure, FolderClosure.ancestor_id == Folder.id)
+        .where(FolderClosure.descendant_id == folder_id)
+        .order_by(FolderClosure.depth.desc())
     ).all()
 
+def create_folder(session: Session, folder_name: Optional[str], parent_id: Optional[UUID], folder_type: FolderType) -> Folder:
+    """Creates folder together with its closure rows, all folders should be created here."""
+    folder = Folder()
+    folder.name = folder_name
+    folder.parent_id = parent_id
+    folder.folder_type = folder_type
+    session.add(folder)
+    session.flush()
+    folder_closure.insert_folder(session, folder.id, parent_id)
+    return folder
+
+def move_folder(session: Session, folder: Folder, new_parent_id: UUID):
+    """Moves folder with its subtree under new parent. Raises ValueError when the parent is inside the subtree."""
+    if folder_closure.is_descendant(session, new_parent_id, folder.id):
+        raise ValueError(f"Folder {new_parent_id} is inside subtree of {folder.id}")
+    old_parent_id = folder.parent_id
+    folder.parent_id = new_parent_id
+    session.flush()
+    folder_closure.move_subtree(session, folder.id, new_parent_id)
+    folder_stats_service.refresh_folder_stats(session, {old_parent_id, new_parent_id} - {None})
+
+def move_selection(session: Session, folder_ids: List[UUID], photo_ids: List[UUID], target_folder_id: UUID):
+    """
+    Move selection into a virtual folder: photos get it as virtual_folder_id, virtual folders are moved under it
+    with their subtrees. Non-virtual folders are skipped. Raises ValueError when the target is inside a moved subtree,
+    all folders are checked before anything is written.
+    """
+    folders: List[Folder] = []
+    for folder_id in folder_ids:
+        folder = session.get(Folder, folder_id)
+        if folder is None or folder.folder_type != FolderType.VIRTUAL or folder.parent_id == target_folder_id:
+            continue
+        if folder_closure.is_descendant(session, target_folder_id, folder.id):
+            raise ValueError(f"Folder {target_folder_id} is inside subtree of {folder.id}")
+        folders.append(folder)
+
+    affected_folder_ids: Set[UUID] = {target_folder_id}
+    if photo_ids:
+        affected_folder_ids.update(session.scalars(
+            select(Photo.virtual_folder_id)
+            .where(Photo.id.in_(photo_ids), Photo.virtual_folder_id.isnot(None))
+            .distinct()
+        ).all())
+        session.execute(
+            update(Photo)
+            .where(Photo.id.in_(photo_ids))
+            .values(virtual_folder_id=target_folder_id, version=Photo.version + 1)
+        )
+        folder_stats_service.refresh_folder_stats(session, affected_folder_ids)
+        photo_timeline.refresh(session, affected_folder_ids)
+
+    for folder in folders:
+        move_folder(session, folder, target_folder_id)
+
 def get_folder_contents(session: Session, folder_id: UUID, ordering_type: Optional[OrderingType] = None) -> FolderContent:
     if ordering_type is None:
         ordering_type = OrderingType.ALPHABETICAL_ASC
@@ -77,29 +114,14 @@ def get_folder_contents(session: Session, folder_id: UUID, ordering_type: Option
 
 def _find_all_virtual_descendant_folders(session: Session, folder_id: UUID) -> Set[UUID]:
     """
-    Recursively find all virtual descendant folders starting from the given folder_id.
+    Find all virtual descendant folders starting from the given folder_id.
     Returns a set of folder IDs including the root folder if it's virtual.
     """
-    descendants = (
-        select(
-            Folder.id, Folder.parent_id, Folder.folder_type, literal(0).label("depth")
-        )
-        .where(Folder.id == folder_id)
-        .cte(name="descendants", recursive=True)
-    )
-    
-    child = aliased(Folder)
-    descendants = descendants.union_all(
-        select(child.id, child.parent_id, child.folder_type, descendants.c.depth + 1)
-        .join(child, child.parent_id == descendants.c.id)
-        .where(child.folder_type == FolderType.VIRTUAL)
-    )
-    
     folder_ids = session.scalars(
-        select(descendants.c.id)
-        .where(descendants.c.folder_type == FolderType.VIRTUAL)
+        select(Folder.id)
+        .join(FolderClosure, FolderClosure.descendant_id == Folder.id)
+        .where(FolderClosure.ancestor_id == folder_id, Folder.folder_type == FolderType.VIRTUAL)
     ).all()
-    
     return set(folder_ids)
 
 
@@ -113,16 +135,26 @@ def remove_selection(session: Session, folder_ids: List[UUID], photo_ids: List[U
       - Unsets virtual_folder_id to None for all photos referencing these folders
       - Removes the virtual folders
     """
+    # Folders whose photos change, for folder stats refresh
+    affected_folder_ids: Set[UUID] = set()
+    if photo_ids:
+        affected_folder_ids.update(session.scalars(
+            select(Photo.virtual_folder_id)
+            .where(Photo.id.in_(photo_ids), Photo.virtual_folder_id.isnot(None))
+            .distinct()
+        ).all())
+
     # First, unset virtual_folder_id for all photo_ids
     if photo_ids:
         session.execute(
             update(Photo)
             .where(Photo.id.in_(photo_ids))
-            .values(virtual_folder_id=None)
+            .values(virtual_folder_id=None, version=Photo.version + 1)
         )
     
     # Process each folder_id
     all_folder_ids_to_delete: Set[UUID] = set()
+    parent_ids_of_deleted: Set[UUID] = set()
     
     for folder_id in folder_ids:
         folder = session.query(Folder).filter_by(id=folder_id).first()
@@ -135,13 +167,15 @@ def remove_selection(session: Session, folder_ids: List[UUID], photo_ids: List[U
         # Recursively find all virtual descendant folders
         descendant_ids = _find_all_virtual_descendant_folders(session, folder_id)
         all_folder_ids_to_delete.update(descendant_ids)
+        if folder.parent_id is not None:
+            parent_ids_of_deleted.add(folder.parent_id)
     
     # Unset virtual_folder_id for all photos referencing folders to be deleted
     if all_folder_ids_to_delete:
         session.execute(
             update(Photo)
             .where(Photo.virtual_folder_id.in_(all_folder_ids_to_delete))
-            .values(virtual_folder_id=None)
+            .values(virtual_folder_id=None, version=Photo.version + 1)
         )
     
     # Delete all virtual folders
@@ -150,3 +184,10 @@ def remove_selection(session: Session, folder_ids: List[UUID], photo_ids: List[U
         # Using CASCADE delete, but we need to ensure order
         session.query(Folder).filter(Folder.id.in_(all_folder_ids_to_delete)).delete(synchronize_session=False)
 
+    # Parents of removed subtrees lose their photos as well, stats of removed folders are deleted by cascade
+    affected_folder_ids -= all_folder_ids_to_delete
+    affected_folder_ids.update(parent_ids_of_deleted - all_folder_ids_to_delete)
+    folder_stats_service.refresh_folder_stats(session, affected_folder_ids)
+    # Timeline rows are per folder without subtree, rows of removed folders are deleted by cascade
+    photo_timeline.refresh(session, affected_folder_ids)
+
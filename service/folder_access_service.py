@@ -0,0 +1,71 @@
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy.exc import SQLAlchemyError
+
+from database import DBSession
+from dbe.folder_access import upsert_access
+
+logger = logging.getLogger()
+
+# An access is written at most this often per folder and process, browsing a folder is many requests
+RECORD_INTERVAL_S = 60
+# Folders viewed within this window are scanned first
+HOT_FOLDER_WINDOW = timedelta(days=1)
+# Then folders modified within this window, newest first. Older ones get their metadata indexed last.
+RECENT_FOLDER_WINDOW = timedelta(days=30)
+
+HOT = 0
+RECENT = 1
+COLD = 2
+
+_recorded: Dict[UUID, float] = dict()
+_recorded_lock = threading.Lock()
+
+
+def record_access(folder_id: UUID):
+    """
+    Remembers that the folder is being viewed. Runs in its own short transaction, endpoints of /folder/* are
+    read only. Failures (e.g. folder deleted meanwhile) are only logged, the request doesn't depend on it.
+    """
+    now = time.monotonic()
+    with _recorded_lock:
+        last = _recorded.get(folder_id)
+        if last is not None and now - last < RECORD_INTERVAL_S:
+            return
+        _recorded[folder_id] = now
+        if len(_recorded) > 10000:
+            _prune_recorded(now)
+
+    session = DBSession()
+    try:
+        upsert_access(session, folder_id, datetime.now())
+        session.commit()
+    except SQLAlchemyError as e:
+        session.rollback()
+        logger.warning(f"Access of folder {folder_id} wasn't recorded: {e}")
+    finally:
+        session.close()
+
+def scan_priority(folder_id: UUID, mtime: float, hot_folders: Dict[UUID, datetime],
+                  now: Optional[datetime] = None) -> Tuple[int, float]:
+    """
+    Heap key of a folder in the scan queue, lower goes first. Viewed folders (and folders on the path to them)
+    by last access, then recently modified folders by mtime, newest first, then the rest in walk order.
+    """
+    accessed = hot_folders.get(folder_id)
+    if accessed is not None:
+        return HOT, -accessed.timestamp()
+    now = now or datetime.now()
+    if mtime >= (now - RECENT_FOLDER_WINDOW).timestamp():
+        return RECENT, -mtime
+    return COLD, 0.0
+
+def _prune_recorded(now: float):
+    for folder_id, last in list(_recorded.items()):
+        if now - last >= RECORD_INTERVAL_S:
+            del _recorded[folder_id]
@@ -0,0 +1,144 @@
+from typing import Dict, Iterable, List, Optional, Set
+from uuid import UUID
+
+from sqlalchemy import select, func, desc, delete, insert, or_
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from sqlalchemy.orm import Session
+
+from dbe.folder import Folder
+from dbe.folder_closure import FolderClosure, ancestor_ids
+from dbe.folder_stats import FolderStats, find_by_folder_ids
+from dbe.photo import Photo
+from domain.subtree_stats import SubtreeStats
+from indexing.dbe.metadata_index import MetadataIndex
+
+
+def rebuild_folder_stats(session: Session):
+    """Recomputes stats of all folders - direct stats in one aggregation, subtree stats bottom-up in memory."""
+    session.flush()
+    direct_stats = _find_direct_stats(session, None)
+    children_by_parent: Dict[Optional[UUID], List[UUID]] = dict()
+    for folder_id, parent_id in session.execute(select(Folder.id, Folder.parent_id)):
+        children_by_parent.setdefault(parent_id, []).append(folder_id)
+    children_by_parent.setdefault(None, [])
+
+    rows = []
+    # Iterative post-order, folder trees can be deeper than recursion limit
+    stack = [(folder_id, False) for folder_id in children_by_parent[None]]
+    subtree_stats: Dict[UUID, SubtreeStats] = dict()
+    while stack:
+        folder_id, children_done = stack.pop()
+        children = children_by_parent.get(folder_id, [])
+        if not children_done:
+            stack.append((folder_id, True))
+            stack.extend((child_id, False) for child_id in children)
+            continue
+        direct = direct_stats.get(folder_id, SubtreeStats())
+        subtree = SubtreeStats.combine([direct] + [subtree_stats.pop(child_id) for child_id in children])
+        subtree_stats[folder_id] = subtree
+        rows.append(_to_row(folder_id, direct, subtree))
+
+    session.execute(delete(FolderStats))
+    if rows:
+        session.execute(insert(FolderStats), rows)
+
+def has_photos_without_folder_stats(session: Session) -> bool:
+    """True when a folder with photos has no stats row (first scan, stats lost), rebuild_folder_stats repairs it."""
+    with_stats = select(FolderStats.folder_id)
+    return session.scalar(
+        select(Photo.id)
+        .where(or_(Photo.folder_id.not_in(with_stats), Photo.virtual_folder_id.not_in(with_stats)))
+        .limit(1)
+    ) is not None
+
+def refresh_folder_stats(session: Session, folder_ids: Iterable[UUID]):
+    """
+    Incremental update after photos of given folders changed. Direct stats of the folders are recomputed,
+    subtree stats of them and their ancestors are combined from stored stats of their children.
+    """
+    folder_ids = set(folder_ids)
+    if len(folder_ids) == 0:
+        return
+    session.flush()
+
+    # Deepest folders first so every parent sees updated children
+    ancestors = _find_ancestor_depths(session, folder_ids)
+    existing = {stats.folder_id: stats for stats in find_by_folder_ids(session, list(ancestors))}
+    # Ancestors without stats yet need their direct part as well
+    direct_ids = folder_ids | (ancestors.keys() - existing.keys())
+    direct_stats = _find_direct_stats(session, direct_ids)
+
+    for folder_id in sorted(ancestors, key=ancestors.get, reverse=True):
+        stats = existing.get(folder_id)
+        if stats is None:
+            stats = FolderStats(folder_id=folder_id)
+            session.add(stats)
+        if folder_id in direct_ids:
+            _set_direct(stats, direct_stats.get(folder_id, SubtreeStats()))
+
+        children = session.scalars(
+            select(FolderStats).join(Folder, Folder.id == FolderStats.folder_id).where(Folder.parent_id == folder_id)
+        ).all()
+        subtree = SubtreeStats.combine([_direct_of(stats)] + [_subtree_of(child) for child in children])
+        _set_subtree(stats, subtree)
+        session.flush()
+
+def _find_direct_stats(session: Session, folder_ids: Optional[Set[UUID]]) -> Dict[UUID, SubtreeStats]:
+    result = dict()
+    # Collection photos are counted by folder_id, virtual folders by virtual_folder_id
+    for folder_column in (Photo.folder_id, Photo.virtual_folder_id):
+        created = MetadataIndex.photo_created
+        query = (select(folder_column,
+                        func.count(Photo.id),
+                        func.coalesce(func.sum(Photo.file_size), 0),
+                        func.min(created),
+                        func.max(created),
+                        func.array_agg(aggregate_order_by(Photo.id, desc(created).nulls_last()))[1])
+                 .select_from(Photo)
+                 .outerjoin(MetadataIndex, MetadataIndex.photo_id == Photo.id)
+                 .where(folder_column.isnot(None))
+                 .group_by(folder_column))
+        if folder_ids is not None:
+            query = query.where(folder_column.in_(folder_ids))
+        for folder_id, count, size, created_min, created_max, cover_id in session.execute(query):
+            result[folder_id] = SubtreeStats(count, int(size), created_min, created_max, cover_id)
+    return result
+
+def _find_ancestor_depths(session: Session, folder_ids: Set[UUID]) -> Dict[UUID, int]:
+    """Folders and all their ancestors with depth from root."""
+    rows = session.execute(
+        select(FolderClosure.descendant_id, func.max(FolderClosure.depth))
+        .where(FolderClosure.descendant_id.in_(ancestor_ids(list(folder_ids))))
+        .group_by(FolderClosure.descendant_id)
+    )
+    return {folder_id: depth for folder_id, depth in rows}
+
+def _to_row(folder_id: UUID, direct: SubtreeStats, subtree: SubtreeStats) -> Dict:
+    return {"folder_id": folder_id,
+            "direct_photo_count": direct.photo_count, "direct_size_bytes": direct.size_bytes,
+            "direct_created_min": direct.created_min, "direct_created_max": direct.created_max,
+            "direct_cover_photo_id": direct.cover_photo_id,
+            "photo_count": subtree.photo_count, "size_bytes": subtree.size_bytes,
+            "created_min": subtree.created_min, "created_max": subtree.created_max,
+            "cover_photo_id": subtree.cover_photo_id}
+
+def _direct_of(stats: FolderStats) -> SubtreeStats:
+    return SubtreeStats(stats.direct_photo_count or 0, stats.direct_size_bytes or 0, stats.direct_created_min,
+                        stats.direct_created_max, stats.direct_cover_photo_id)
+
+def _subtree_of(stats: FolderStats) -> SubtreeStats:
+    return SubtreeStats(stats.photo_count, stats.size_bytes, stats.created_min, stats.created_max, stats.cover_photo_id)
+
+def _set_direct(stats: FolderStats, direct: SubtreeStats):
+    stats.direct_photo_count = direct.photo_count
+    stats.direct_size_bytes = direct.size_bytes
+    stats.direct_created_min = direct.created_min
+    stats.direct_created_max = direct.created_max
+    stats.direct_cover_photo_id = direct.cover_photo_id
+
+def _set_subtree(stats: FolderStats, subtree: SubtreeStats):
+    stats.photo_count = subtree.photo_count
+    stats.size_bytes = subtree.size_bytes
+    stats.created_min = subtree.created_min
+    stats.created_max = subtree.created_max
+    stats.cover_photo_id = subtree.cover_photo_id
@@ -0,0 +1,62 @@
+from datetime import datetime
+from typing import List
+
+from sqlalchemy import and_, delete, select, true, literal
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from dbe.gallery import Gallery, GalleryPhoto
+from dbe.photo import Photo
+from domain.search.search_criteria import SearchCriteria
+from indexing.dbe.metadata_index import MetadataIndex
+from service import search_service
+
+
+def create_gallery(session: Session, name: str, criteria: SearchCriteria) -> Gallery:
+    """Creates empty gallery, members are filled by RebuildGalleryTask outside the request."""
+    gallery = Gallery()
+    gallery.name = name
+    gallery.criteria_json = criteria.to_dict()
+    session.add(gallery)
+    session.flush()
+    return gallery
+
+def get_criteria(gallery: Gallery) -> SearchCriteria:
+    return SearchCriteria.from_dict(gallery.criteria_json)
+
+def rebuild_membership(session: Session, gallery: Gallery):
+    """Full re-evaluation of the gallery criteria, done in the database with one INSERT ... SELECT."""
+    session.execute(delete(GalleryPhoto).where(GalleryPhoto.gallery_id == gallery.id))
+    members = (select(literal(gallery.id), MetadataIndex.photo_id, MetadataIndex.photo_created)
+               .where(*search_service.build_filters(get_criteria(gallery))))
+    session.execute(insert(GalleryPhoto).from_select(["gallery_id", "photo_id", "photo_created"], members))
+    gallery.rebuilt = datetime.now()
+    session.flush()
+
+def update_photo_membership(session: Session, galleries: List[Gallery], photo: Photo):
+    """
+    Incremental update after the photo index changed (scan, metadata edit). All gallery criteria are evaluated
+    against this one photo in a single query, so cost does not depend on collection size.
+    """
+    if len(galleries) == 0 or photo.metadata_index is None:
+        return
+    session.flush()
+
+    matches = session.execute(
+        select(*[and_(true(), *search_service.build_filters(get_criteria(g))) for g in galleries])
+        .where(MetadataIndex.photo_id == photo.id)
+    ).first()
+    if matches is None:
+        return
+
+    matched_ids = [g.id for g, matched in zip(galleries, matches) if matched]
+    unmatched_ids = [g.id for g, matched in zip(galleries, matches) if not matched]
+    if unmatched_ids:
+        session.execute(delete(GalleryPhoto)
+                        .where(GalleryPhoto.photo_id == photo.id, GalleryPhoto.gallery_id.in_(unmatched_ids)))
+    if matched_ids:
+        photo_created = photo.metadata_index.photo_created
+        upsert = insert(GalleryPhoto).values([{"gallery_id": gallery_id, "photo_id": photo.id, "photo_created": photo_created}
+                                              for gallery_id in matched_ids])
+        session.execute(upsert.on_conflict_do_update(index_elements=[GalleryPhoto.gallery_id, GalleryPhoto.photo_id],
+                                                     set_={"photo_created": upsert.excluded.photo_created}))
@@ -1,4 +1,12 @@
+import os
+from typing import Optional
+
+from sqlalchemy.orm import Session
+
 from dbe.photo import Photo
+from dbe.pixel_hash_cache import PixelHashCache, find_by_path as find_cache_by_path, find_by_content_hash as find_cache_by_content_hash
+from domain.image_hash_result import ImageHashResult
+from domain.thumbnail_level import ThumbnailLevel
 from service import image_service
 import pc_configuration
 from vial.config import app_config
@@ -7,10 +15,53 @@ def generate_thumbnail(photo: Photo, thumbnail_size: int, quality: int):
     # Get the main generated folder path
     generated_path = app_config.get_configuration(pc_configuration.GENERATED_PATH)
     image_service.generate_thumbnail(photo.get_photo_file_path(), str(photo.id), generated_path, thumbnail_size, quality)
-    photo.metadata_index.use_thumbnail = True
+    photo.metadata_index.thumbnail_level = ThumbnailLevel.RENDITION
+
+def extract_embedded_thumbnail(photo: Photo) -> bool:
+    """Publishes the camera thumbnail as the photo's thumbnail, False if the photo has none."""
+    generated_path = app_config.get_configuration(pc_configuration.GENERATED_PATH)
+    if image_service.extract_embedded_thumbnail(photo.get_photo_file_path(), str(photo.id), generated_path) is None:
+        return False
+    photo.metadata_index.thumbnail_level = ThumbnailLevel.EMBEDDED
+    return True
 
 def get_dominant_color_quantize(photo: Photo) -> str:
     return image_service.get_dominant_color_quantize(photo.get_photo_file_path())
 
-def compute_pixel_sha256(path: str) -> str:
-    return image_service.compute_pixel_sha256(path)
\ No newline at end of file
+def compute_image_hashes(session: Session, path: str) -> ImageHashResult:
+    """
+    Returns pixel and perceptual hash of the file, decoding the image only if the file fingerprint is unknown.
+    1) same path, size and mtime as cached - no file read at all
+    2) same raw bytes as any cached file (touched, copied, moved) - one streamed read, no decode
+    3) otherwise full decode and the cache is updated
+    """
+    stat = os.stat(path)
+    cached = find_cache_by_path(session, path)
+    if _is_complete(cached) and cached.file_size == stat.st_size and cached.mtime_ns == stat.st_mtime_ns:
+        return ImageHashResult(cached.pixel_hash, cached.perceptual_hash)
+
+    content_hash = image_service.compute_file_content_hash(path)
+    if _is_complete(cached) and cached.file_size == stat.st_size and cached.content_hash == content_hash:
+        hashes = ImageHashResult(cached.pixel_hash, cached.perceptual_hash)
+    else:
+        same_content = find_cache_by_content_hash(session, stat.st_size, content_hash)
+        if _is_complete(same_content):
+            hashes = ImageHashResult(same_content.pixel_hash, same_content.perceptual_hash)
+        else:
+            hashes = image_service.compute_image_hashes(path)
+
+    if cached is None:
+        cached = PixelHashCache()
+        cached.file_path = path
+        session.add(cached)
+    cached.file_size = stat.st_size
+    cached.mtime_ns = stat.st_mtime_ns
+    cached.content_hash = content_hash
+    cached.pixel_hash = hashes.pixel_hash
+    cached.perceptual_hash = hashes.perceptual_hash
+    session.flush()
+    return hashes
+
+def _is_complete(cached: Optional[PixelHashCache]) -> bool:
+    # Rows cached before perceptual hashing was added need one more decode
+    return cached is not None and cached.perceptual_hash is not None
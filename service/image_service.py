@@ -1,14 +1,46 @@
 import hashlib
+import io
 import os
+from typing import IO, Optional
 
-from PIL import Image, ImageOps
+from PIL import Image, ExifTags
 # import numpy as np
 from collections import Counter
 
 from dbe.photo import Photo
+from exiftool import exif_service
+from domain.image_hash_result import ImageHashResult
 import pc_configuration
+from service import instrumentation
+from service.image_too_large_exception import ImageTooLargeException
 from vial.config import app_config
 
+# Decoded JPEG is at least this many times larger than the thumbnail before the final LANCZOS pass.
+# Same as Image.thumbnail default, which drafts only if the image wasn't converted (loaded) before.
+THUMBNAIL_REDUCING_GAP = 2
+# Files Pillow can't decode, their thumbnail is made from the embedded preview
+RAW_EXTENSIONS = {".raw", ".cr2", ".nef", ".arw"}
+EXIF_HEADER = b"Exif\x00\x00"
+# IFD1 tags of the embedded JPEG thumbnail (JPEGInterchangeFormat, JPEGInterchangeFormatLength)
+_JPEG_THUMBNAIL_OFFSET = 0x0201
+_JPEG_THUMBNAIL_LENGTH = 0x0202
+_JPEG_SOI = b"\xff\xd8"
+# ((path, size, mtime), preview bytes) of the last RAW file
+_last_raw_preview = (None, None)
+
+
+def open_image(path: str | IO[bytes]) -> Image.Image:
+    """Open image with configured decompression bomb limit.
+
+    Raises:
+        ImageTooLargeException: image has more pixels than Pillow allows
+    """
+    Image.MAX_IMAGE_PIXELS = app_config.get_configuration(pc_configuration.MAX_IMAGE_PIXELS)
+    try:
+        return Image.open(path)
+    except Image.DecompressionBombError as ex:
+        raise ImageTooLargeException(path, str(ex)) from ex
+
 
 def get_image_size(photo_path: str) -> tuple[int, int]:
     """Get image dimensions (width, height) using Pillow.
@@ -19,12 +51,15 @@ def get_image_size(photo_path: str) -> tuple[int, int]:
     Returns:
         Tuple of (width, height) in pixels
     """
-    with Image.open(photo_path) as img:
+    with open_image(photo_path) as img:
         return img.size  # Returns (width, height)
 
 
 def generate_thumbnail(photo_path: str, thumbnail_name: str, target_path: str, size: int, quality=85) -> str:
     """Generate a thumbnail of a photo.
+
+    JPEGs are decoded at reduced scale (draft, DCT scaling) to at least THUMBNAIL_REDUCING_GAP x size,
+    the rest of the reduction is done by LANCZOS. RAW files use their embedded JPEG preview.
     
     Args:
         photo_path: Full path to the photo
@@ -35,15 +70,16 @@ def generate_thumbnail(photo_path: str, thumbnail_name: str, target_path: str, s
     Returns:
         Path to the generated thumbnail file
     """
-    # Get source image path
-    source_path = photo_path
-    
     # Generate thumbnail filename using Photo.id
     thumbnail_filename = f"{thumbnail_name}.jpg"
     thumbnail_path = os.path.join(target_path, thumbnail_filename)
     
     # Open and process image
-    with Image.open(source_path) as img:
+    with instrumentation.timed("image.thumbnail"), _open_decodable(photo_path) as img:
+        # Must be called before the image is loaded (converted), no-op for other formats than JPEG
+        reduced_size = size * THUMBNAIL_REDUCING_GAP
+        img.draft("RGB", (reduced_size, reduced_size))
+
         # Convert to RGB if necessary (handles RGBA, LA, P, etc.)
         if img.mode in ("RGBA", "LA", "P"):
             rgb_img = Image.new("RGB", img.size, (255, 255, 255))
@@ -55,13 +91,70 @@ def generate_thumbnail(photo_path: str, thumbnail_name: str, target_path: str, s
             img = img.convert("RGB")
         
         # Create thumbnail (max_size ensures largest dimension is <= size, maintaining aspect ratio)
-        img.thumbnail((size, size), Image.Resampling.LANCZOS)
+        img.thumbnail((size, size), Image.Resampling.LANCZOS, reducing_gap=THUMBNAIL_REDUCING_GAP)
         
         # Save thumbnail
         img.save(thumbnail_path, "JPEG", quality=quality, optimize=True)
     
     return thumbnail_path
 
+def extract_embedded_thumbnail(photo_path: str, thumbnail_name: str, target_path: str) -> Optional[str]:
+    """Save the JPEG thumbnail embedded by the camera as is, without decoding the photo.
+
+    Returns:
+        Path to the saved thumbnail file, None if the photo has no embedded thumbnail
+    """
+    with instrumentation.timed("image.embedded_thumbnail"):
+        if is_raw(photo_path):
+            thumbnail = exif_service.extract_thumbnail(photo_path)
+        else:
+            thumbnail = _read_exif_thumbnail(photo_path)
+    if thumbnail is None:
+        return None
+
+    thumbnail_path = os.path.join(target_path, f"{thumbnail_name}.jpg")
+    with open(thumbnail_path, "wb") as thumbnail_file:
+        thumbnail_file.write(thumbnail)
+    return thumbnail_path
+
+def _read_exif_thumbnail(photo_path: str) -> Optional[bytes]:
+    with open_image(photo_path) as img:
+        exif_bytes = img.info.get("exif")
+        # Only JPEG APP1 segment (IFD1), offsets are relative to the TIFF header after "Exif\0\0"
+        if img.format != "JPEG" or exif_bytes is None or not exif_bytes.startswith(EXIF_HEADER):
+            return None
+        ifd1 = img.getexif().get_ifd(ExifTags.IFD.IFD1)
+    offset = ifd1.get(_JPEG_THUMBNAIL_OFFSET)
+    length = ifd1.get(_JPEG_THUMBNAIL_LENGTH)
+    if offset is None or not length:
+        return None
+    start = len(EXIF_HEADER) + offset
+    thumbnail = exif_bytes[start:start + length]
+    if len(thumbnail) != length or not thumbnail.startswith(_JPEG_SOI):
+        return None
+    return thumbnail
+
+def is_raw(path: str) -> bool:
+    return os.path.splitext(path)[1].lower() in RAW_EXTENSIONS
+
+def _open_decodable(photo_path: str) -> Image.Image:
+    """Opens the photo, RAW files through their largest embedded JPEG preview."""
+    if not is_raw(photo_path):
+        return open_image(photo_path)
+    preview = _get_raw_preview(photo_path)
+    if preview is None:
+        raise ValueError(f"RAW file has no embedded preview: {photo_path}")
+    return open_image(io.BytesIO(preview))
+
+def _get_raw_preview(photo_path: str) -> Optional[bytes]:
+    """Preview of the last RAW file is kept, scan hashes it, makes its thumbnail and color one after another."""
+    global _last_raw_preview
+    stat = os.stat(photo_path)
+    key = (photo_path, stat.st_size, stat.st_mtime_ns)
+    if _last_raw_preview[0] != key:
+        _last_raw_preview = (key, exif_service.extract_preview(photo_path))
+    return _last_raw_preview[1]
+
 
 # def get_dominant_color_kmeans(photo_path: str, k: int = 3, sample_size: int = 10000) -> str:
 #     """Extract dominant color using K-means clustering (Method A).
@@ -120,7 +213,7 @@ def get_dominant_color_quantize(photo_path: str, colors: int = 256) -> str:
     Returns:
         Hex color string (e.g., "#FF5733")
     """
-    with Image.open(photo_path) as img:
+    with instrumentation.timed("image.dominant_color"), _open_decodable(photo_path) as img:
         # Convert to RGB
         img = img.convert('RGB')
         
@@ -145,19 +238,137 @@ def get_dominant_color_quantize(photo_path: str, colors: int = 256) -> str:
         # Format as hex
         return f"#{r:02x}{g:02x}{b:02x}"
 
-def compute_pixel_sha256(path: str) -> str:
+# Output strip size for streamed pixel hashing
+PIXEL_HASH_STRIP_BYTES = 4 << 20
+
+# EXIF orientation -> transpose method, same table as ImageOps.exif_transpose
+_ORIENTATION_TRANSPOSE = {
+    2: Image.Transpose.FLIP_LEFT_RIGHT,
+    3: Image.Transpose.ROTATE_180,
+    4: Image.Transpose.FLIP_TOP_BOTTOM,
+    5: Image.Transpose.TRANSPOSE,
+    6: Image.Transpose.ROTATE_270,
+    7: Image.Transpose.TRANSVERSE,
+    8: Image.Transpose.ROTATE_90,
+}
+# Transpose methods that swap width and height
+_AXES_SWAPPING_TRANSPOSE = {Image.Transpose.TRANSPOSE, Image.Transpose.ROTATE_270,
+                            Image.Transpose.TRANSVERSE, Image.Transpose.ROTATE_90}
+
+def compute_pixel_sha256(path: str, strip_bytes: int = PIXEL_HASH_STRIP_BYTES) -> str:
     """
     Returns SHA-256 of decoded image pixels.
     Stable across metadata edits, unstable across pixel changes.
+
+    Digest equals SHA-256 of exif_transpose(img).convert("RGB").tobytes(), but rows are hashed in strips
+    of about strip_bytes, so only the source image is held in memory, not its rotated/RGB copies.
+    RAW files aren't decoded, their sensor data is hashed by exiftool (see _get_raw_data_hash).
+    """
+    if is_raw(path):
+        return _get_raw_data_hash(path)
+    with instrumentation.timed("image.pixel_hash"), open_image(path) as img:
+        return _hash_pixels_in_strips(img, strip_bytes)
+
+def compute_image_hashes(path: str, strip_bytes: int = PIXEL_HASH_STRIP_BYTES) -> ImageHashResult:
+    """
+    Returns pixel SHA-256 and perceptual dHash computed from a single decode of the image.
+    dHash of RAW files is computed from their embedded preview, missing if they have none.
+    """
+    if is_raw(path):
+        with instrumentation.timed("image.raw_hashes"):
+            pixel_hash = _get_raw_data_hash(path)
+            preview = _get_raw_preview(path)
+            if preview is None:
+                return ImageHashResult(pixel_hash, None)
+            with open_image(io.BytesIO(preview)) as img:
+                return ImageHashResult(pixel_hash, _to_signed_64(compute_dhash(img)))
+
+    with instrumentation.timed("image.hashes"), open_image(path) as img:
+        pixel_hash = _hash_pixels_in_strips(img, strip_bytes)
+        return ImageHashResult(pixel_hash, _to_signed_64(compute_dhash(img)))
+
+def _get_raw_data_hash(path: str) -> str:
+    """exiftool ImageDataHash of the raw data region, whole file content hash if exiftool can't hash it."""
+    return exif_service.get_image_data_hash(path) or compute_file_content_hash(path)
+
+def compute_dhash(img: Image.Image) -> int:
     """
-    with Image.open(path) as img:
-        # 1) Normalize orientation (EXIF)
-        img = ImageOps.exif_transpose(img)
+    Returns 64-bit difference hash of EXIF-oriented image. Each bit says whether a pixel of 9x8 grayscale
+    downscale is brighter than its right neighbour. Resaved, resized or slightly edited copies differ in few bits.
+    """
+    img.load()
+    method = _ORIENTATION_TRANSPOSE.get(img.getexif().get(ExifTags.Base.Orientation, 1))
+    swaps_axes = method in _AXES_SWAPPING_TRANSPOSE
+    if img.mode not in ("RGB", "RGBA", "L", "LA"):
+        img = _to_8bit_gray(img)
+    # Downscale before transposing so only 72 pixels are rotated
+    small = img.resize((8, 9) if swaps_axes else (9, 8), Image.Resampling.BOX)
+    if method is not None:
+        small = small.transpose(method)
+    pixels = list(small.convert("L").getdata())
+
+    dhash = 0
+    for row in range(8):
+        for col in range(8):
+            left = pixels[row * 9 + col]
+            right = pixels[row * 9 + col + 1]
+            dhash = (dhash << 1) | (1 if left > right else 0)
+    return dhash
+
+def _to_8bit_gray(img: Image.Image) -> Image.Image:
+    # convert("L") clamps 16-bit (I;16, I) and float values at 255, high bit depth is rescaled first
+    if img.mode.startswith("I;16"):
+        img = img.convert("I")
+    if img.mode == "I":
+        return img.point(lambda v: v / 256).convert("L")
+    if img.mode == "F":
+        low, high = img.getextrema()
+        scale = 255 / (high - low) if high > low else 0
+        return img.point(lambda v: (v - low) * scale).convert("L")
+    return img.convert("L")
+
+def hamming_distance(hash_a: int, hash_b: int) -> int:
+    return ((hash_a ^ hash_b) & 0xFFFFFFFFFFFFFFFF).bit_count()
+
+def _to_signed_64(value: int) -> int:
+    return value - (1 << 64) if value >= (1 << 63) else value
 
-        # 2) Normalize pixel format
-        img = img.convert("RGB")  # canonical
+def _hash_pixels_in_strips(img: Image.Image, strip_bytes: int) -> str:
+    img.load()
+    # 1) Normalize orientation (EXIF) - transpose each strip instead of the whole image
+    method = _ORIENTATION_TRANSPOSE.get(img.getexif().get(ExifTags.Base.Orientation, 1))
+    width, height = img.size
+    out_width, out_height = (height, width) if method in _AXES_SWAPPING_TRANSPOSE else (width, height)
+    rows_per_strip = max(1, strip_bytes // (out_width * 3))
 
-        # 3) Hash raw pixel bytes
-        h = hashlib.sha256()
-        h.update(img.tobytes())
-        return h.hexdigest()
\ No newline at end of file
+    h = hashlib.sha256()
+    for y0 in range(0, out_height, rows_per_strip):
+        y1 = min(y0 + rows_per_strip, out_height)
+        strip = img.crop(_source_box(method, width, height, y0, y1))
+        if method is not None:
+            strip = strip.transpose(method)
+        # 2) Normalize pixel format, 3) hash raw pixel bytes
+        h.update(strip.convert("RGB").tobytes())
+    return h.hexdigest()
+
+def _source_box(method, width: int, height: int, y0: int, y1: int) -> tuple[int, int, int, int]:
+    """Box of the source image that becomes output rows y0..y1 after transposing with method."""
+    if method is None or method == Image.Transpose.FLIP_LEFT_RIGHT:
+        return 0, y0, width, y1
+    if method in (Image.Transpose.FLIP_TOP_BOTTOM, Image.Transpose.ROTATE_180):
+        return 0, height - y1, width, height - y0
+    if method in (Image.Transpose.TRANSPOSE, Image.Transpose.ROTATE_270):
+        return y0, 0, y1, height
+    # ROTATE_90, TRANSVERSE
+    return width - y1, 0, width - y0, height
+
+def compute_file_content_hash(path: str, block_size: int = 1 << 20) -> str:
+    """
+    Returns BLAKE2b of raw file bytes, read in chunks (1 MiB by default).
+    Cheap compared to decoding, changes with any byte change including metadata edits.
+    """
+    h = hashlib.blake2b(digest_size=32)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(block_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
\ No newline at end of file
@@ -0,0 +1,8 @@
+class ImageTooLargeException(Exception):
+
+    def __init__(self, path: str, message: str):
+        self.path: str = path
+        self.message: str = message
+
+    def __str__(self):
+        return "Image {} is too large to decode. {}".format(self.path, self.message)
@@ -0,0 +1,103 @@
+import bisect
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Dict, List, Optional
+
+from sqlalchemy import event, Engine
+
+# Upper bounds of histogram buckets in milliseconds, the last bucket is unbounded
+BUCKET_BOUNDS_MS = [1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000]
+_DISABLED = nullcontext()
+
+
+class Histogram:
+
+    def __init__(self):
+        self.count = 0
+        self.sum_ms = 0.0
+        self.min_ms: Optional[float] = None
+        self.max_ms: Optional[float] = None
+        self.buckets: List[int] = [0] * (len(BUCKET_BOUNDS_MS) + 1)
+
+    def observe(self, value_ms: float):
+        self.count += 1
+        self.sum_ms += value_ms
+        self.min_ms = value_ms if self.min_ms is None else min(self.min_ms, value_ms)
+        self.max_ms = value_ms if self.max_ms is None else max(self.max_ms, value_ms)
+        self.buckets[bisect.bisect_left(BUCKET_BOUNDS_MS, value_ms)] += 1
+
+    def to_dict(self) -> Dict:
+        bounds = [str(bound) for bound in BUCKET_BOUNDS_MS] + ["inf"]
+        return {"count": self.count, "sum_ms": self.sum_ms, "min_ms": self.min_ms, "max_ms": self.max_ms,
+                "buckets": {bound: count for bound, count in zip(bounds, self.buckets) if count > 0}}
+
+
+class MetricsRecorder:
+    """Timings (histograms) and counters of one task run."""
+
+    def __init__(self):
+        self.histograms: Dict[str, Histogram] = dict()
+        self.counters: Dict[str, int] = dict()
+
+    def observe(self, name: str, value_ms: float):
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms[name] = Histogram()
+        histogram.observe(value_ms)
+
+    def count(self, name: str, value: int = 1):
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def to_dict(self) -> Dict:
+        return {"timers": {name: histogram.to_dict() for name, histogram in self.histograms.items()},
+                "counters": dict(self.counters)}
+
+    def summary(self) -> str:
+        """One line breakdown by total time, for task log."""
+        by_total = sorted(self.histograms.items(), key=lambda item: item[1].sum_ms, reverse=True)
+        return ", ".join(f"{name} {h.sum_ms / 1000:.1f} s / {h.count}x" for name, h in by_total)
+
+
+# One task runs in a task process at a time, so the recorder is process wide
+_recorder: Optional[MetricsRecorder] = None
+
+
+def start_recording() -> MetricsRecorder:
+    global _recorder
+    _recorder = MetricsRecorder()
+    return _recorder
+
+def stop_recording() -> Optional[MetricsRecorder]:
+    global _recorder
+    recorder, _recorder = _recorder, None
+    return recorder
+
+def timed(name: str):
+    """Context manager adding its duration to histogram name. Shared no-op context when not recording."""
+    if _recorder is None:
+        return _DISABLED
+    return _timed(_recorder, name)
+
+def count(name: str, value: int = 1):
+    if _recorder is not None:
+        _recorder.count(name, value)
+
+@contextmanager
+def _timed(recorder: MetricsRecorder, name: str):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        recorder.observe(name, (time.perf_counter() - start) * 1000)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _recorder is not None:
+        conn.info["instrumentation_start"] = time.perf_counter()
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start = conn.info.pop("instrumentation_start", None)
+    if _recorder is not None and start is not None:
+        _recorder.observe("db.query", (time.perf_counter() - start) * 1000)
@@ -0,0 +1,40 @@
+import json
+from typing import Any, Callable, Optional
+
+# Optional fast backend, stdlib json is used when orjson is not installed
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def backend_name() -> str:
+    return "orjson" if orjson is not None else "json"
+
+def loads(data: str | bytes) -> Any:
+    if orjson is not None:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            # orjson refuses some valid documents, e.g. integers over 64 bits
+            pass
+    return json.loads(data)
+
+def dumps(obj: Any, default: Optional[Callable[[Any], Any]] = None, sort_keys: bool = False, indent: bool = False) -> str:
+    """
+    Compact JSON string. Datetimes are passed to default (same as stdlib), so output does not depend on backend
+    except for whitespace and non-ASCII escaping.
+    """
+    if orjson is not None:
+        option = orjson.OPT_PASSTHROUGH_DATETIME
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        try:
+            return orjson.dumps(obj, default=default, option=option).decode("utf-8")
+        except TypeError:
+            # Non-string keys, integers over 64 bits, ... - let stdlib handle them
+            pass
+    return json.dumps(obj, default=default, sort_keys=sort_keys,
+                      indent=2 if indent else None, separators=None if indent else (",", ":"))
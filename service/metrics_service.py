@@ -0,0 +1,328 @@
+import atexit
+import bisect
+import fcntl
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Dict, List, Tuple, Optional
+
+import pc_configuration
+from vial.config import app_config
+
+# Upper bounds of latency histogram buckets in seconds, the last bucket (+Inf) is implicit
+BUCKET_BOUNDS_S = [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0]
+# Values of a process are written to its file at most this often, /metrics sees them with this delay
+FLUSH_INTERVAL_S = 1.0
+COUNTER = "counter"
+GAUGE = "gauge"
+HISTOGRAM = "histogram"
+# Counters and histograms of exited processes are merged into this file, the folder doesn't grow with task processes
+AGGREGATE_FILE_NAME = "dead_processes.json"
+# Merges hold it exclusively and reads shared, a merged process is never counted twice or missed
+LOCK_FILE_NAME = "metrics.lock"
+
+LabelValues = Tuple[str, ...]
+
+
+class Metric:
+
+    def __init__(self, name: str, kind: str, description: str, label_names: Tuple[str, ...] = ()):
+        self.name = name
+        self.kind = kind
+        self.description = description
+        self.label_names = label_names
+
+
+class _ProcessValues:
+    """Values of this process only. Merged with other processes (gunicorn workers, task processes) by collect()."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counters: Dict[Tuple[str, LabelValues], float] = dict()
+        self.gauges: Dict[Tuple[str, LabelValues], float] = dict()
+        # [bucket counts..., sum, count]
+        self.histograms: Dict[Tuple[str, LabelValues], List[float]] = dict()
+        self.flushed = False
+        self.last_flush = 0.0
+        # Tells files of this process from a file left by an exited process with the same PID
+        self.token = uuid.uuid4().hex
+
+
+# Counters of dead processes are kept (they count what happened), gauges are only summed over live ones
+HTTP_REQUESTS = Metric("pc_http_requests_total", COUNTER, "HTTP requests by blueprint, method and status",
+                       ("blueprint", "method", "status"))
+HTTP_REQUEST_DURATION = Metric("pc_http_request_duration_seconds", HISTOGRAM, "HTTP request latency by blueprint",
+                               ("blueprint",))
+DB_POOL_CHECKOUTS = Metric("pc_db_pool_checkouts_total", COUNTER, "Connection checkouts from the DB pool")
+DB_POOL_TIMEOUTS = Metric("pc_db_pool_timeouts_total", COUNTER, "Checkouts which timed out waiting for a connection")
+DB_POOL_WAIT = Metric("pc_db_pool_wait_seconds_total", COUNTER, "Time spent waiting for a pooled connection")
+DB_POOL_CHECKED_OUT = Metric("pc_db_pool_checked_out", GAUGE, "Connections currently checked out of the pool")
+TASKS_SUBMITTED = Metric("pc_tasks_submitted_total", COUNTER, "Tasks submitted to the task pool", ("type",))
+TASK_QUEUE_DEPTH = Metric("pc_task_queue_depth", GAUGE, "Submitted tasks which haven't finished yet")
+TASK_RUNS = Metric("pc_task_runs_total", COUNTER, "Finished task runs by type and result", ("type", "result"))
+TASK_DURATION = Metric("pc_task_duration_seconds", HISTOGRAM, "Task run duration by type", ("type",))
+THUMBNAIL_REQUESTS = Metric("pc_thumbnail_requests_total", COUNTER,
+                            "Requested thumbnails by result, miss means the thumbnail wasn't generated",
+                            ("result",))
+METRICS = [HTTP_REQUESTS, HTTP_REQUEST_DURATION, DB_POOL_CHECKOUTS, DB_POOL_TIMEOUTS, DB_POOL_WAIT,
+           DB_POOL_CHECKED_OUT, TASKS_SUBMITTED, TASK_QUEUE_DEPTH, TASK_RUNS, TASK_DURATION, THUMBNAIL_REQUESTS]
+
+_values = _ProcessValues()
+
+
+def inc(metric: Metric, labels: LabelValues = (), value: float = 1):
+    with _values.lock:
+        key = (metric.name, labels)
+        _values.counters[key] = _values.counters.get(key, 0) + value
+
+def set_gauge(metric: Metric, value: float, labels: LabelValues = ()):
+    with _values.lock:
+        _values.gauges[(metric.name, labels)] = value
+
+def add_gauge(metric: Metric, value: float, labels: LabelValues = ()):
+    with _values.lock:
+        key = (metric.name, labels)
+        _values.gauges[key] = _values.gauges.get(key, 0) + value
+
+def observe(metric: Metric, value_s: float, labels: LabelValues = ()):
+    with _values.lock:
+        key = (metric.name, labels)
+        histogram = _values.histograms.get(key)
+        if histogram is None:
+            histogram = _values.histograms[key] = [0] * (len(BUCKET_BOUNDS_S) + 3)
+        histogram[bisect.bisect_left(BUCKET_BOUNDS_S, value_s)] += 1
+        histogram[-2] += value_s
+        histogram[-1] += 1
+
+
+def get_metrics_path() -> str:
+    return app_config.get(pc_configuration.METRICS_PATH)
+
+def maybe_flush():
+    """Writes values of this process if the last write is older than FLUSH_INTERVAL_S, cheap to call per request."""
+    if time.monotonic() - _values.last_flush >= FLUSH_INTERVAL_S:
+        flush()
+
+def flush():
+    """Atomically replaces the file of this process with its current values."""
+    _update_pool_metrics()
+    pid = os.getpid()
+    with _values.lock:
+        first_flush = not _values.flushed
+        _values.flushed = True
+        _values.last_flush = time.monotonic()
+        content = {"pid": pid,
+                   "token": _values.token,
+                   "counters": [[name, list(labels), value] for (name, labels), value in _values.counters.items()],
+                   "gauges": [[name, list(labels), value] for (name, labels), value in _values.gauges.items()],
+                   "histograms": [[name, list(labels), values]
+                                  for (name, labels), values in _values.histograms.items()]}
+
+    metrics_path = get_metrics_path()
+    os.makedirs(metrics_path, exist_ok=True)
+    file_path = os.path.join(metrics_path, f"{pid}.json")
+    if first_flush:
+        # PID was reused, counters of the exited process are kept instead of being overwritten
+        previous = _load_file(file_path)
+        if previous is not None and previous.get("token") != _values.token:
+            _merge_dead_processes(metrics_path, {pid: previous.get("token")})
+    _write_file(file_path, content)
+
+def clear_previous_run():
+    """
+    Removes files of the previous run when the service starts, counters start from zero. Skipped when another live
+    process writes here already, e.g. gunicorn restarted a worker.
+    """
+    metrics_path = get_metrics_path()
+    if not os.path.isdir(metrics_path):
+        return
+    with _folder_lock(metrics_path, fcntl.LOCK_EX):
+        for content in _load_process_files(metrics_path):
+            pid = content["pid"]
+            if pid is not None and pid != os.getpid() and _is_alive(pid):
+                return
+        for file_name in os.listdir(metrics_path):
+            if file_name.endswith(".json"):
+                os.remove(os.path.join(metrics_path, file_name))
+
+def collect() -> str:
+    """Values of all processes sharing the metrics folder in Prometheus text exposition format (0.0.4)."""
+    flush()
+    counters: Dict[Tuple[str, LabelValues], float] = dict()
+    gauges: Dict[Tuple[str, LabelValues], float] = dict()
+    histograms: Dict[Tuple[str, LabelValues], List[float]] = dict()
+    for content in _read_process_files():
+        for name, labels, value in content["counters"]:
+            key = (name, tuple(labels))
+            counters[key] = counters.get(key, 0) + value
+        if content["pid"] is not None and _is_alive(content["pid"]):
+            for name, labels, value in content["gauges"]:
+                key = (name, tuple(labels))
+                gauges[key] = gauges.get(key, 0) + value
+        for name, labels, values in content["histograms"]:
+            key = (name, tuple(labels))
+            merged = histograms.get(key)
+            histograms[key] = list(values) if merged is None else [a + b for a, b in zip(merged, values)]
+
+    lines = []
+    for metric in METRICS:
+        source = counters if metric.kind == COUNTER else gauges if metric.kind == GAUGE else histograms
+        samples = sorted((labels, value) for (name, labels), value in source.items() if name == metric.name)
+        lines.append(f"# HELP {metric.name} {metric.description}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        if not samples and not metric.label_names:
+            samples = [((), [0] * (len(BUCKET_BOUNDS_S) + 3) if metric.kind == HISTOGRAM else 0)]
+        for labels, value in samples:
+            label_pairs = list(zip(metric.label_names, labels))
+            if metric.kind == HISTOGRAM:
+                lines += _histogram_lines(metric.name, label_pairs, value)
+            else:
+                lines.append(f"{metric.name}{_format_labels(label_pairs)} {_format_value(value)}")
+    return "\n".join(lines) + "\n"
+
+def histogram_totals(metric: Metric) -> Tuple[float, float]:
+    """(sum, count) of a histogram over all label values and processes, as of their last flush."""
+    total_sum = 0.0
+    total_count = 0.0
+    for content in _read_process_files():
+        for name, _, values in content["histograms"]:
+            if name == metric.name:
+                total_sum += values[-2]
+                total_count += values[-1]
+    return total_sum, total_count
+
+
+def _histogram_lines(name: str, label_pairs: List[Tuple[str, str]], values: List[float]) -> List[str]:
+    lines = []
+    cumulative = 0
+    bounds = [_format_value(bound) for bound in BUCKET_BOUNDS_S] + ["+Inf"]
+    for bound, bucket_count in zip(bounds, values):
+        cumulative += bucket_count
+        lines.append(f"{name}_bucket{_format_labels(label_pairs + [('le', bound)])} {_format_value(cumulative)}")
+    lines.append(f"{name}_sum{_format_labels(label_pairs)} {_format_value(values[-2])}")
+    lines.append(f"{name}_count{_format_labels(label_pairs)} {_format_value(values[-1])}")
+    return lines
+
+def _format_labels(label_pairs: List[Tuple[str, str]]) -> str:
+    if not label_pairs:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+               for _, value in label_pairs)
+    return "{" + ",".join(f"{name}=\"{value}\"" for (name, _), value in zip(label_pairs, escaped)) + "}"
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+def _read_process_files() -> List[Dict]:
+    """Files of all processes and the aggregate of exited ones, files of newly exited processes are merged after."""
+    metrics_path = get_metrics_path()
+    if not os.path.isdir(metrics_path):
+        return []
+    with _folder_lock(metrics_path, fcntl.LOCK_SH):
+        contents = _load_process_files(metrics_path)
+    dead = {content["pid"]: content.get("token") for content in contents
+            if content["pid"] is not None and not _is_alive(content["pid"])}
+    if dead:
+        _merge_dead_processes(metrics_path, dead)
+    return contents
+
+def _load_process_files(metrics_path: str) -> List[Dict]:
+    contents = []
+    for file_name in os.listdir(metrics_path):
+        if file_name.endswith(".json"):
+            content = _load_file(os.path.join(metrics_path, file_name))
+            if content is not None:
+                contents.append(content)
+    return contents
+
+def _load_file(file_path: str) -> Optional[Dict]:
+    try:
+        with open(file_path) as metrics_file:
+            return json.load(metrics_file)
+    except (OSError, ValueError):
+        # Removed meanwhile, files are replaced atomically so they are never partial
+        return None
+
+def _write_file(file_path: str, content: Dict):
+    tmp_path = f"{file_path}.tmp"
+    with open(tmp_path, "w") as metrics_file:
+        json.dump(content, metrics_file)
+    os.replace(tmp_path, file_path)
+
+def _merge_dead_processes(metrics_path: str, tokens: Dict[int, Optional[str]]):
+    """
+    Adds counters and histograms of exited processes to the aggregate file and removes their files, like
+    prometheus_client's mark_process_dead. Gauges are dropped. A file is merged only when it still has the token
+    seen as dead - it could be merged by another process or rewritten by a new process with the same PID meanwhile.
+    """
+    aggregate_path = os.path.join(metrics_path, AGGREGATE_FILE_NAME)
+    with _folder_lock(metrics_path, fcntl.LOCK_EX):
+        aggregate = _load_file(aggregate_path) or {"pid": None, "counters": [], "gauges": [], "histograms": []}
+        counters = {(name, tuple(labels)): value for name, labels, value in aggregate["counters"]}
+        histograms = {(name, tuple(labels)): values for name, labels, values in aggregate["histograms"]}
+        merged_paths = []
+        for pid, token in tokens.items():
+            file_path = os.path.join(metrics_path, f"{pid}.json")
+            content = _load_file(file_path)
+            if content is None or content.get("token") != token:
+                continue
+            for name, labels, value in content["counters"]:
+                key = (name, tuple(labels))
+                counters[key] = counters.get(key, 0) + value
+            for name, labels, values in content["histograms"]:
+                key = (name, tuple(labels))
+                merged = histograms.get(key)
+                histograms[key] = list(values) if merged is None else [a + b for a, b in zip(merged, values)]
+            merged_paths.append(file_path)
+        if not merged_paths:
+            return
+        _write_file(aggregate_path, {"pid": None, "gauges": [],
+                                     "counters": [[name, list(labels), value] for (name, labels), value in counters.items()],
+                                     "histograms": [[name, list(labels), values]
+                                                    for (name, labels), values in histograms.items()]})
+        for file_path in merged_paths:
+            os.remove(file_path)
+
+@contextmanager
+def _folder_lock(metrics_path: str, operation: int):
+    with open(os.path.join(metrics_path, LOCK_FILE_NAME), "a") as lock_file:
+        fcntl.flock(lock_file, operation)
+        yield
+
+def _is_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+def _reset_after_fork():
+    # Forked child (gunicorn worker, task process) starts from zero, the parent keeps its own file
+    global _values
+    _values = _ProcessValues()
+
+def _update_pool_metrics():
+    # Imported here, database creates the engine on import
+    from database import pool_status
+    status = pool_status()
+    with _values.lock:
+        _values.counters[(DB_POOL_CHECKOUTS.name, ())] = status["checkouts"]
+        _values.counters[(DB_POOL_TIMEOUTS.name, ())] = status["timeouts"]
+        _values.counters[(DB_POOL_WAIT.name, ())] = status["wait_seconds"]
+        _values.gauges[(DB_POOL_CHECKED_OUT.name, ())] = status.get("checked_out", 0)
+
+def _flush_at_exit():
+    if _values.flushed:
+        try:
+            flush()
+        except OSError:
+            pass
+
+
+atexit.register(_flush_at_exit)
+os.register_at_fork(after_in_child=_reset_after_fork)
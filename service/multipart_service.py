@@ -0,0 +1,25 @@
+import os
+from typing import Dict, Iterable, Iterator, Tuple
+
+CHUNK_SIZE = 64 * 1024
+
+
+def iterate_multipart(parts: Iterable[Tuple[Dict[str, str], str]], boundary: str) -> Iterator[bytes]:
+    """
+    Streams multipart/mixed body from (part headers, file path) pairs. Files are read in chunks,
+    missing files are skipped so the client can fall back to single requests for them.
+    """
+    for headers, file_path in parts:
+        try:
+            file = open(file_path, "rb")
+        except FileNotFoundError:
+            continue
+        with file:
+            part_headers = dict(headers)
+            part_headers["Content-Length"] = str(os.fstat(file.fileno()).st_size)
+            header_lines = "".join(f"{name}: {value}\r\n" for name, value in part_headers.items())
+            yield f"--{boundary}\r\n{header_lines}\r\n".encode("ascii")
+            while chunk := file.read(CHUNK_SIZE):
+                yield chunk
+            yield b"\r\n"
+    yield f"--{boundary}--\r\n".encode("ascii")
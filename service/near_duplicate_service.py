@@ -0,0 +1,75 @@
+import threading
+import time
+from typing import Any, List, Tuple, Dict
+from uuid import UUID
+
+from sqlalchemy.orm import Session
+
+from dbe.photo import Photo, iterate_perceptual_hashes
+from service.bk_tree import BKTree
+
+# Index is rebuilt at most once per this many seconds in each process
+INDEX_TTL_SECONDS = 60
+
+# (built at, BKTree), one request thread builds it while the others wait for the result
+_index: Tuple[float, Any] = (0.0, None)
+_index_lock = threading.Lock()
+
+
+def build_index(session: Session) -> BKTree:
+    global _index
+    with _index_lock:
+        built, tree = _index
+        if tree is None or time.monotonic() - built > INDEX_TTL_SECONDS:
+            tree = BKTree()
+            for photo_id, perceptual_hash in iterate_perceptual_hashes(session):
+                tree.add(perceptual_hash, photo_id)
+            _index = (time.monotonic(), tree)
+        return tree
+
+def find_similar_photos(session: Session, photo: Photo, max_distance: int) -> List[Tuple[UUID, int]]:
+    """
+    Returns (photo_id, distance) of photos within Hamming distance of the photo's perceptual hash, closest first.
+    Caller caps max_distance, a search with a large radius visits nearly the whole tree.
+    """
+    if photo.perceptual_hash is None:
+        return []
+    tree = build_index(session)
+    return [(photo_id, distance) for distance, photo_id in tree.search(photo.perceptual_hash, max_distance)
+            if photo_id != photo.id]
+
+def find_clusters(session: Session, max_distance: int) -> List[List[UUID]]:
+    """Clusters of the whole collection, run by RebuildNearDuplicatesTask - too slow for a request."""
+    hashes: Dict[UUID, int] = {photo_id: perceptual_hash for photo_id, perceptual_hash in iterate_perceptual_hashes(session)}
+    return cluster_by_distance(hashes, max_distance)
+
+def cluster_by_distance(hashes: Dict[Any, int], max_distance: int) -> List[List[Any]]:
+    """
+    Groups keys connected by perceptual hash distance <= max_distance (single linkage).
+    Returns clusters of at least two keys, largest first.
+    """
+    tree = BKTree()
+    for key, perceptual_hash in hashes.items():
+        tree.add(perceptual_hash, key)
+
+    # Union-find over neighbours found in the tree
+    parents: Dict[Any, Any] = {}
+
+    def find(key):
+        root = key
+        while parents.get(root, root) != root:
+            root = parents[root]
+        while key != root:
+            parents[key], key = root, parents.get(key, key)
+        return root
+
+    for key, perceptual_hash in hashes.items():
+        for _, neighbour in tree.search(perceptual_hash, max_distance):
+            root_a, root_b = find(key), find(neighbour)
+            if root_a != root_b:
+                parents[root_b] = root_a
+
+    clusters: Dict[Any, List[Any]] = {}
+    for key in hashes:
+        clusters.setdefault(find(key), []).append(key)
+    return sorted((c for c in clusters.values() if len(c) > 1), key=len, reverse=True)
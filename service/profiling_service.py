@@ -0,0 +1,50 @@
+import cProfile
+import io
+import os
+import pstats
+from contextlib import contextmanager
+from uuid import UUID
+
+import pc_configuration
+from vial.config import app_config
+
+SUMMARY_LINES = 40
+
+
+def get_profiles_path() -> str:
+    profiles_path = app_config.get(pc_configuration.PROFILING_PATH)
+    if not profiles_path:
+        profiles_path = os.path.join(app_config.get(pc_configuration.GENERATED_PATH), "profiles")
+    return profiles_path
+
+def get_profile_path(profile_id: UUID) -> str:
+    """Profile of a request (X-Profile-Id) or a task (task id), in pstats format (snakeviz, pstats, gprof2dot)."""
+    return os.path.join(get_profiles_path(), f"{profile_id}.prof")
+
+def start_profile() -> cProfile.Profile:
+    profiler = cProfile.Profile()
+    profiler.enable()
+    return profiler
+
+def save_profile(profiler: cProfile.Profile, profile_id: UUID) -> str:
+    profiler.disable()
+    os.makedirs(get_profiles_path(), exist_ok=True)
+    file_path = get_profile_path(profile_id)
+    profiler.dump_stats(file_path)
+    return file_path
+
+@contextmanager
+def profiled(profile_id: UUID):
+    """Profiles the block, the profile is saved even if the block raises."""
+    profiler = start_profile()
+    try:
+        yield
+    finally:
+        save_profile(profiler, profile_id)
+
+def get_summary(file_path: str, sort: str = "cumulative") -> str:
+    """Top SUMMARY_LINES functions of a saved profile as pstats text."""
+    output = io.StringIO()
+    stats = pstats.Stats(file_path, stream=output)
+    stats.strip_dirs().sort_stats(sort).print_stats(SUMMARY_LINES)
+    return output.getvalue()
@@ -0,0 +1,121 @@
+from typing import List, Dict, Tuple, Any
+
+from sqlalchemy import and_, or_, cast, desc, func, literal, Boolean, ColumnElement
+from sqlalchemy.dialects.postgresql import JSONPATH
+from sqlalchemy.orm import Session, contains_eager
+
+from dbe.photo import Photo
+from domain.metadata.metadata_id import MetadataId
+from domain.metadata_index_type import MetadataIndexType
+from domain.search.search_criteria import SearchCriteria
+from domain.search.search_facet import SearchFacet
+from domain.search.search_operator import SearchOperator
+from domain.search.search_predicate import SearchPredicate
+from indexing.dbe.metadata_index import MetadataIndex
+from service import json_service
+
+# Index usage (see migration 2026101904):
+# - EQ with known g1 is "path == constant", answered by the GIN jsonb_path_ops index
+# - EQ without g1 also checks all g1 groups (same as search_tag_value_by_tags), wildcard part is a recheck
+# - RANGE and EXISTS are rechecked on rows selected by the other filters
+# - promoted columns and created date use btree indexes, facets are counted from them
+
+
+def search_photos(session: Session, criteria: SearchCriteria, page: int, items_per_page: int) -> List[Photo]:
+    return (session.query(Photo)
+            .join(MetadataIndex, Photo.id == MetadataIndex.photo_id)
+            .options(contains_eager(Photo.metadata_index))
+            .filter(*build_filters(criteria))
+            .order_by(desc(MetadataIndex.photo_created).nulls_last(), desc(MetadataIndex.photo_id))
+            .limit(items_per_page)
+            .offset(page * items_per_page)
+            .all())
+
+def search_photos_count(session: Session, criteria: SearchCriteria) -> int:
+    return session.query(func.count(MetadataIndex.id)).filter(*build_filters(criteria)).scalar()
+
+def count_facets(session: Session, criteria: SearchCriteria, facets: List[SearchFacet], limit: int) -> Dict[SearchFacet, List[Tuple[str, int]]]:
+    """Returns the most common values of each facet within the search result, photos without the value are skipped."""
+    result = dict()
+    filters = build_filters(criteria)
+    for facet in facets:
+        column = _facet_column(facet)
+        rows = (session.query(column, func.count())
+                .filter(column.isnot(None), *filters)
+                .group_by(column)
+                .order_by(desc(func.count()), column)
+                .limit(limit)
+                .all())
+        result[facet] = [(value, count) for value, count in rows]
+    return result
+
+def build_filters(criteria: SearchCriteria) -> List[ColumnElement[bool]]:
+    filters = []
+    for facet, value in criteria.facet_values.items():
+        filters.append(_facet_column(facet) == value)
+    if criteria.created_from is not None:
+        filters.append(MetadataIndex.photo_created >= criteria.created_from)
+    if criteria.created_to is not None:
+        filters.append(MetadataIndex.photo_created < criteria.created_to)
+    for predicate in criteria.predicates:
+        filters.append(_index_clause(criteria.index_type, predicate))
+    return filters
+
+def _index_clause(index_type: MetadataIndexType, predicate: SearchPredicate) -> ColumnElement[bool]:
+    if index_type == MetadataIndexType.EFFECTIVE:
+        # Same fallback as the metadata API - photos without user changes are searched in exif_json
+        return or_(and_(MetadataIndex.effective_json.isnot(None), predicate_clause(MetadataIndex.effective_json, predicate)),
+                   and_(MetadataIndex.effective_json.is_(None), predicate_clause(MetadataIndex.exif_json, predicate)))
+    return predicate_clause(MetadataIndex.exif_json, predicate)
+
+def predicate_clause(column, predicate: SearchPredicate) -> ColumnElement[bool]:
+    metadata_id = predicate.metadata_id
+    if metadata_id.group_1 is not None:
+        return _path_clause(column, predicate, to_jsonpath(metadata_id))
+    return or_(_path_clause(column, predicate, to_jsonpath(metadata_id)),
+               _path_clause(column, predicate, to_jsonpath(metadata_id, any_g1=True)))
+
+def _path_clause(column, predicate: SearchPredicate, path: str) -> ColumnElement[bool]:
+    if predicate.operator == SearchOperator.EQ:
+        return _jsonpath_op(column, "@@", f"{path} == {_literal(predicate.value)}")
+    if predicate.operator == SearchOperator.EXISTS:
+        return _jsonpath_op(column, "@?", path)
+    if predicate.operator == SearchOperator.RANGE:
+        bounds = []
+        if predicate.value_from is not None:
+            bounds.append(f"@ >= {_literal(predicate.value_from)}")
+        if predicate.value_to is not None:
+            bounds.append(f"@ <= {_literal(predicate.value_to)}")
+        if len(bounds) == 0:
+            return _jsonpath_op(column, "@?", path)
+        return _jsonpath_op(column, "@?", f"{path} ? ({' && '.join(bounds)})")
+    raise ValueError(f"Unsupported search operator {predicate.operator}")
+
+def to_jsonpath(metadata_id: MetadataId, any_g1: bool = False) -> str:
+    """
+    Translates MetadataId to jsonpath over v4 index structure, e.g. $."EXIF"."g1"."IFD0"."Make".
+    Without g1 it points to g0 tags, or to all g1 groups when any_g1 is set.
+    """
+    parts = ["$", _literal(metadata_id.group_0)]
+    if metadata_id.group_1 is not None:
+        parts += [_literal("g1"), _literal(metadata_id.group_1)]
+    elif any_g1:
+        parts += [_literal("g1"), "*"]
+    else:
+        parts.append(_literal("tags"))
+    if metadata_id.path is not None:
+        parts += [_literal(path_part) for path_part in metadata_id.path.split(".")]
+    parts.append(_literal(metadata_id.tag_name))
+    return ".".join(parts)
+
+def _literal(value: Any) -> str:
+    # JSON scalars are valid jsonpath literals, quoting keeps user input out of the path syntax
+    if not isinstance(value, (str, int, float, bool)):
+        raise ValueError(f"Unsupported search value {value!r}")
+    return json_service.dumps(value)
+
+def _jsonpath_op(column, operator: str, path: str) -> ColumnElement[bool]:
+    return column.op(operator, return_type=Boolean)(cast(literal(path), JSONPATH))
+
+def _facet_column(facet: SearchFacet):
+    return getattr(MetadataIndex, facet.value)
@@ -0,0 +1,35 @@
+from uuid import UUID
+
+from dbe.gallery import find_by_id as find_gallery_by_id, gallery_photo_count
+from domain.task.pc_task import PhotoCabinetTask
+from domain.task.task_type import TaskType
+from service import gallery_service
+
+
+class RebuildGalleryTask(PhotoCabinetTask):
+
+    def __init__(self, gallery_id: UUID):
+        super().__init__()
+        self.gallery_id = gallery_id
+
+    def get_type(self) -> TaskType:
+        return TaskType.REBUILD_GALLERY
+
+    def _serialize_fields(self):
+        return {"db_task_id": self.db_task_id, "gallery_id": str(self.gallery_id), "profile": self.profile}
+
+    @classmethod
+    def _deserialize_fields(cls, fields: dict):
+        task = cls(UUID(fields["gallery_id"]))
+        task.db_task_id = fields["db_task_id"]
+        task.profile = fields.get("profile", False)
+        return task
+
+    def execute(self):
+        gallery = find_gallery_by_id(self.task_transaction, self.gallery_id)
+        if gallery is None:
+            raise ValueError(f"Gallery {self.gallery_id} does not exist")
+
+        self.log_message(f"Rebuilding gallery: {gallery.name}")
+        gallery_service.rebuild_membership(self.task_transaction, gallery)
+        self.log_message(f"Gallery {gallery.name} has {gallery_photo_count(self.task_transaction, gallery.id)} photos")
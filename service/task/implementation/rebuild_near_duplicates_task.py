@@ -0,0 +1,30 @@
+from dbe.app_data import get_app_data_val
+from dbe.near_duplicate import replace_clusters
+from domain.app_data_field import AppDataField
+from domain.task.pc_task import PhotoCabinetTask
+from domain.task.task_type import TaskType
+from service import near_duplicate_service
+
+
+class RebuildNearDuplicatesTask(PhotoCabinetTask):
+    """Clusters perceptual hashes of the whole collection, /photo/near-duplicates pages the stored clusters."""
+
+    def get_type(self) -> TaskType:
+        return TaskType.NEAR_DUPLICATES
+
+    def _serialize_fields(self):
+        return {"db_task_id": self.db_task_id, "profile": self.profile}
+
+    @classmethod
+    def _deserialize_fields(cls, fields: dict):
+        task = cls()
+        task.db_task_id = fields["db_task_id"]
+        task.profile = fields.get("profile", False)
+        return task
+
+    def execute(self):
+        max_distance = get_app_data_val(self.task_transaction, AppDataField.NEAR_DUPLICATE_MAX_DISTANCE)
+        self.log_message(f"Clustering near duplicates within distance {max_distance}")
+        clusters = near_duplicate_service.find_clusters(self.task_transaction, max_distance)
+        replace_clusters(self.task_transaction, clusters)
+        self.log_message(f"Found {len(clusters)} clusters of near duplicates")
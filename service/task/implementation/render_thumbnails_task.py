@@ -0,0 +1,56 @@
+from domain.app_data_field import AppDataField
+from domain.task.pc_task import PhotoCabinetTask
+from domain.task.task_log_severity import TaskLogSeverity
+from domain.task.task_type import TaskType
+from domain.thumbnail_level import ThumbnailLevel
+from dbe.app_data import get_app_data_val
+from dbe.photo import find_by_ids as find_photos_by_ids
+from indexing.dbe.metadata_index import find_photo_ids_by_thumbnail_level, count_by_thumbnail_level
+from service import image_facade, instrumentation
+
+
+class RenderThumbnailsTask(PhotoCabinetTask):
+    """Replaces embedded camera thumbnails published by the scan with generated renditions."""
+    # Renditions are committed per batch, so they show up while the task runs
+    BATCH_SIZE = 100
+
+    def get_type(self) -> TaskType:
+        return TaskType.RENDER_THUMBNAILS
+
+    def _serialize_fields(self):
+        return {"db_task_id": self.db_task_id, "profile": self.profile}
+
+    @classmethod
+    def _deserialize_fields(cls, fields: dict):
+        task = cls()
+        task.db_task_id = fields["db_task_id"]
+        task.profile = fields.get("profile", False)
+        return task
+
+    def execute(self):
+        thumbnail_size = get_app_data_val(self.task_transaction, AppDataField.THUMBNAIL_SIZE_PX)
+        thumbnail_quality = get_app_data_val(self.task_transaction, AppDataField.THUMBNAIL_QUALITY)
+        self.update_max_progress(count_by_thumbnail_level(self.task_transaction, ThumbnailLevel.EMBEDDED))
+
+        rendered = 0
+        last_photo_id = None
+        while True:
+            photo_ids = find_photo_ids_by_thumbnail_level(self.task_transaction, ThumbnailLevel.EMBEDDED,
+                                                          last_photo_id, self.BATCH_SIZE)
+            if not photo_ids:
+                break
+            # Failed photos stay EMBEDDED, keyset moves past them
+            last_photo_id = photo_ids[-1]
+            for photo in find_photos_by_ids(self.task_transaction, photo_ids):
+                try:
+                    image_facade.generate_thumbnail(photo, thumbnail_size, thumbnail_quality)
+                    rendered += 1
+                except Exception as e:
+                    self.log_message(f"Error generating thumbnail for {photo.name}: {str(e)}",
+                                     severity=TaskLogSeverity.WARNING)
+                    instrumentation.count("thumbnail.render_errors")
+                self.increment_current_progress()
+                self.pace(photo.file_size or 0)
+            self.task_transaction.commit()
+
+        self.log_message(f"Generated {rendered} thumbnails")
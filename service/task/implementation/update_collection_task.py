@@ -1,8 +1,10 @@
 from pathlib import Path
 from datetime import datetime
-from typing import Optional, Set, List
+from typing import Optional, Set, List, Tuple
 from uuid import uuid4, UUID
 import hashlib
+import heapq
+import time
 
 from domain.app_data_field import AppDataField
 from domain.metadata.metadata_sets import CREATE_DATE_SET
@@ -10,45 +12,82 @@ from domain.task.pc_task import PhotoCabinetTask
 from domain.task.task_type import TaskType
 from domain.task.task_log_severity import TaskLogSeverity
 from domain.folder_type import FolderType
+from domain.thumbnail_level import ThumbnailLevel
 from indexing.domain.photo_size_result import PhotoSizeResult
 from vial.config import app_config
 import pc_configuration
 from dbe.folder import Folder, find_root as find_root_folder, find_limbo, get_all_by_type, ROOT_FOLDER_ID
-from dbe.photo import Photo, find_by_path as find_photo_by_path, find_by_hash as find_photo_by_hash, get_all_paginated
+from database import DBSession
+from dbe.photo import Photo, find_by_path as find_photo_by_path, find_by_hash as find_photo_by_hash, get_all_paginated, \
+    find_by_ids as find_photos_by_ids, find_version as find_photo_version, update_scanned_columns
+from dbe.folder_access import find_accessed_since
 from indexing import metadata_indexing_facade
 from dbe.app_data import get_app_data_val
-from service import image_facade
+from dbe.gallery import Gallery, get_all as get_all_galleries
+from dbe.photo_timeline import rebuild as rebuild_timeline
+from service import image_facade, gallery_service, folder_stats_service, file_service, instrumentation
+from service.folder_access_service import scan_priority, HOT_FOLDER_WINDOW, COLD
+from service.image_too_large_exception import ImageTooLargeException
+from service.task.implementation.rebuild_near_duplicates_task import RebuildNearDuplicatesTask
+from service.task.implementation.render_thumbnails_task import RenderThumbnailsTask
+
+
+class ScanFolder:
+    """Folder found by the walk, waiting in the scan queue."""
+
+    def __init__(self, path: Path, folder_id: UUID, mtime: float, walk_index: int):
+        self.path = path
+        self.folder_id = folder_id
+        self.mtime = mtime
+        self.walk_index = walk_index
+        self.photo_paths: List[Path] = []
 
 
 class RunScanAndIndexingTask(PhotoCabinetTask):
     # Supported image file extensions
     IMAGE_EXTENSIONS: Set[str] = {'.jpg', '.jpeg', '.png', '.gif', '.bmp', '.tiff', '.tif', '.webp', '.raw', '.cr2', '.nef', '.arw'}
+    # Folders viewed during the scan are picked up after at most this long
+    HOT_FOLDERS_REFRESH_S = 10
+    # Photos of cold folders get their metadata in batches of this size, one commit per batch
+    DEFERRED_BATCH_SIZE = 100
+    # Attempts to write a photo row edited concurrently before it's left for the next scan
+    CONFLICT_RETRIES = 3
 
     def __init__(self):
+        super().__init__()
         self.existing_folders: Set[UUID] = set()
         self.existing_photos: Set[UUID] = set()
         self.thumbnail_generation_enabled = False
         self.thumbnail_size = 10
         self.thumbnail_quality = 85
+        self.thumbnail_embedded_first = True
+        self.embedded_thumbnails = 0
+        self.galleries: List[Gallery] = []
+        self.deferred_photos: List[UUID] = []
+        # Folders whose photos changed since the last commit, their stats are refreshed with the commit
+        self.stale_folder_ids: Set[UUID] = set()
+        self.repair_folder_stats = False
 
     def get_type(self) -> TaskType:
         return TaskType.UPDATE_COLLECTION
 
     def _serialize_fields(self):
-        return {"db_task_id": self.db_task_id}
+        return {"db_task_id": self.db_task_id, "profile": self.profile}
 
     @classmethod
     def _deserialize_fields(cls, fields: dict):
         task = cls()
         task.db_task_id = fields["db_task_id"]
+        task.profile = fields.get("profile", False)
         return task
 
     def execute(self):
         self.thumbnail_generation_enabled = get_app_data_val(self.task_transaction, AppDataField.THUMBNAIL_GENERATION)
         self.thumbnail_size = get_app_data_val(self.task_transaction, AppDataField.THUMBNAIL_SIZE_PX)
         self.thumbnail_quality = get_app_data_val(self.task_transaction, AppDataField.THUMBNAIL_QUALITY)
+        self.thumbnail_embedded_first = get_app_data_val(self.task_transaction, AppDataField.THUMBNAIL_EMBEDDED_FIRST)
+        self.galleries = get_all_galleries(self.task_transaction)
 
-        self.current_folder: List[UUID] = []
         root = Path(app_config.get_configuration(pc_configuration.COLLECTION_PATH))
         
         if not root.exists():
@@ -56,119 +95,265 @@ class RunScanAndIndexingTask(PhotoCabinetTask):
         
         self.log_message(f"Starting collection update from: {root}")
         
+        # Stats are refreshed per folder during the scan, a full rebuild only repairs missing ones
+        self.repair_folder_stats = folder_stats_service.has_photos_without_folder_stats(self.task_transaction)
+
         # Get or create root folder
         root_folder = self._get_or_create_folder(None, None)
         
-        # First pass: count all photos for progress tracking
-        photo_count = self._count_photos(root)
-        self.log_message(f"Found {photo_count} photos to process")
+        # First pass: walk the tree, create folders and count all photos for progress tracking
+        scan_folders = self._walk_folders(root, root_folder.id, [])
+        photo_count = sum(len(scan_folder.photo_paths) for scan_folder in scan_folders)
+        self.log_message(f"Found {photo_count} photos in {len(scan_folders)} folders to process")
         self.update_max_progress(photo_count)
+        self.task_transaction.commit()
         
-        # Second pass: scan and process
-        self._scan_folder(root, root_folder)
+        # Second pass: process folders by priority, metadata of cold folders comes last
+        self._scan_folders(scan_folders)
+        self._save_deferred_metadata()
         
         # Cleanup: remove photos from database that no longer exist on disk
         self._cleanup_missing_data(root)
+
+        # Timeline rollup - one aggregation instead of tracking every date change
+        rebuild_timeline(self.task_transaction)
+        if self.repair_folder_stats:
+            folder_stats_service.rebuild_folder_stats(self.task_transaction)
+        else:
+            folder_stats_service.refresh_folder_stats(self.task_transaction, self.stale_folder_ids)
+        self.stale_folder_ids.clear()
         
+        if self.embedded_thumbnails > 0:
+            self.log_message(f"Published {self.embedded_thumbnails} embedded thumbnails, renditions are generated next")
         self.log_message("Collection update completed")
 
-    def _count_photos(self, folder_path: Path) -> int:
-        """Recursively count all photo files in the folder."""
-        count = 0
+    def get_follow_up_tasks(self) -> List[PhotoCabinetTask]:
+        # Perceptual hashes could change, near duplicate clusters are recomputed outside requests
+        follow_ups: List[PhotoCabinetTask] = [RebuildNearDuplicatesTask()]
+        if self.embedded_thumbnails > 0:
+            follow_ups.append(RenderThumbnailsTask())
+        return follow_ups
+
+    def _walk_folders(self, folder_path: Path, folder_id: UUID, scan_folders: List[ScanFolder]) -> List[ScanFolder]:
+        """Recursively collect folders and their photo files, creates missing folders in database."""
+        scan_folder = ScanFolder(folder_path, folder_id, folder_path.stat().st_mtime, len(scan_folders))
+        scan_folders.append(scan_folder)
         for item in folder_path.iterdir():
             if item.is_file() and self._is_image_file(item):
-                count += 1
+                scan_folder.photo_paths.append(item)
             elif item.is_dir() and not item.is_symlink():
-                count += self._count_photos(item)
-        return count
+                child_folder = self._get_or_create_folder(item.name, folder_id)
+                self._walk_folders(item, child_folder.id, scan_folders)
+        return scan_folders
+
+    def _scan_folders(self, scan_folders: List[ScanFolder]):
+        """
+        Processes folders from a priority queue (see folder_access_service.scan_priority) instead of walk order,
+        so the folder a user is looking at isn't indexed last. Viewed folders are re-read periodically.
+        """
+        queue = self._prioritize(scan_folders)
+        refreshed = time.monotonic()
+        while queue:
+            if time.monotonic() - refreshed >= self.HOT_FOLDERS_REFRESH_S:
+                queue = self._prioritize([scan_folder for _, _, scan_folder in queue])
+                refreshed = time.monotonic()
+            priority, _, scan_folder = heapq.heappop(queue)
+            self._scan_folder(scan_folder, priority[0] == COLD)
+
+    def _prioritize(self, scan_folders: List[ScanFolder]) -> List[Tuple[Tuple[int, float], int, ScanFolder]]:
+        hot_folders = find_accessed_since(self.task_transaction, datetime.now() - HOT_FOLDER_WINDOW)
+        now = datetime.now()
+        queue = [(scan_priority(scan_folder.folder_id, scan_folder.mtime, hot_folders, now), scan_folder.walk_index, scan_folder)
+                 for scan_folder in scan_folders]
+        heapq.heapify(queue)
+        return queue
 
-    def _scan_folder(self, folder_path: Path, parent_folder: Folder):
-        """Recursively scan a folder and process photos."""
-        self.log_message(f"Scanning folder: {folder_path}")
+    def _scan_folder(self, scan_folder: ScanFolder, defer_metadata: bool):
+        """Process photos of a folder, metadata of cold folders is only queued for _save_deferred_metadata."""
+        self.log_message(f"Scanning folder: {scan_folder.path}")
         
-        # Process all files in current folder
-        for item in folder_path.iterdir():
-            if item.is_file() and self._is_image_file(item):
-                self._process_photo(item, parent_folder)
-            elif item.is_dir() and not item.is_symlink():
-                # Create or get folder in database
-                child_folder = self._get_or_create_folder(item.name, parent_folder.id)
-                self.current_folder.append(child_folder.id)
-                # Recursively scan subfolder
-                self._scan_folder(item, child_folder)
-
-    def _process_photo(self, photo_path: Path, folder: Folder):
-        """Process a single photo: check if exists in DB, update metadata."""
+        for photo_path in scan_folder.photo_paths:
+            if not photo_path.is_file():
+                # Removed since the walk
+                self.increment_current_progress()
+                continue
+            with instrumentation.timed("scan.process_photo"):
+                bytes_read = self._process_photo(photo_path, scan_folder.folder_id, defer_metadata)
+            self.pace(bytes_read)
+
+        # Publish photos of the folder before the whole scan ends, the gallery is browsable during import
+        self.stale_folder_ids.add(scan_folder.folder_id)
+        self._commit_with_folder_stats()
+
+    def _commit_with_folder_stats(self):
+        """Refreshes stats of changed folders and their ancestors right before the commit, so the rows are locked briefly."""
+        folder_stats_service.refresh_folder_stats(self.task_transaction, self.stale_folder_ids)
+        self.stale_folder_ids.clear()
+        self.task_transaction.commit()
+
+    def _save_deferred_metadata(self):
+        if not self.deferred_photos:
+            return
+        self.log_message(f"Indexing metadata of {len(self.deferred_photos)} photos in older folders")
+        for start in range(0, len(self.deferred_photos), self.DEFERRED_BATCH_SIZE):
+            for photo in find_photos_by_ids(self.task_transaction,
+                                            self.deferred_photos[start:start + self.DEFERRED_BATCH_SIZE]):
+                self._save_metadata(photo)
+                self.stale_folder_ids.add(photo.folder_id)
+                self.increment_current_progress()
+                self.pace(photo.file_size or 0)
+            self._commit_with_folder_stats()
+
+    def _process_photo(self, photo_path: Path, folder_id: UUID, defer_metadata: bool = False) -> int:
+        """Process a single photo: check if exists in DB, update metadata. Returns the file size for pacing."""
         self.log_message(f"Processing photo: {photo_path}")
         
         # Calculate relative path from collection root
         root = Path(app_config.get_configuration(pc_configuration.COLLECTION_PATH))
         relative_path = photo_path.relative_to(root)
 
-        file_hash = image_facade.compute_pixel_sha256(str(photo_path))
         existing_photo = find_photo_by_path(self.task_transaction, str(relative_path))
+        try:
+            image_hashes = image_facade.compute_image_hashes(self.task_transaction, str(photo_path))
+        except ImageTooLargeException as e:
+            # Keep the photo where it is, just skip the update
+            self.log_message(f"Skipping photo {photo_path}: {str(e)}", severity=TaskLogSeverity.WARNING)
+            instrumentation.count("scan.photos_skipped")
+            if existing_photo is not None:
+                self.existing_photos.add(existing_photo.id)
+            self.increment_current_progress()
+            return 0
 
+        file_hash = image_hashes.pixel_hash
+        file_size = photo_path.stat().st_size
         if existing_photo is None:
             existing_photo = find_photo_by_hash(self.task_transaction, file_hash)
 
         if existing_photo is not None:
+            changes = dict()
             # Could be found by hash and renamed
             if photo_path.name != existing_photo.name:
-                existing_photo.name = photo_path.name
+                changes["name"] = photo_path.name
             # Could be found by hash and moved elsewhere
             if str(relative_path) != existing_photo.file_path:
-                existing_photo.file_path = str(relative_path)
+                changes["file_path"] = str(relative_path)
             # Could be found by path and change tags thus hash
             if file_hash != existing_photo.file_hash:
-                existing_photo.file_hash = file_hash
+                changes["file_hash"] = file_hash
+            if image_hashes.perceptual_hash != existing_photo.perceptual_hash:
+                changes["perceptual_hash"] = image_hashes.perceptual_hash
+            if file_size != existing_photo.file_size:
+                changes["file_size"] = file_size
             # Photo was found in limbo (was deleted at some point) - we need to bring it back
             if existing_photo.folder.is_limbo():
-                existing_photo.folder_id = folder.id
+                changes["folder_id"] = folder_id
+                self.stale_folder_ids.add(existing_photo.folder_id)
 
-            self.task_transaction.flush()
-            self._save_metadata(existing_photo) # refresh file metadata
+            if changes:
+                self._write_scanned_columns(existing_photo, changes)
+            instrumentation.count("scan.photos_updated")
             self.existing_photos.add(existing_photo.id)
-            self.increment_current_progress()
-            return
+            self._save_or_defer_metadata(existing_photo, defer_metadata) # refresh file metadata
+            return file_size
 
         # Create new photo entity
         photo = Photo()
-        photo.folder_id = folder.id
+        photo.folder_id = folder_id
         photo.file_path = str(relative_path)
         photo.file_hash = file_hash
+        photo.perceptual_hash = image_hashes.perceptual_hash
+        photo.file_size = file_size
         photo.name = photo_path.name
         self.task_transaction.add(photo)
         self.task_transaction.flush()
+        instrumentation.count("scan.photos_new")
 
-        self._save_metadata(photo)
         self.existing_photos.add(photo.id)
+        self._save_or_defer_metadata(photo, defer_metadata)
+        return file_size
+
+    def _write_scanned_columns(self, photo: Photo, values: dict):
+        """
+        Commits file derived columns of an existing photo in its own short transaction, so web edits of the row
+        never wait for the scan. A concurrent edit bumps the version, the write is retried with the new one
+        and columns set by the edit are left alone.
+        """
+        session = DBSession()
+        try:
+            version = photo.version
+            for _ in range(self.CONFLICT_RETRIES):
+                if update_scanned_columns(session, photo.id, version, values):
+                    session.commit()
+                    # Loaded again with committed values on next access
+                    self.task_transaction.expire(photo)
+                    return
+                session.rollback()
+                version = find_photo_version(session, photo.id)
+                if version is None:
+                    # Created by this scan and not committed yet, nobody else can edit it
+                    for column, value in values.items():
+                        setattr(photo, column, value)
+                    self.task_transaction.flush()
+                    return
+                instrumentation.count("scan.write_conflicts")
+            self.log_message(f"Photo {photo.name} is being edited, the next scan updates it",
+                             severity=TaskLogSeverity.WARNING)
+        finally:
+            session.close()
+
+    def _save_or_defer_metadata(self, photo: Photo, defer_metadata: bool):
+        if defer_metadata:
+            # Photo is listed (hashes, path) now, progress moves once its metadata is saved
+            self.deferred_photos.append(photo.id)
+            return
+        self._save_metadata(photo)
         self.increment_current_progress()
 
     def _save_metadata(self, photo: Photo):
         """Extract and save EXIF metadata for a photo."""
-        try:
-            metadata_indexing_facade.create_update_metadata_index(self.task_transaction, photo)
-            self.task_transaction.flush()
+        if photo.virtual_folder_id is not None:
+            # Created date and size count in stats of the virtual folder too
+            self.stale_folder_ids.add(photo.virtual_folder_id)
+        with instrumentation.timed("scan.save_metadata"):
+            try:
+                metadata_indexing_facade.create_update_metadata_index(self.task_transaction, photo)
+                self.task_transaction.flush()
+
+                created_date_tags = metadata_indexing_facade.search_created_date_tags(self.task_transaction, photo)
+                create_date_result = metadata_indexing_facade.get_created_date(created_date_tags)
+                if create_date_result.metadata_id is not None:
+                    photo.metadata_index.photo_created = create_date_result.created_date
+                    photo.metadata_index.photo_created_origin = create_date_result.metadata_id.get_key()
 
-            created_date_tags = metadata_indexing_facade.search_created_date_tags(self.task_transaction, photo)
-            create_date_result = metadata_indexing_facade.get_created_date(created_date_tags)
-            if create_date_result.metadata_id is not None:
-                photo.metadata_index.photo_created = create_date_result.created_date
-                photo.metadata_index.photo_created_origin = create_date_result.metadata_id.get_key()
+                camera_result = metadata_indexing_facade.get_camera(metadata_indexing_facade.search_camera_tags(photo))
+                photo.metadata_index.camera_make = camera_result.make
+                photo.metadata_index.camera_model = camera_result.model
+                photo.metadata_index.lens_model = camera_result.lens_model
 
-            if self.thumbnail_generation_enabled:
-                image_facade.generate_thumbnail(photo, self.thumbnail_size, self.thumbnail_quality)
+                if self.thumbnail_generation_enabled:
+                    self._publish_thumbnail(photo)
 
-            photo_size_tags = metadata_indexing_facade.search_photo_size_tags(self.task_transaction, photo)
-            photo_size_result: PhotoSizeResult = metadata_indexing_facade.get_photo_size(photo, photo_size_tags)
-            photo.metadata_index.width = photo_size_result.width
-            photo.metadata_index.height = photo_size_result.height
-            photo.metadata_index.size_origin = f"Width: {photo_size_result.width_origin}, Height: {photo_size_result.height_origin}"
+                photo_size_tags = metadata_indexing_facade.search_photo_size_tags(self.task_transaction, photo)
+                photo_size_result: PhotoSizeResult = metadata_indexing_facade.get_photo_size(photo, photo_size_tags)
+                photo.metadata_index.width = photo_size_result.width
+                photo.metadata_index.height = photo_size_result.height
+                photo.metadata_index.size_origin = f"Width: {photo_size_result.width_origin}, Height: {photo_size_result.height_origin}"
 
-            photo.metadata_index.preview_color_hex = image_facade.get_dominant_color_quantize(photo)
+                photo.metadata_index.preview_color_hex = image_facade.get_dominant_color_quantize(photo)
+
+                gallery_service.update_photo_membership(self.task_transaction, self.galleries, photo)
             
-        except Exception as e:
-            self.log_message(f"Error extracting metadata for {photo.name}: {str(e)}", severity=TaskLogSeverity.WARNING)
+            except Exception as e:
+                self.log_message(f"Error extracting metadata for {photo.name}: {str(e)}", severity=TaskLogSeverity.WARNING)
+                instrumentation.count("scan.metadata_errors")
+
+    def _publish_thumbnail(self, photo: Photo):
+        """Embedded camera thumbnail if enabled and available, RenderThumbnailsTask generates the rendition later."""
+        if (self.thumbnail_embedded_first and photo.metadata_index.thumbnail_level != ThumbnailLevel.RENDITION
+                and image_facade.extract_embedded_thumbnail(photo)):
+            self.embedded_thumbnails += 1
+            return
+        image_facade.generate_thumbnail(photo, self.thumbnail_size, self.thumbnail_quality)
 
     def _cleanup_missing_data(self, root_path: Path):
         """Move photos and folders that no longer exist on disk to limbo."""
@@ -192,7 +377,8 @@ class RunScanAndIndexingTask(PhotoCabinetTask):
             
             for photo in photos:
                 if photo.id not in self.existing_photos:
-                    photo.folder_id = limbo_folder.id
+                    self.stale_folder_ids.update({photo.folder_id, limbo_folder.id})
+                    self._write_scanned_columns(photo, {"folder_id": limbo_folder.id})
                     photos_moved += 1
             
             self.task_transaction.flush()
@@ -204,6 +390,7 @@ class RunScanAndIndexingTask(PhotoCabinetTask):
         # Cleanup folders: delete COLLECTION folders not in existing_folders
         offset = 0
         folders_deleted = 0
+        deleted_folder_ids: Set[UUID] = set()
         
         while True:
             folders = get_all_by_type(self.task_transaction, FolderType.COLLECTION, offset=offset, limit=batch_size)
@@ -214,6 +401,8 @@ class RunScanAndIndexingTask(PhotoCabinetTask):
                 if folder.id not in self.existing_folders:
                     # Skip root and limbo folders
                     if folder.id != ROOT_FOLDER_ID and folder.id != limbo_folder.id:
+                        self.stale_folder_ids.add(folder.parent_id)
+                        deleted_folder_ids.add(folder.id)
                         self.task_transaction.delete(folder)
                         folders_deleted += 1
             
@@ -222,6 +411,8 @@ class RunScanAndIndexingTask(PhotoCabinetTask):
         
         if folders_deleted > 0:
             self.log_message(f"Deleted {folders_deleted} folders that no longer exist")
+        # Stats rows of deleted folders went with them (cascade)
+        self.stale_folder_ids -= deleted_folder_ids
 
     def _get_or_create_folder(self, folder_name: str, parent_id: Optional[UUID]) -> Folder:
         """Get existing folder or create new one."""
@@ -238,12 +429,7 @@ class RunScanAndIndexingTask(PhotoCabinetTask):
         
         if folder is None:
             # Create new folder
-            folder = Folder()
-            folder.name = folder_name
-            folder.parent_id = parent_id
-            folder.folder_type = FolderType.COLLECTION
-            self.task_transaction.add(folder)
-            self.task_transaction.flush()
+            folder = file_service.create_folder(self.task_transaction, folder_name, parent_id, FolderType.COLLECTION)
 
         self.existing_folders.add(folder.id)
         return folder
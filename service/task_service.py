@@ -1,40 +1,102 @@
 import multiprocessing
+import threading
+import time
 from concurrent.futures import ProcessPoolExecutor
 from uuid import uuid4
 
 from database import DBSession
+from dbe.app_data import get_app_data_val
 from dbe.task import Task
+from domain.app_data_field import AppDataField
 from domain.task.pc_task import PhotoCabinetTask
+from service import instrumentation, metrics_service, profiling_service, task_throttle
+from service.task_throttle import TaskThrottle
 
 # Create the pool lazily after workers fork (avoid preload_app=True issues)
+# Task processes don't reuse DB connections of the parent, see database.dispose_after_fork
 _pool = None
 def get_pool():
     global _pool
     if _pool is None:
         ctx = multiprocessing.get_context("forkserver")  # or "spawn" if forkserver unavailable
-        _pool = ProcessPoolExecutor(max_workers=2, mp_context=ctx)
+        # Fresh process per task - nice set by a throttled task can't be lowered again for the next one
+        _pool = ProcessPoolExecutor(max_workers=2, mp_context=ctx, max_tasks_per_child=1)
     return _pool
 
-def _run_task_serialized(oh_task_dict):
+def _run_task_serialized(oh_task_dict, throttled: bool = True):
     # This runs in a separate process
     oh = PhotoCabinetTask.from_payload(oh_task_dict)
+    start = time.perf_counter()
+    result = "error"
     try:
         oh.task_transaction = DBSession()
+        throttle_policy = task_throttle.get_policy(oh.task_transaction, oh.get_type()) if throttled else None
+        if throttle_policy is not None:
+            task_throttle.apply_process_priority(throttle_policy)
+            oh.throttle = TaskThrottle(throttle_policy)
+        if get_app_data_val(oh.task_transaction, AppDataField.TASK_METRICS):
+            instrumentation.start_recording()
         oh.set_in_progress()
-        oh.execute()
+        if oh.profile:
+            with profiling_service.profiled(oh.db_task_id):
+                oh.execute()
+            oh.log_message(f"Profile saved, download it from /api/settings/profile/{oh.db_task_id}")
+        else:
+            oh.execute()
         oh.set_ok()
+        result = "ok"
+        return [follow_up.to_payload() for follow_up in oh.get_follow_up_tasks()]
     except Exception as ex:
         oh.set_error(str(ex))
         oh.task_transaction.rollback()
         raise
     finally:
+        recorder = instrumentation.stop_recording()
+        if recorder is not None:
+            oh.save_metrics(recorder)
         oh.task_transaction.close()
+        task_type = oh.get_type().name
+        metrics_service.observe(metrics_service.TASK_DURATION, time.perf_counter() - start, (task_type,))
+        metrics_service.inc(metrics_service.TASK_RUNS, (task_type, result))
+        # Task processes are idle between tasks, flush now so /metrics sees the run
+        metrics_service.flush()
 
 class TaskService:
     def __init__(self, max_workers: int = None):
         self.max_workers = max_workers
 
     def create_task(self, oh_task: PhotoCabinetTask):
+        task_id = self._create_db_task(oh_task)
+        future = get_pool().submit(_run_task_serialized, oh_task.to_payload())
+        metrics_service.inc(metrics_service.TASKS_SUBMITTED, (oh_task.get_type().name,))
+        metrics_service.add_gauge(metrics_service.TASK_QUEUE_DEPTH, 1)
+        future.add_done_callback(self._on_task_done)
+        return task_id
+
+    def run_task(self, oh_task: PhotoCabinetTask):
+        """
+        Runs the task and its follow-up tasks synchronously in this process, for benchmarks and profiling.
+        Tasks aren't throttled. Task errors are raised. Returns id of the first task.
+        """
+        task_id = self._create_db_task(oh_task)
+        for payload in _run_task_serialized(oh_task.to_payload(), throttled=False):
+            self.run_task(PhotoCabinetTask.from_payload(payload))
+        return task_id
+
+    def _on_task_done(self, future):
+        metrics_service.add_gauge(metrics_service.TASK_QUEUE_DEPTH, -1)
+        if future.cancelled() or future.exception() is not None:
+            return
+        payloads = future.result()
+        if payloads:
+            # Runs in the executor's management thread, queue follow-ups from another one
+            threading.Thread(target=self._create_follow_up_tasks, args=(payloads,), daemon=True).start()
+
+    def _create_follow_up_tasks(self, payloads):
+        for payload in payloads:
+            self.create_task(PhotoCabinetTask.from_payload(payload))
+
+    def _create_db_task(self, oh_task: PhotoCabinetTask):
         db_task = Task()
         task_id = uuid4()
         db_task.id = task_id
@@ -45,8 +107,6 @@ class TaskService:
         transaction.add(db_task)
         transaction.commit()
         transaction.close()
-
-        get_pool().submit(_run_task_serialized, oh_task.to_payload())
         return task_id
 
 task_service = TaskService(1)
\ No newline at end of file
@@ -0,0 +1,99 @@
+import logging
+import os
+import shutil
+import subprocess
+import sys
+import time
+from typing import Callable, Optional
+
+from sqlalchemy.orm import Session
+
+from dbe.app_data import get_app_data_val
+from domain.app_data_field import AppDataField
+from domain.task.task_type import TaskType
+from domain.task.throttle_policy import ThrottlePolicy
+from service import instrumentation, metrics_service
+
+logger = logging.getLogger()
+
+# Web latency is compared between reads of the metrics files this far apart
+LATENCY_CHECK_INTERVAL_S = 2.0
+# First backoff step, doubled while web requests stay slow and halved when they are fast again
+MIN_BACKOFF_S = 0.05
+# Reads the task was too busy for are made up for at most this long, in a burst
+MAX_BURST_S = 1.0
+IONICE_CLASSES = {"realtime": "1", "best-effort": "2", "idle": "3"}
+
+
+class TaskThrottle:
+    """
+    Paces a task by files and bytes it reads and backs off while web requests are slow. Latency comes from
+    pc_http_request_duration_seconds histograms which web processes flush to the metrics folder.
+    """
+
+    def __init__(self, policy: ThrottlePolicy, clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep):
+        self.policy = policy
+        self._clock = clock
+        self._sleep = sleep
+        self._next_read = clock()
+        self.backoff_s = 0.0
+        self._last_check = clock()
+        self._last_latency = None
+
+    def pace(self, bytes_read: int):
+        """Called after each file, sleeps until the next one is allowed."""
+        now = self._clock()
+        delay = self._rate_delay(now, bytes_read)
+        if self.policy.latency_threshold_ms and now - self._last_check >= LATENCY_CHECK_INTERVAL_S:
+            self._last_check = now
+            self._update_backoff()
+        delay += self.backoff_s
+        if delay > 0:
+            with instrumentation.timed("throttle.sleep"):
+                self._sleep(delay)
+
+    def _rate_delay(self, now: float, bytes_read: int) -> float:
+        cost_s = 0.0
+        if self.policy.max_files_per_s:
+            cost_s = 1 / self.policy.max_files_per_s
+        if self.policy.max_mb_per_s:
+            cost_s = max(cost_s, bytes_read / (self.policy.max_mb_per_s * 1024 * 1024))
+        self._next_read = max(self._next_read, now - MAX_BURST_S) + cost_s
+        return self._next_read - now
+
+    def _update_backoff(self):
+        latency = metrics_service.histogram_totals(metrics_service.HTTP_REQUEST_DURATION)
+        previous, self._last_latency = self._last_latency, latency
+        if previous is None:
+            return
+        requests = latency[1] - previous[1]
+        mean_ms = (latency[0] - previous[0]) / requests * 1000 if requests > 0 else 0
+        if mean_ms > self.policy.latency_threshold_ms:
+            self.backoff_s = min(self.policy.max_backoff_s, max(MIN_BACKOFF_S, self.backoff_s * 2))
+            instrumentation.count("throttle.backoffs")
+        elif self.backoff_s > 0:
+            # No requests counts as fast, a stalled request is counted once it finishes
+            self.backoff_s = self.backoff_s / 2 if self.backoff_s / 2 >= MIN_BACKOFF_S else 0.0
+
+
+def get_policy(session: Session, task_type: TaskType) -> Optional[ThrottlePolicy]:
+    values = get_app_data_val(session, AppDataField.TASK_THROTTLING).get(task_type.name)
+    return None if values is None else ThrottlePolicy.from_dict(values)
+
+def apply_process_priority(policy: ThrottlePolicy):
+    """Lowers CPU and IO priority of this process, its children (exiftool) inherit it. Can't be undone."""
+    if policy.nice > 0 and hasattr(os, "nice"):
+        os.nice(policy.nice)
+    if policy.ionice_class is None or not sys.platform.startswith("linux"):
+        return
+    ionice = shutil.which("ionice")
+    if ionice is None:
+        logger.warning("ionice not found, task IO priority is unchanged")
+        return
+    command = [ionice, "-c", IONICE_CLASSES[policy.ionice_class]]
+    if policy.ionice_level is not None and policy.ionice_class != "idle":
+        command += ["-n", str(policy.ionice_level)]
+    result = subprocess.run(command + ["-p", str(os.getpid())], capture_output=True, text=True)
+    if result.returncode != 0:
+        logger.warning(f"ionice failed: {result.stderr.strip()}")
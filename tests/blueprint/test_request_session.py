@@ -0,0 +1,53 @@
+import unittest
+from unittest import mock
+
+from flask_smorest import Blueprint
+
+from blueprint import request_session
+from blueprint.request_session import LazySession, read_only, is_read_only
+
+
+class TestRequestSession(unittest.TestCase):
+
+    def test_session_not_created_until_used(self):
+        """Requests that don't query never open a session."""
+        session = LazySession(read_only=True)
+        self.assertFalse(session.started)
+        session.finish()
+        self.assertFalse(session.started)
+
+    def test_error_response_rolled_back(self):
+        """Writes of a request answered with an error status are not committed."""
+        for status_code, committed in ((200, True), (204, True), (400, False), (500, False)):
+            with self.subTest(status_code=status_code), \
+                    mock.patch.object(request_session, "DBSession") as db_session, \
+                    mock.patch.object(request_session.app_config, "get", return_value=0):
+                session = LazySession(read_only=False)
+                session.add(object())
+                session.finish(status_code)
+                self.assertEqual(committed, db_session.return_value.commit.called)
+                self.assertEqual(not committed, db_session.return_value.rollback.called)
+                db_session.return_value.close.assert_called_once()
+
+    def test_read_only_mark_survives_smorest_decorators(self):
+        """Endpoint registered by flask-smorest keeps the read-only mark."""
+        blp = Blueprint("test", __name__)
+
+        @blp.route("/read", methods=["GET"])
+        @blp.response(200)
+        @blp.alt_response(404)
+        @read_only
+        def read():
+            return ""
+
+        @blp.route("/write", methods=["POST"])
+        @blp.response(200)
+        def write():
+            return ""
+
+        self.assertTrue(is_read_only(read))
+        self.assertFalse(is_read_only(write))
+
+
+if __name__ == '__main__':
+    unittest.main()
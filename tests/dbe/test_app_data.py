@@ -0,0 +1,111 @@
+import unittest
+from unittest import mock
+
+from sqlalchemy import create_engine, update
+from sqlalchemy.orm import sessionmaker
+
+# Every mapped class has to be imported before mappers are configured
+from dbe import task_log, task, folder, photo, app_data, pixel_hash_cache, gallery, photo_timeline, folder_stats, folder_closure
+from indexing.dbe import metadata_index, metadata_indexing_group, metadata_indexing_tag, metadata_archive
+from exiftool.dbe import et_tag, et_group, et_value
+from dbe.app_data import AppData, AppDataVersion, get_app_data_val, set_app_data_value
+from domain.app_data_field import AppDataField
+
+
+class TestAppDataCache(unittest.TestCase):
+
+    def setUp(self):
+        engine = create_engine("sqlite://")
+        AppData.__table__.create(engine)
+        AppDataVersion.__table__.create(engine)
+        self.session_maker = sessionmaker(bind=engine, autoflush=False)
+        # Process cache would outlive the in-memory database of the previous test
+        cache = mock.patch.object(app_data, "_cache", app_data._AppDataCache())
+        cache.start()
+        self.addCleanup(cache.stop)
+
+    def test_default_without_row(self):
+        """Fields missing in the table use their default value."""
+        with self.session_maker() as session:
+            self.assertEqual(AppDataField.THUMBNAIL_SIZE_PX.default_value,
+                             get_app_data_val(session, AppDataField.THUMBNAIL_SIZE_PX))
+
+    def test_set_value_visible_in_same_and_new_session(self):
+        """Setting a value invalidates the cache, values are parsed to field type."""
+        with self.session_maker() as session:
+            get_app_data_val(session, AppDataField.THUMBNAIL_SIZE_PX)
+            set_app_data_value(session, AppDataField.THUMBNAIL_SIZE_PX, 300)
+            self.assertEqual(300, get_app_data_val(session, AppDataField.THUMBNAIL_SIZE_PX))
+            session.commit()
+        with self.session_maker() as session:
+            self.assertEqual(300, get_app_data_val(session, AppDataField.THUMBNAIL_SIZE_PX))
+
+    def test_change_by_other_process(self):
+        """Value changed elsewhere is picked up by the next session once the version is bumped."""
+        with self.session_maker() as session:
+            set_app_data_value(session, AppDataField.THUMBNAIL_QUALITY, 70)
+            session.commit()
+        with self.session_maker() as session:
+            self.assertEqual(70, get_app_data_val(session, AppDataField.THUMBNAIL_QUALITY))
+
+        # Another process: row and version updated directly
+        with self.session_maker() as session:
+            session.execute(update(AppData).where(AppData.field_name == AppDataField.THUMBNAIL_QUALITY.name)
+                            .values(field_value="95"))
+            session.execute(update(AppDataVersion).values(version=AppDataVersion.version + 1))
+            session.commit()
+
+        with self.session_maker() as session:
+            self.assertEqual(95, get_app_data_val(session, AppDataField.THUMBNAIL_QUALITY))
+
+    def test_uncommitted_value_not_cached(self):
+        """Value read back before commit stays in its session, a rollback leaves the committed one."""
+        with self.session_maker() as session:
+            set_app_data_value(session, AppDataField.THUMBNAIL_SIZE_PX, 300)
+            self.assertEqual(300, get_app_data_val(session, AppDataField.THUMBNAIL_SIZE_PX))
+            self.assertIsNone(app_data._cache.version)
+            session.rollback()
+            self.assertEqual(AppDataField.THUMBNAIL_SIZE_PX.default_value,
+                             get_app_data_val(session, AppDataField.THUMBNAIL_SIZE_PX))
+
+    def test_version_checked_per_transaction(self):
+        """Long lived session sees a change made elsewhere in its next transaction."""
+        with self.session_maker() as task_session:
+            self.assertEqual(AppDataField.THUMBNAIL_QUALITY.default_value,
+                             get_app_data_val(task_session, AppDataField.THUMBNAIL_QUALITY))
+            task_session.commit()
+
+            # Another process: row and version updated directly, this process cache still has the old version
+            with self.session_maker() as session:
+                session.add(AppData(field_name=AppDataField.THUMBNAIL_QUALITY.name, field_value="55"))
+                session.add(AppDataVersion(id=app_data.APP_DATA_VERSION_ID, version=1))
+                session.commit()
+
+            self.assertEqual(55, get_app_data_val(task_session, AppDataField.THUMBNAIL_QUALITY))
+
+    def test_invalid_row_uses_default(self):
+        """Value that can't be parsed falls back to the default of its field only."""
+        with self.session_maker() as session:
+            set_app_data_value(session, AppDataField.THUMBNAIL_QUALITY, 70)
+            session.add(AppData(field_name=AppDataField.THUMBNAIL_SIZE_PX.name, field_value="large"))
+            session.commit()
+        with self.session_maker() as session, self.assertLogs(level="ERROR"):
+            self.assertEqual(AppDataField.THUMBNAIL_SIZE_PX.default_value,
+                             get_app_data_val(session, AppDataField.THUMBNAIL_SIZE_PX))
+            self.assertEqual(70, get_app_data_val(session, AppDataField.THUMBNAIL_QUALITY))
+
+    def test_list_and_dict_stored_as_json(self):
+        """List and dict values are read back as they were set."""
+        throttling = {"UPDATE_COLLECTION": {"nice": 5, "ionice_class": None}}
+        with self.session_maker() as session:
+            set_app_data_value(session, AppDataField.METADATA_INDEX_TRIMMED_GROUPS, ["MakerNotes", "ICC_Profile"])
+            set_app_data_value(session, AppDataField.TASK_THROTTLING, throttling)
+            session.commit()
+        with self.session_maker() as session:
+            self.assertEqual(["MakerNotes", "ICC_Profile"],
+                             get_app_data_val(session, AppDataField.METADATA_INDEX_TRIMMED_GROUPS))
+            self.assertEqual(throttling, get_app_data_val(session, AppDataField.TASK_THROTTLING))
+
+
+if __name__ == '__main__':
+    unittest.main()
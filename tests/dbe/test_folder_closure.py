@@ -0,0 +1,100 @@
+import unittest
+from unittest import mock
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+
+# Every mapped class has to be imported before mappers are configured
+from dbe import task_log, task, folder, photo, app_data, pixel_hash_cache, gallery, photo_timeline, folder_stats, folder_closure, folder_access
+from indexing.dbe import metadata_index, metadata_indexing_group, metadata_indexing_tag, metadata_archive
+from exiftool.dbe import et_tag, et_group, et_value
+from dbe.folder import Folder
+from dbe.folder_closure import FolderClosure, is_descendant, subtree_ids, ancestor_ids
+from dbe.photo import Photo
+from domain.folder_type import FolderType
+from service import file_service
+
+
+class TestFolderClosure(unittest.TestCase):
+
+    def setUp(self):
+        engine = create_engine("sqlite://")
+        for table in (Folder.__table__, folder_stats.FolderStats.__table__, FolderClosure.__table__, Photo.__table__):
+            table.create(engine)
+        self.session = sessionmaker(bind=engine, autoflush=False)()
+        self.addCleanup(self.session.close)
+        # root ─┬─ a ── b
+        #       └─ c
+        self.root = self._create("root", None)
+        self.a = self._create("a", self.root.id)
+        self.b = self._create("b", self.a.id)
+        self.c = self._create("c", self.root.id)
+
+    def _create(self, name: str, parent_id) -> Folder:
+        return file_service.create_folder(self.session, name, parent_id, FolderType.VIRTUAL)
+
+    def _closure(self) -> set:
+        return set(self.session.execute(
+            select(FolderClosure.ancestor_id, FolderClosure.descendant_id, FolderClosure.depth)).all())
+
+    def test_insert_folder(self):
+        """Leaf gets its own row and one row per ancestor with the distance as depth."""
+        self.assertEqual({(self.b.id, self.b.id, 0), (self.a.id, self.b.id, 1), (self.root.id, self.b.id, 2)},
+                         {row for row in self._closure() if row[1] == self.b.id})
+
+    def test_subtree_and_ancestor_ids(self):
+        """Subtree and ancestors include the folder itself."""
+        self.assertEqual({self.a.id, self.b.id}, set(self.session.scalars(subtree_ids(self.a.id)).all()))
+        self.assertEqual({self.root.id, self.a.id, self.b.id, self.c.id},
+                         set(self.session.scalars(subtree_ids(self.root.id)).all()))
+        self.assertEqual({self.root.id, self.a.id, self.b.id},
+                         set(self.session.scalars(ancestor_ids([self.b.id])).all()))
+        self.assertEqual({self.root.id, self.a.id, self.c.id},
+                         set(self.session.scalars(ancestor_ids([self.a.id, self.c.id])).all()))
+
+    def test_is_descendant(self):
+        """Folder is a descendant of itself and of every ancestor, not of a sibling."""
+        self.assertTrue(is_descendant(self.session, self.b.id, self.root.id))
+        self.assertTrue(is_descendant(self.session, self.b.id, self.b.id))
+        self.assertFalse(is_descendant(self.session, self.root.id, self.b.id))
+        self.assertFalse(is_descendant(self.session, self.b.id, self.c.id))
+
+    def test_move_subtree(self):
+        """Moved subtree is re-linked to the new ancestors, rows inside it and of other folders are kept."""
+        untouched = {row for row in self._closure() if row[1] not in (self.a.id, self.b.id)}
+        # Stats refresh uses PostgreSQL array indexing
+        with mock.patch.object(file_service.folder_stats_service, "refresh_folder_stats") as refresh:
+            file_service.move_folder(self.session, self.a, self.c.id)
+        refresh.assert_called_once_with(self.session, {self.root.id, self.c.id})
+
+        moved = {(self.a.id, self.a.id, 0), (self.c.id, self.a.id, 1), (self.root.id, self.a.id, 2),
+                 (self.b.id, self.b.id, 0), (self.a.id, self.b.id, 1), (self.c.id, self.b.id, 2), (self.root.id, self.b.id, 3)}
+        self.assertEqual(untouched | moved, self._closure())
+        self.assertEqual(self.c.id, self.session.get(Folder, self.a.id).parent_id)
+
+    def test_move_folder_into_own_subtree(self):
+        """Folder can't be moved under itself or its descendant, the closure is unchanged."""
+        before = self._closure()
+        for target in (self.a, self.b):
+            with self.assertRaises(ValueError):
+                file_service.move_folder(self.session, self.a, target.id)
+        self.assertEqual(before, self._closure())
+
+    def test_rejected_move_selection_changes_nothing(self):
+        """Selection with a folder that can't be moved is rejected before photos or other folders are moved."""
+        photo = Photo(folder_id=self.root.id, file_path="p.jpg", file_hash="p", name="p.jpg")
+        self.session.add(photo)
+        self.session.flush()
+        before = self._closure()
+
+        with self.assertRaises(ValueError):
+            file_service.move_selection(self.session, [self.c.id, self.a.id], [photo.id], self.b.id)
+
+        self.session.expire_all()
+        self.assertEqual(before, self._closure())
+        self.assertEqual(self.root.id, self.session.get(Folder, self.c.id).parent_id)
+        self.assertIsNone(self.session.get(Photo, photo.id).virtual_folder_id)
+
+
+if __name__ == "__main__":
+    unittest.main()
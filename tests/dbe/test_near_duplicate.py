@@ -0,0 +1,54 @@
+import unittest
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+# Every mapped class has to be imported before mappers are configured
+from dbe import task_log, task, folder, photo, app_data, pixel_hash_cache, gallery, photo_timeline, folder_stats, folder_closure, folder_access, near_duplicate
+from indexing.dbe import metadata_index, metadata_indexing_group, metadata_indexing_tag, metadata_archive
+from exiftool.dbe import et_tag, et_group, et_value
+from dbe.folder import Folder
+from dbe.near_duplicate import NearDuplicate, replace_clusters, find_cluster_page, cluster_count
+from dbe.photo import Photo
+from domain.folder_type import FolderType
+from service.near_duplicate_service import cluster_by_distance
+
+
+class TestNearDuplicateClusters(unittest.TestCase):
+
+    def setUp(self):
+        engine = create_engine("sqlite://")
+        for table in (Folder.__table__, Photo.__table__, NearDuplicate.__table__):
+            table.create(engine)
+        self.session = sessionmaker(bind=engine, autoflush=False)()
+        self.addCleanup(self.session.close)
+        collection = Folder(name="collection", folder_type=FolderType.COLLECTION)
+        self.session.add(collection)
+        self.session.flush()
+        self.photos = [Photo(folder_id=collection.id, file_path=f"{i}.jpg", file_hash=str(i), name=f"{i}.jpg")
+                       for i in range(7)]
+        self.session.add_all(self.photos)
+        self.session.flush()
+
+    def test_pages_keep_cluster_order(self):
+        """Stored clusters are paged largest first, a rebuild replaces the previous ones."""
+        ids = [p.id for p in self.photos]
+        replace_clusters(self.session, [ids[:2]])
+        hashes = {ids[0]: 0b0, ids[1]: 0b1, ids[2]: 0b11, ids[3]: 0b11 << 40, ids[4]: 0b111 << 40,
+                  ids[5]: 0b11 << 20, ids[6]: 0b111 << 20}
+        clusters = cluster_by_distance(hashes, 1)
+        replace_clusters(self.session, clusters)
+
+        self.assertEqual(3, cluster_count(self.session))
+        first_page = find_cluster_page(self.session, 0, 2)
+        self.assertEqual([sorted(ids[:3]), sorted(clusters[1])], first_page)
+        self.assertEqual([sorted(clusters[2])], find_cluster_page(self.session, 1, 2))
+
+    def test_empty(self):
+        """Before the first rebuild there are no clusters."""
+        self.assertEqual(0, cluster_count(self.session))
+        self.assertEqual([], find_cluster_page(self.session, 0, 20))
+
+
+if __name__ == "__main__":
+    unittest.main()
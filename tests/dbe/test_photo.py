@@ -0,0 +1,116 @@
+import unittest
+from datetime import datetime
+
+from sqlalchemy import create_engine, update
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm.exc import StaleDataError
+
+# Every mapped class has to be imported before mappers are configured
+from dbe import task_log, task, folder, photo, app_data, pixel_hash_cache, gallery, photo_timeline, folder_stats, folder_closure, folder_access
+from indexing.dbe import metadata_index, metadata_indexing_group, metadata_indexing_tag, metadata_archive
+from exiftool.dbe import et_tag, et_group, et_value
+from dbe.folder import Folder
+from dbe.folder_closure import FolderClosure
+from dbe.photo import Photo, find_version, update_scanned_columns, find_subtree_photos
+from domain.cursor_direction import CursorDirection
+from domain.folder_type import FolderType
+from indexing.dbe.metadata_index import MetadataIndex
+from service import file_service
+
+
+@compiles(JSONB, "sqlite")
+def _jsonb_as_json(type_, compiler, **kw):
+    return "JSON"
+
+
+class TestPhotoVersion(unittest.TestCase):
+
+    def setUp(self):
+        engine = create_engine("sqlite://")
+        Folder.__table__.create(engine)
+        Photo.__table__.create(engine)
+        folder_stats.FolderStats.__table__.create(engine)
+        self.session_maker = sessionmaker(bind=engine, autoflush=False)
+        with self.session_maker() as session:
+            collection = Folder(name="collection", folder_type=FolderType.COLLECTION)
+            virtual = Folder(name="virtual", folder_type=FolderType.VIRTUAL)
+            session.add_all([collection, virtual])
+            session.flush()
+            photo = Photo(folder_id=collection.id, virtual_folder_id=virtual.id, file_path="a/b.jpg",
+                          file_hash="hash", name="b.jpg")
+            session.add(photo)
+            session.commit()
+            self.photo_id = photo.id
+
+    def test_orm_flush_of_changed_row_fails(self):
+        """Edit loaded before a concurrent bulk update doesn't overwrite it silently."""
+        with self.session_maker() as scan, self.session_maker() as web:
+            scanned = scan.get(Photo, self.photo_id)
+            self.assertEqual(1, scanned.version)
+            web.execute(update(Photo).where(Photo.id == self.photo_id)
+                        .values(virtual_folder_id=None, version=Photo.version + 1))
+            web.commit()
+
+            scanned.file_hash = "scanned"
+            with self.assertRaises(StaleDataError):
+                scan.flush()
+
+    def test_scanned_columns_keep_concurrent_edit(self):
+        """Stale version is rejected, retry with the current one keeps the edited column."""
+        with self.session_maker() as session:
+            session.execute(update(Photo).where(Photo.id == self.photo_id)
+                            .values(virtual_folder_id=None, version=Photo.version + 1))
+            session.commit()
+
+            self.assertFalse(update_scanned_columns(session, self.photo_id, 1, {"file_hash": "new"}))
+            self.assertTrue(update_scanned_columns(session, self.photo_id, find_version(session, self.photo_id),
+                                                   {"file_hash": "new"}))
+            session.commit()
+
+            photo = session.get(Photo, self.photo_id)
+            self.assertEqual(("new", None, 3), (photo.file_hash, photo.virtual_folder_id, photo.version))
+
+    def test_only_scanned_columns_written(self):
+        """Columns owned by web edits can't be written by the scan."""
+        with self.session_maker() as session:
+            with self.assertRaises(ValueError):
+                update_scanned_columns(session, self.photo_id, 1, {"virtual_folder_id": None})
+
+
+class TestSubtreePhotos(unittest.TestCase):
+
+    def setUp(self):
+        engine = create_engine("sqlite://")
+        for table in (Folder.__table__, folder_stats.FolderStats.__table__, FolderClosure.__table__,
+                      Photo.__table__, MetadataIndex.__table__):
+            table.create(engine)
+        self.session = sessionmaker(bind=engine, autoflush=False)()
+        self.addCleanup(self.session.close)
+        self.root = file_service.create_folder(self.session, "root", None, FolderType.COLLECTION)
+        self.child = file_service.create_folder(self.session, "child", self.root.id, FolderType.COLLECTION)
+
+    def _add_photo(self, name: str, created=None, with_metadata: bool = True) -> Photo:
+        photo = Photo(folder_id=self.child.id, file_path=f"child/{name}", file_hash=name, name=name)
+        self.session.add(photo)
+        self.session.flush()
+        if with_metadata:
+            self.session.add(MetadataIndex(photo_id=photo.id, exif_json={}, photo_created=created))
+        self.session.flush()
+        return photo
+
+    def test_photo_without_metadata_listed(self):
+        """Photo without metadata row is paged with the undated photos instead of being dropped."""
+        dated = self._add_photo("dated.jpg", datetime(2024, 5, 1))
+        undated = self._add_photo("undated.jpg")
+        missing = self._add_photo("missing.jpg", with_metadata=False)
+        self.session.expunge_all()
+        no_created = sorted([undated.id, missing.id], reverse=True)
+
+        first_page = find_subtree_photos(self.session, self.root.id, CursorDirection.AFTER, None, None, 2)
+        self.assertEqual([dated.id, no_created[0]], [p.id for p in first_page])
+        next_page = find_subtree_photos(self.session, self.root.id, CursorDirection.AFTER, None, no_created[0], 2)
+        self.assertEqual([no_created[1]], [p.id for p in next_page])
+        previous_page = find_subtree_photos(self.session, self.root.id, CursorDirection.BEFORE, None, no_created[1], 2)
+        self.assertEqual([dated.id, no_created[0]], [p.id for p in previous_page])
@@ -0,0 +1,103 @@
+import unittest
+from datetime import date, datetime
+from unittest import mock
+
+from sqlalchemy import Date, create_engine, event
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.sql.expression import Cast
+
+# Every mapped class has to be imported before mappers are configured
+from dbe import task_log, task, folder, photo, app_data, pixel_hash_cache, gallery, photo_timeline, folder_stats, folder_closure, folder_access
+from indexing.dbe import metadata_index, metadata_indexing_group, metadata_indexing_tag, metadata_archive
+from exiftool.dbe import et_tag, et_group, et_value
+from dbe.folder import Folder
+from dbe.folder_closure import FolderClosure
+from dbe.photo import Photo
+from dbe.photo_timeline import PhotoTimeline, rebuild, refresh, find_histogram
+from domain.folder_type import FolderType
+from domain.timeline_granularity import TimelineGranularity
+from indexing.dbe.metadata_index import MetadataIndex
+from service import file_service
+
+
+@compiles(JSONB, "sqlite")
+def _jsonb_as_json(type_, compiler, **kw):
+    return "JSON"
+
+@compiles(Cast, "sqlite")
+def _cast_as_sqlite_date(cast, compiler, **kw):
+    # CAST(... AS DATE) has numeric affinity in SQLite, date() keeps the ISO day
+    if isinstance(cast.type, Date):
+        return f"date({compiler.process(cast.clause, **kw)})"
+    return compiler.visit_cast(cast, **kw)
+
+def _date_trunc(field: str, day: str) -> str:
+    return {"year": day[:4] + "-01-01", "month": day[:7] + "-01", "day": day[:10]}[field]
+
+
+class TestPhotoTimeline(unittest.TestCase):
+
+    def setUp(self):
+        engine = create_engine("sqlite://")
+        event.listen(engine, "connect",
+                     lambda connection, _: connection.create_function("date_trunc", 2, _date_trunc))
+        for table in (Folder.__table__, folder_stats.FolderStats.__table__, FolderClosure.__table__,
+                      Photo.__table__, MetadataIndex.__table__, PhotoTimeline.__table__):
+            table.create(engine)
+        self.session = sessionmaker(bind=engine, autoflush=False)()
+        self.addCleanup(self.session.close)
+        self.root = file_service.create_folder(self.session, "root", None, FolderType.COLLECTION)
+        self.child = file_service.create_folder(self.session, "child", self.root.id, FolderType.COLLECTION)
+        self.virtual_root = file_service.create_folder(self.session, "virtual", None, FolderType.VIRTUAL)
+        self.album = file_service.create_folder(self.session, "album", self.virtual_root.id, FolderType.VIRTUAL)
+
+    def _add_photo(self, folder_id, created, virtual_folder_id=None) -> Photo:
+        photo = Photo(folder_id=folder_id, virtual_folder_id=virtual_folder_id, file_path=f"{created}.jpg",
+                      file_hash=str(created), name=f"{created}.jpg")
+        self.session.add(photo)
+        self.session.flush()
+        self.session.add(MetadataIndex(photo_id=photo.id, exif_json={}, photo_created=created))
+        self.session.flush()
+        return photo
+
+    def _histogram(self, folder_id, granularity=TimelineGranularity.YEAR, date_from=None, date_to=None):
+        return find_histogram(self.session, folder_id, granularity, date_from, date_to)
+
+    def test_histogram_of_subtree(self):
+        """Buckets sum days of the whole subtree, virtual folders count their photos too, date_to is exclusive."""
+        self._add_photo(self.root.id, datetime(2023, 3, 1, 10))
+        self._add_photo(self.child.id, datetime(2023, 3, 1, 18), self.album.id)
+        self._add_photo(self.child.id, datetime(2024, 7, 2, 9), self.album.id)
+        self._add_photo(self.child.id, None)
+        rebuild(self.session)
+
+        self.assertEqual([(date(2023, 1, 1), 2), (date(2024, 1, 1), 1)], self._histogram(self.root.id))
+        self.assertEqual([(date(2023, 1, 1), 1), (date(2024, 1, 1), 1)], self._histogram(self.virtual_root.id))
+        self.assertEqual([(date(2023, 3, 1), 1)], self._histogram(self.child.id, TimelineGranularity.DAY,
+                                                                   date(2023, 1, 1), date(2024, 7, 2)))
+
+    def test_selection_changes_refresh_virtual_folders(self):
+        """Moving photos between virtual folders and removing them updates histograms without a rebuild."""
+        photo = self._add_photo(self.child.id, datetime(2022, 5, 5))
+        other_album = file_service.create_folder(self.session, "other", self.virtual_root.id, FolderType.VIRTUAL)
+        rebuild(self.session)
+        year = [(date(2022, 1, 1), 1)]
+
+        # Stats refresh uses PostgreSQL array indexing
+        with mock.patch.object(file_service.folder_stats_service, "refresh_folder_stats"):
+            file_service.move_selection(self.session, [], [photo.id], self.album.id)
+            self.assertEqual(year, self._histogram(self.album.id))
+
+            file_service.move_selection(self.session, [], [photo.id], other_album.id)
+            self.assertEqual([], self._histogram(self.album.id))
+            self.assertEqual(year, self._histogram(self.virtual_root.id))
+
+            file_service.remove_selection(self.session, [], [photo.id])
+            self.assertEqual([], self._histogram(self.virtual_root.id))
+        self.assertEqual(year, self._histogram(self.root.id))
+
+
+if __name__ == "__main__":
+    unittest.main()
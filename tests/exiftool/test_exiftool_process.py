@@ -0,0 +1,84 @@
+import os
+import sys
+import tempfile
+import unittest
+
+from exiftool.exiftool_process import ExiftoolProcess
+
+# Speaks the -stay_open protocol: prints the command arguments, "-b" prints bytes that contain a marker
+FAKE_EXIFTOOL = r'''
+import sys
+args, echo = [], None
+lines = iter(sys.stdin.buffer)
+for line in lines:
+    line = line.rstrip(b"\n")
+    if line == b"-stay_open" and next(lines).strip() == b"False":
+        break
+    if line == b"-echo4":
+        echo = next(lines).rstrip(b"\n")
+    elif line.startswith(b"-execute"):
+        sequence = line[len(b"-execute"):]
+        if b"-b" in args:
+            sys.stdout.buffer.write(b"\xff\xd8{ready" + sequence + b"}\n\x00")
+        elif b"-sleep" in args:
+            continue
+        else:
+            sys.stdout.buffer.write(b" ".join(args) + b"\n")
+        if b"missing.jpg" in args:
+            sys.stderr.buffer.write(b"Error: File not found - missing.jpg\n")
+        sys.stdout.buffer.write(b"{ready" + sequence + b"}\n")
+        sys.stderr.buffer.write(echo + b"\n")
+        sys.stdout.flush()
+        sys.stderr.flush()
+        args, echo = [], None
+    else:
+        args.append(line)
+'''
+
+
+class TestExiftoolProcess(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        script_path = os.path.join(self.temp_dir.name, "fake_exiftool.py")
+        with open(script_path, "w") as script:
+            script.write(FAKE_EXIFTOOL)
+        self.process = ExiftoolProcess([sys.executable, script_path])
+
+    def tearDown(self):
+        self.process.close()
+        self.temp_dir.cleanup()
+
+    def test_commands_share_one_process(self):
+        """Consecutive commands are answered by the same process, each with its own output."""
+        first, _ = self.process.execute(["-j", "a.jpg"], timeout=10)
+        second, _ = self.process.execute(["-s3", "b.jpg"], timeout=10)
+
+        self.assertEqual(b"-j a.jpg\n", first)
+        self.assertEqual(b"-s3 b.jpg\n", second)
+        self.assertTrue(self.process.is_alive())
+
+    def test_binary_output_containing_marker(self):
+        """Response ends at the marker at the end of output, not at the same bytes inside binary data."""
+        stdout, _ = self.process.execute(["-b", "-PreviewImage", "a.nef"], timeout=10)
+
+        self.assertEqual(b"\xff\xd8{ready1}\n\x00", stdout)
+
+    def test_stderr_returned(self):
+        """Errors written to stderr are returned without the marker."""
+        stdout, stderr = self.process.execute(["-j", "missing.jpg"], timeout=10)
+
+        self.assertEqual(b"-j missing.jpg\n", stdout)
+        self.assertEqual(b"Error: File not found - missing.jpg\n", stderr)
+
+    def test_timeout_kills_process(self):
+        """Command without answer raises TimeoutError and the process is not reused."""
+        with self.assertRaises(TimeoutError):
+            self.process.execute(["-sleep"], timeout=0.2)
+        self.process._process.wait(timeout=5)
+
+        self.assertFalse(self.process.is_alive())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,35 @@
+import unittest
+
+from domain.metadata import metadata_defined
+from domain.metadata.metadata_id import MetadataId
+from indexing.domain.searched_tags_result import SearchedTagsResult
+from indexing.metadata_indexing_service import get_camera
+
+
+class TestGetCamera(unittest.TestCase):
+
+    def test_camera_and_lens(self):
+        """Make, model and lens are read from any EXIF group."""
+        result = SearchedTagsResult()
+        result.add_result(metadata_defined.EXIF_MAKE, MetadataId("EXIF", "IFD0", "Make"), "Canon")
+        result.add_result(metadata_defined.EXIF_MODEL, MetadataId("EXIF", "IFD0", "Model"), "Canon EOS R6 ")
+        result.add_result(metadata_defined.EXIF_LENS_MODEL, MetadataId("EXIF", "ExifIFD", "LensModel"), "RF24-105mm F4 L IS USM")
+
+        camera = get_camera(result)
+        self.assertEqual(camera.make, "Canon")
+        self.assertEqual(camera.model, "Canon EOS R6")
+        self.assertEqual(camera.lens_model, "RF24-105mm F4 L IS USM")
+
+    def test_missing_and_empty_values(self):
+        """Missing or blank values are None."""
+        result = SearchedTagsResult()
+        result.add_result(metadata_defined.EXIF_MAKE, MetadataId("EXIF", "IFD0", "Make"), "  ")
+
+        camera = get_camera(result)
+        self.assertIsNone(camera.make)
+        self.assertIsNone(camera.model)
+        self.assertIsNone(camera.lens_model)
+
+
+if __name__ == "__main__":
+    unittest.main()
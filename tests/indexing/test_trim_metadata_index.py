@@ -0,0 +1,38 @@
+import unittest
+
+from indexing.metadata_indexing_service import trim_metadata_index
+
+
+class TestTrimMetadataIndex(unittest.TestCase):
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.index = {
+            "EXIF": {"g1": {"IFD0": {"Make": "NIKON CORPORATION"},
+                            "IFD1": {"ThumbnailImage": "(Binary data 11240 bytes, use -b option to extract)",
+                                     "Compression": "JPEG (old-style)"}}},
+            "MakerNotes": {"g1": {"Nikon": {"ShutterCount": 1234}}},
+            "XMP": {"g1": {"XMP-mwg-rs": {"RegionInfo": {"RegionList": [
+                {"Name": "Anna"},
+                "(Binary data 5 bytes, use -b option to extract)"]}}}},
+        }
+
+    def test_trimmed_groups_removed(self):
+        result = trim_metadata_index(self.index, ["MakerNotes"])
+        self.assertNotIn("MakerNotes", result)
+        self.assertEqual(result["EXIF"]["g1"]["IFD0"], {"Make": "NIKON CORPORATION"})
+
+    def test_binary_placeholders_removed_recursively(self):
+        result = trim_metadata_index(self.index, [])
+        self.assertEqual(result["EXIF"]["g1"]["IFD1"], {"Compression": "JPEG (old-style)"})
+        self.assertEqual(result["XMP"]["g1"]["XMP-mwg-rs"]["RegionInfo"]["RegionList"], [{"Name": "Anna"}])
+        self.assertIn("MakerNotes", result)
+
+    def test_input_not_modified(self):
+        trim_metadata_index(self.index, ["MakerNotes"])
+        self.assertIn("MakerNotes", self.index)
+        self.assertIn("ThumbnailImage", self.index["EXIF"]["g1"]["IFD1"])
+
+
+if __name__ == '__main__':
+    unittest.main()
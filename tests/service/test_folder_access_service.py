@@ -0,0 +1,65 @@
+import heapq
+import unittest
+from datetime import datetime, timedelta
+from unittest import mock
+from uuid import uuid4
+
+from service import folder_access_service
+from service.folder_access_service import scan_priority, HOT, RECENT, COLD
+
+
+class TestScanPriority(unittest.TestCase):
+
+    def setUp(self):
+        self.now = datetime(2026, 10, 19, 12, 0)
+
+    def test_queue_order(self):
+        """Viewed folders first by last access, then recent folders newest first, then the rest in walk order."""
+        viewed_earlier, viewed_later, recent, newest, cold_first, cold_second = (uuid4() for _ in range(6))
+        hot_folders = {viewed_earlier: self.now - timedelta(hours=2), viewed_later: self.now - timedelta(minutes=5)}
+        old_mtime = (self.now - timedelta(days=400)).timestamp()
+        folders = [(cold_first, old_mtime),
+                   (recent, (self.now - timedelta(days=10)).timestamp()),
+                   (viewed_earlier, old_mtime),
+                   (cold_second, old_mtime),
+                   (newest, (self.now - timedelta(hours=1)).timestamp()),
+                   (viewed_later, old_mtime)]
+
+        queue = [(scan_priority(folder_id, mtime, hot_folders, self.now), walk_index, folder_id)
+                 for walk_index, (folder_id, mtime) in enumerate(folders)]
+        heapq.heapify(queue)
+        order = [heapq.heappop(queue)[2] for _ in range(len(folders))]
+
+        self.assertEqual([viewed_later, viewed_earlier, newest, recent, cold_first, cold_second], order)
+
+    def test_tiers(self):
+        """Old access is ignored by the caller's query, an old folder is cold."""
+        folder_id = uuid4()
+        self.assertEqual(HOT, scan_priority(folder_id, 0, {folder_id: self.now}, self.now)[0])
+        self.assertEqual(RECENT, scan_priority(folder_id, self.now.timestamp(), {}, self.now)[0])
+        self.assertEqual(COLD, scan_priority(folder_id, (self.now - timedelta(days=31)).timestamp(), {}, self.now)[0])
+
+
+class TestRecordAccess(unittest.TestCase):
+
+    def setUp(self):
+        folder_access_service._recorded.clear()
+        self.addCleanup(folder_access_service._recorded.clear)
+        for name in ("DBSession", "upsert_access"):
+            patcher = mock.patch.object(folder_access_service, name)
+            setattr(self, name, patcher.start())
+            self.addCleanup(patcher.stop)
+
+    def test_access_throttled_per_folder(self):
+        """Repeated requests of one folder write once per interval, other folders are written."""
+        folder_id = uuid4()
+        folder_access_service.record_access(folder_id)
+        folder_access_service.record_access(folder_id)
+        folder_access_service.record_access(uuid4())
+        self.assertEqual(2, self.upsert_access.call_count)
+        self.assertEqual(2, self.DBSession.return_value.commit.call_count)
+
+        with mock.patch.object(folder_access_service.time, "monotonic",
+                               return_value=folder_access_service._recorded[folder_id] + folder_access_service.RECORD_INTERVAL_S):
+            folder_access_service.record_access(folder_id)
+        self.assertEqual(3, self.upsert_access.call_count)
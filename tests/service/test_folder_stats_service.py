@@ -0,0 +1,83 @@
+import unittest
+import uuid
+from datetime import datetime
+from unittest.mock import MagicMock, patch
+
+from sqlalchemy import Select
+
+from domain.subtree_stats import SubtreeStats
+from service import folder_stats_service
+
+
+class TestSubtreeStatsCombine(unittest.TestCase):
+
+    def test_sums_and_date_range(self):
+        """Counts and sizes are summed, date range spans all parts."""
+        result = SubtreeStats.combine([
+            SubtreeStats(2, 100, datetime(2010, 5, 1), datetime(2011, 1, 1), uuid.uuid4()),
+            SubtreeStats(3, 50, datetime(2009, 1, 1), datetime(2014, 2, 2), uuid.uuid4()),
+            SubtreeStats(),
+        ])
+        self.assertEqual(result.photo_count, 5)
+        self.assertEqual(result.size_bytes, 150)
+        self.assertEqual(result.created_min, datetime(2009, 1, 1))
+        self.assertEqual(result.created_max, datetime(2014, 2, 2))
+
+    def test_cover_is_newest(self):
+        """Cover comes from the part with the newest photo, dated photos win over undated."""
+        undated_cover = uuid.uuid4()
+        old_cover = uuid.uuid4()
+        new_cover = uuid.uuid4()
+        result = SubtreeStats.combine([
+            SubtreeStats(1, 0, None, None, undated_cover),
+            SubtreeStats(1, 0, datetime(2001, 1, 1), datetime(2001, 1, 1), old_cover),
+            SubtreeStats(1, 0, datetime(2020, 1, 1), datetime(2020, 1, 1), new_cover),
+        ])
+        self.assertEqual(result.cover_photo_id, new_cover)
+
+    def test_empty(self):
+        """Folder without photos has zero stats."""
+        result = SubtreeStats.combine([SubtreeStats(), SubtreeStats()])
+        self.assertEqual(result.photo_count, 0)
+        self.assertIsNone(result.created_min)
+        self.assertIsNone(result.cover_photo_id)
+
+
+class TestRebuildFolderStats(unittest.TestCase):
+
+    def test_subtree_stats_bottom_up(self):
+        """Every folder gets its direct stats and stats of the whole subtree, also for deep trees."""
+        root = uuid.uuid4()
+        chain = [uuid.uuid4() for _ in range(5000)] # deeper than recursion limit
+        sibling = uuid.uuid4()
+        folders = [(root, None), (sibling, root)] + [(folder_id, parent_id) for folder_id, parent_id in zip(chain, [root] + chain)]
+        direct = {chain[-1]: SubtreeStats(2, 20, datetime(2015, 1, 1), datetime(2015, 6, 1), uuid.uuid4()),
+                  sibling: SubtreeStats(1, 5, datetime(2009, 1, 1), datetime(2009, 1, 1), uuid.uuid4())}
+
+        inserted = []
+
+        def execute(statement, params=None):
+            # Folder tree is the only select, rows come as executemany params of the insert
+            if isinstance(statement, Select):
+                return folders
+            if params is not None:
+                inserted.extend(params)
+
+        session = MagicMock()
+        session.execute.side_effect = execute
+        with patch.object(folder_stats_service, "_find_direct_stats", return_value=direct):
+            folder_stats_service.rebuild_folder_stats(session)
+
+        rows = {row["folder_id"]: row for row in inserted}
+        self.assertEqual(len(rows), len(folders))
+        self.assertEqual(rows[root]["photo_count"], 3)
+        self.assertEqual(rows[root]["direct_photo_count"], 0)
+        self.assertEqual(rows[root]["size_bytes"], 25)
+        self.assertEqual(rows[root]["created_min"], datetime(2009, 1, 1))
+        self.assertEqual(rows[root]["cover_photo_id"], direct[chain[-1]].cover_photo_id)
+        self.assertEqual(rows[chain[0]]["photo_count"], 2)
+        self.assertEqual(rows[sibling]["photo_count"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
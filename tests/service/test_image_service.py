@@ -0,0 +1,192 @@
+import hashlib
+import io
+import os
+import struct
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from PIL import Image, ImageChops, ImageOps, ImageStat
+from PIL.PngImagePlugin import PngInfo
+
+import pc_configuration
+from service.image_service import compute_file_content_hash, compute_pixel_sha256, generate_thumbnail, \
+    extract_embedded_thumbnail, compute_image_hashes, compute_dhash
+from service.image_too_large_exception import ImageTooLargeException
+
+
+def _exif_with_thumbnail(thumbnail: bytes) -> bytes:
+    """APP1 EXIF payload with empty IFD0 and IFD1 pointing to the JPEG thumbnail (little endian TIFF)."""
+    ifd1_offset = 8 + 6
+    thumbnail_offset = ifd1_offset + 2 + 2 * 12 + 4
+    ifd0 = struct.pack("<HI", 0, ifd1_offset)
+    ifd1 = (struct.pack("<H", 2) + struct.pack("<HHII", 0x0201, 4, 1, thumbnail_offset)
+            + struct.pack("<HHII", 0x0202, 4, 1, len(thumbnail)) + struct.pack("<I", 0))
+    return b"Exif\x00\x00" + b"II*\x00" + struct.pack("<I", 8) + ifd0 + ifd1 + thumbnail
+
+
+def _legacy_pixel_sha256(path: str) -> str:
+    with Image.open(path) as img:
+        return hashlib.sha256(ImageOps.exif_transpose(img).convert("RGB").tobytes()).hexdigest()
+
+
+class TestImageServiceHashing(unittest.TestCase):
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.image_path = os.path.join(self.temp_dir.name, "image.png")
+        Image.new("RGB", (64, 48), color=(200, 10, 30)).save(self.image_path)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_content_hash_matches_whole_file_digest(self):
+        """Chunked content hash equals BLAKE2b of the whole file."""
+        with open(self.image_path, "rb") as f:
+            expected = hashlib.blake2b(f.read(), digest_size=32).hexdigest()
+        self.assertEqual(compute_file_content_hash(self.image_path, block_size=7), expected)
+
+    def test_pixel_hash_stable_across_metadata_change(self):
+        """Re-saving the same pixels with different metadata changes content hash, not pixel hash."""
+        other_path = os.path.join(self.temp_dir.name, "image_meta.png")
+        with Image.open(self.image_path) as img:
+            info = PngInfo()
+            info.add_text("Comment", "edited")
+            img.save(other_path, pnginfo=info)
+
+        self.assertNotEqual(compute_file_content_hash(self.image_path), compute_file_content_hash(other_path))
+        self.assertEqual(compute_pixel_sha256(self.image_path), compute_pixel_sha256(other_path))
+
+    def test_streamed_hash_matches_full_decode_for_all_orientations(self):
+        """Strip-wise hashing gives the same digest as transposing and hashing the whole image."""
+        source = Image.radial_gradient("L").resize((37, 23)).convert("RGB")
+        for orientation in range(1, 9):
+            with self.subTest(orientation=orientation):
+                path = os.path.join(self.temp_dir.name, f"oriented_{orientation}.png")
+                exif = Image.Exif()
+                exif[0x0112] = orientation
+                source.save(path, exif=exif)
+                self.assertEqual(compute_pixel_sha256(path, strip_bytes=200), _legacy_pixel_sha256(path))
+
+    def test_streamed_hash_matches_full_decode_for_modes(self):
+        """Strip-wise conversion to RGB matches whole-image conversion for non-RGB modes."""
+        gradient = Image.linear_gradient("L").resize((31, 17))
+        images = {
+            "L": gradient,
+            "RGBA": Image.merge("RGBA", (gradient, gradient, gradient, gradient)),
+            "P": gradient.convert("RGB").quantize(colors=16),
+            "I;16": gradient.convert("I").point(lambda v: v * 200).convert("I;16"),
+        }
+        for mode, image in images.items():
+            with self.subTest(mode=mode):
+                path = os.path.join(self.temp_dir.name, f"mode_{mode.replace(';', '_')}.png")
+                image.save(path)
+                self.assertEqual(compute_pixel_sha256(path, strip_bytes=100), _legacy_pixel_sha256(path))
+
+    def test_dhash_of_16_bit_image(self):
+        """16-bit and float images hash like their 8-bit version instead of clamping to one value."""
+        gradient = Image.radial_gradient("L").resize((37, 23))
+        images = {
+            "I;16": gradient.convert("I").point(lambda v: v * 256).convert("I;16"),
+            "I": gradient.convert("I").point(lambda v: v * 256),
+            "F": gradient.convert("F").point(lambda v: v / 255),
+        }
+        expected = compute_dhash(gradient)
+        self.assertNotEqual(0, expected)
+        for mode, image in images.items():
+            with self.subTest(mode=mode):
+                self.assertEqual(expected, compute_dhash(image))
+
+    def test_too_large_image_raises(self):
+        """Decompression bomb error is reported as ImageTooLargeException."""
+        with patch.object(pc_configuration, "MAX_IMAGE_PIXELS", ["max_image_pixels", 100]):
+            with self.assertRaises(ImageTooLargeException):
+                compute_pixel_sha256(self.image_path)
+
+
+
+class TestImageServiceThumbnail(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        gradient = Image.radial_gradient("L").resize((1600, 1200))
+        self.image = Image.merge("RGB", (gradient, gradient.rotate(90),
+                                         gradient.transpose(Image.Transpose.FLIP_LEFT_RIGHT)))
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def _full_decode_thumbnail(self, path: str, size: int) -> Image.Image:
+        with Image.open(path) as img:
+            img = img.convert("RGB")
+            img.thumbnail((size, size), Image.Resampling.LANCZOS, reducing_gap=None)
+            return img
+
+    def test_draft_decoded_thumbnail_matches_full_decode(self):
+        """Reduced scale decoding of non-RGB JPEGs gives the size and nearly the pixels of full decoding."""
+        for mode in ("L", "CMYK"):
+            with self.subTest(mode=mode):
+                path = os.path.join(self.temp_dir.name, f"photo_{mode}.jpg")
+                self.image.convert(mode).save(path, quality=95)
+
+                thumbnail_path = generate_thumbnail(path, f"thumb_{mode}", self.temp_dir.name, 200)
+
+                expected = self._full_decode_thumbnail(path, 200)
+                with Image.open(thumbnail_path) as thumbnail:
+                    self.assertEqual(expected.size, thumbnail.size)
+                    stat = ImageStat.Stat(ImageChops.difference(expected, thumbnail.convert("RGB")))
+                    self.assertLess(max(stat.mean), 3)
+
+    def test_raw_thumbnail_from_embedded_preview(self):
+        """RAW file thumbnail is made from the preview extracted by exiftool."""
+        raw_path = os.path.join(self.temp_dir.name, "photo.nef")
+        with open(raw_path, "wb") as raw_file:
+            raw_file.write(b"not decodable by Pillow")
+        preview = io.BytesIO()
+        self.image.save(preview, "JPEG")
+
+        with patch("exiftool.exif_service.extract_preview", return_value=preview.getvalue()) as extract_preview:
+            thumbnail_path = generate_thumbnail(raw_path, "thumb_raw", self.temp_dir.name, 200)
+
+        extract_preview.assert_called_once_with(raw_path)
+        with Image.open(thumbnail_path) as thumbnail:
+            self.assertEqual((200, 150), thumbnail.size)
+
+
+    def test_raw_hashes_without_decoding(self):
+        """RAW pixel hash is exiftool's image data hash, dHash comes from the preview fetched once."""
+        raw_path = os.path.join(self.temp_dir.name, "hashed.cr2")
+        with open(raw_path, "wb") as raw_file:
+            raw_file.write(b"not decodable by Pillow")
+        preview = io.BytesIO()
+        self.image.save(preview, "JPEG")
+
+        with patch("exiftool.exif_service.get_image_data_hash", return_value="ab" * 32), \
+                patch("exiftool.exif_service.extract_preview", return_value=preview.getvalue()) as extract_preview:
+            hashes = compute_image_hashes(raw_path)
+            generate_thumbnail(raw_path, "thumb_hashed", self.temp_dir.name, 200)
+
+        self.assertEqual("ab" * 32, hashes.pixel_hash)
+        with Image.open(io.BytesIO(preview.getvalue())) as img:
+            self.assertEqual(compute_dhash(img), hashes.perceptual_hash % (1 << 64))
+        extract_preview.assert_called_once_with(raw_path)
+
+    def test_embedded_thumbnail_saved_as_is(self):
+        """EXIF thumbnail bytes are written unchanged, photos without one return None."""
+        embedded = io.BytesIO()
+        Image.new("RGB", (160, 120), (10, 200, 30)).save(embedded, "JPEG")
+        path = os.path.join(self.temp_dir.name, "camera.jpg")
+        self.image.save(path, exif=_exif_with_thumbnail(embedded.getvalue()))
+        plain_path = os.path.join(self.temp_dir.name, "plain.jpg")
+        self.image.save(plain_path)
+
+        thumbnail_path = extract_embedded_thumbnail(path, "embedded", self.temp_dir.name)
+
+        with open(thumbnail_path, "rb") as thumbnail_file:
+            self.assertEqual(embedded.getvalue(), thumbnail_file.read())
+        self.assertIsNone(extract_embedded_thumbnail(plain_path, "none", self.temp_dir.name))
+
+
+if __name__ == '__main__':
+    unittest.main()
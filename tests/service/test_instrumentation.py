@@ -0,0 +1,54 @@
+import unittest
+
+from service import instrumentation
+from service.instrumentation import Histogram
+
+
+class TestInstrumentation(unittest.TestCase):
+
+    def tearDown(self):
+        instrumentation.stop_recording()
+
+    def test_disabled_is_noop(self):
+        """Without recording the timer is a shared no-op context and counters are ignored."""
+        self.assertIs(instrumentation.timed("a"), instrumentation.timed("b"))
+        with instrumentation.timed("a"):
+            instrumentation.count("c")
+        self.assertIsNone(instrumentation.stop_recording())
+
+    def test_recording(self):
+        """Timers and counters end up in the recorder, also when the timed block raises."""
+        recorder = instrumentation.start_recording()
+        with instrumentation.timed("stage"):
+            pass
+        with self.assertRaises(ValueError):
+            with instrumentation.timed("stage"):
+                raise ValueError()
+        instrumentation.count("photos", 3)
+        instrumentation.count("photos")
+        self.assertIs(recorder, instrumentation.stop_recording())
+
+        metrics = recorder.to_dict()
+        self.assertEqual(2, metrics["timers"]["stage"]["count"])
+        self.assertEqual({"photos": 4}, metrics["counters"])
+
+    def test_histogram_buckets(self):
+        """Values fall into the first bucket with upper bound >= value, larger ones into inf."""
+        histogram = Histogram()
+        for value in (0.5, 1, 1.5, 7, 20000):
+            histogram.observe(value)
+        result = histogram.to_dict()
+        self.assertEqual({"1": 2, "2": 1, "10": 1, "inf": 1}, result["buckets"])
+        self.assertEqual(0.5, result["min_ms"])
+        self.assertEqual(20000, result["max_ms"])
+        self.assertEqual(5, result["count"])
+
+    def test_summary_sorted_by_total(self):
+        recorder = instrumentation.start_recording()
+        recorder.observe("fast", 1)
+        recorder.observe("slow", 3000)
+        self.assertTrue(recorder.summary().startswith("slow 3.0 s / 1x"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,28 @@
+import json
+import unittest
+from datetime import datetime
+
+from service import json_service
+
+
+class TestJsonService(unittest.TestCase):
+
+    def test_round_trip_matches_stdlib(self):
+        data = {"EXIF": {"g1": {"IFD0": {"Make": "NIKON", "FNumber": 2.8, "ISO": 200, "Keywords": ["a", "ž"]}}}}
+        self.assertEqual(json_service.loads(json_service.dumps(data)), data)
+        self.assertEqual(json.loads(json_service.dumps(data)), data)
+
+    def test_integer_over_64_bits_falls_back(self):
+        """Documents orjson refuses are still handled."""
+        big = 1 << 70
+        self.assertEqual(json_service.loads(f'{{"SerialNumber": {big}}}'), {"SerialNumber": big})
+        self.assertEqual(json.loads(json_service.dumps({"SerialNumber": big})), {"SerialNumber": big})
+
+    def test_datetime_uses_default(self):
+        """Datetimes go through default like in stdlib, not the backend's own format."""
+        dumped = json_service.dumps({"created": datetime(2020, 8, 9, 19, 31, 6)}, default=lambda o: "custom")
+        self.assertEqual(json.loads(dumped), {"created": "custom"})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,115 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+from service import metrics_service
+
+
+class TestMetricsService(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        patcher = mock.patch.object(metrics_service, "get_metrics_path", return_value=self.temp_dir.name)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.temp_dir.cleanup)
+        values = mock.patch.object(metrics_service, "_values", metrics_service._ProcessValues())
+        values.start()
+        self.addCleanup(values.stop)
+
+    def _write_process_file(self, pid: int, counters=(), gauges=(), histograms=(), token=None):
+        with open(os.path.join(self.temp_dir.name, f"{pid}.json"), "w") as metrics_file:
+            json.dump({"pid": pid, "token": token, "counters": list(counters), "gauges": list(gauges),
+                       "histograms": list(histograms)}, metrics_file)
+
+    def _files(self) -> set:
+        return {name for name in os.listdir(self.temp_dir.name) if name.endswith(".json")}
+
+    def _dead_pid(self) -> int:
+        process = subprocess.Popen([sys.executable, "-c", "pass"])
+        process.wait()
+        return process.pid
+
+    def test_counters_summed_over_processes(self):
+        """Counters of other processes, including finished ones, are added to values of this process."""
+        metrics_service.inc(metrics_service.THUMBNAIL_REQUESTS, ("hit",), 2)
+        self._write_process_file(self._dead_pid(), counters=[["pc_thumbnail_requests_total", ["hit"], 3],
+                                                             ["pc_thumbnail_requests_total", ["miss"], 1]])
+
+        output = metrics_service.collect()
+
+        self.assertIn("# TYPE pc_thumbnail_requests_total counter", output)
+        self.assertIn('pc_thumbnail_requests_total{result="hit"} 5', output)
+        self.assertIn('pc_thumbnail_requests_total{result="miss"} 1', output)
+
+    def test_gauges_of_dead_processes_skipped(self):
+        """Queue depth of a process which exited is not reported."""
+        metrics_service.add_gauge(metrics_service.TASK_QUEUE_DEPTH, 1)
+        self._write_process_file(self._dead_pid(), gauges=[["pc_task_queue_depth", [], 4]])
+
+        self.assertIn("pc_task_queue_depth 1\n", metrics_service.collect())
+
+    def test_histogram_buckets_cumulative(self):
+        """Histogram is written as cumulative le buckets with sum and count."""
+        metrics_service.observe(metrics_service.HTTP_REQUEST_DURATION, 0.003, ("api.folder",))
+        metrics_service.observe(metrics_service.HTTP_REQUEST_DURATION, 0.2, ("api.folder",))
+        metrics_service.observe(metrics_service.HTTP_REQUEST_DURATION, 60, ("api.folder",))
+
+        output = metrics_service.collect()
+
+        self.assertIn('pc_http_request_duration_seconds_bucket{blueprint="api.folder",le="0.005"} 1', output)
+        self.assertIn('pc_http_request_duration_seconds_bucket{blueprint="api.folder",le="0.25"} 2', output)
+        self.assertIn('pc_http_request_duration_seconds_bucket{blueprint="api.folder",le="+Inf"} 3', output)
+        self.assertIn('pc_http_request_duration_seconds_count{blueprint="api.folder"} 3', output)
+        self.assertIn('pc_http_request_duration_seconds_sum{blueprint="api.folder"} 60.203', output)
+
+    def test_label_values_escaped(self):
+        """Quotes and backslashes in label values are escaped."""
+        metrics_service.inc(metrics_service.HTTP_REQUESTS, ('a"b\\c', "GET", "200"))
+
+        self.assertIn('pc_http_requests_total{blueprint="a\\"b\\\\c",method="GET",status="200"} 1',
+                      metrics_service.collect())
+
+    def test_dead_processes_merged(self):
+        """Exited processes end up in one file, their counters and histograms are counted once."""
+        dead_pids = [self._dead_pid(), self._dead_pid()]
+        for pid in dead_pids:
+            self._write_process_file(pid, counters=[["pc_task_runs_total", ["SCAN", "ok"], 1]],
+                                     gauges=[["pc_task_queue_depth", [], 1]],
+                                     histograms=[["pc_task_duration_seconds", ["SCAN"], [1] + [0] * 11 + [0.004, 1]]])
+
+        for _ in range(2):
+            output = metrics_service.collect()
+            self.assertIn('pc_task_runs_total{type="SCAN",result="ok"} 2', output)
+            self.assertIn('pc_task_duration_seconds_count{type="SCAN"} 2', output)
+            self.assertIn("pc_task_queue_depth 0\n", output)
+        self.assertEqual({metrics_service.AGGREGATE_FILE_NAME, f"{os.getpid()}.json"}, self._files())
+
+    def test_reused_pid_not_overwritten(self):
+        """File of an exited process with the PID of this one is merged before the first flush replaces it."""
+        self._write_process_file(os.getpid(), counters=[["pc_thumbnail_requests_total", ["hit"], 3]], token="exited")
+        metrics_service.inc(metrics_service.THUMBNAIL_REQUESTS, ("hit",), 2)
+
+        self.assertIn('pc_thumbnail_requests_total{result="hit"} 5', metrics_service.collect())
+        self.assertIn('pc_thumbnail_requests_total{result="hit"} 5', metrics_service.collect())
+
+    def test_clear_previous_run(self):
+        """Files of the previous run are removed, but not while another process writes to the folder."""
+        self._write_process_file(os.getppid(), counters=[["pc_thumbnail_requests_total", ["hit"], 1]])
+        metrics_service.clear_previous_run()
+        self.assertEqual({f"{os.getppid()}.json"}, self._files())
+
+        os.remove(os.path.join(self.temp_dir.name, f"{os.getppid()}.json"))
+        self._write_process_file(self._dead_pid(), counters=[["pc_thumbnail_requests_total", ["hit"], 1]])
+        metrics_service.collect()
+        self._write_process_file(self._dead_pid())
+        metrics_service.clear_previous_run()
+        self.assertEqual(set(), self._files())
+
+
+if __name__ == '__main__':
+    unittest.main()
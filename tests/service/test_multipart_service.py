@@ -0,0 +1,56 @@
+import email
+import email.policy
+import os
+import tempfile
+import unittest
+
+from service import multipart_service
+
+
+class TestMultipartService(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.first = self._write("first.jpg", b"\xff\xd8first\r\n--not-a-boundary")
+        self.second = self._write("second.jpg", b"\xff\xd8" + os.urandom(3 * multipart_service.CHUNK_SIZE))
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def _write(self, name: str, data: bytes) -> str:
+        path = os.path.join(self.temp_dir.name, name)
+        with open(path, "wb") as file:
+            file.write(data)
+        return path
+
+    def _parse(self, parts, boundary: str):
+        body = b"".join(multipart_service.iterate_multipart(parts, boundary))
+        header = f"Content-Type: multipart/mixed; boundary={boundary}\r\n\r\n".encode("ascii")
+        return email.message_from_bytes(header + body, policy=email.policy.HTTP)
+
+    def test_parts_round_trip(self):
+        """Standard MIME parser reads every part with its headers and exact bytes."""
+        message = self._parse([({"Content-Type": "image/jpeg", "Content-ID": "<a>"}, self.first),
+                               ({"Content-Type": "image/jpeg", "Content-ID": "<b>"}, self.second)], "b0undary")
+        parts = list(message.iter_parts())
+        self.assertEqual(["<a>", "<b>"], [p["Content-ID"] for p in parts])
+        for part, path in zip(parts, [self.first, self.second]):
+            with open(path, "rb") as file:
+                expected = file.read()
+            self.assertEqual(expected, part.get_payload(decode=True))
+            self.assertEqual(str(len(expected)), part["Content-Length"])
+
+    def test_missing_file_skipped(self):
+        """Missing thumbnails don't break the bundle."""
+        missing = os.path.join(self.temp_dir.name, "missing.jpg")
+        message = self._parse([({"Content-ID": "<missing>"}, missing), ({"Content-ID": "<a>"}, self.first)], "b0undary")
+        self.assertEqual(["<a>"], [p["Content-ID"] for p in message.iter_parts()])
+
+    def test_empty_bundle(self):
+        """Only the closing delimiter is sent without parts."""
+        body = b"".join(multipart_service.iterate_multipart([], "b0undary"))
+        self.assertEqual(b"--b0undary--\r\n", body)
+
+
+if __name__ == '__main__':
+    unittest.main()
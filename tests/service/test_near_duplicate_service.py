@@ -0,0 +1,58 @@
+import random
+import unittest
+
+from PIL import Image
+
+from service.bk_tree import BKTree
+from service.image_service import compute_dhash, hamming_distance
+from service.near_duplicate_service import cluster_by_distance
+
+
+class TestBKTree(unittest.TestCase):
+
+    def test_search_matches_brute_force(self):
+        """Tree search returns exactly the hashes a linear scan finds."""
+        rnd = random.Random(42)
+        hashes = [rnd.getrandbits(64) for _ in range(2000)]
+        # Near copies of some hashes
+        hashes += [h ^ (1 << rnd.randrange(64)) for h in hashes[:200]]
+        tree = BKTree()
+        for index, h in enumerate(hashes):
+            tree.add(h, index)
+
+        for query in hashes[:50]:
+            expected = sorted(i for i, h in enumerate(hashes) if hamming_distance(query, h) <= 4)
+            found = sorted(value for _, value in tree.search(query, 4))
+            self.assertEqual(found, expected)
+
+    def test_identical_hashes_share_node(self):
+        tree = BKTree()
+        tree.add(7, "a")
+        tree.add(7, "b")
+        self.assertEqual(sorted(v for _, v in tree.search(7, 0)), ["a", "b"])
+        self.assertEqual(tree.size, 2)
+
+
+class TestClusterByDistance(unittest.TestCase):
+
+    def test_single_linkage_clusters(self):
+        """Chained near hashes end in one cluster, distant hashes stay alone."""
+        hashes = {"a": 0b0000, "b": 0b0001, "c": 0b0011, "far": (1 << 64) - 1}
+        clusters = cluster_by_distance(hashes, 1)
+        self.assertEqual(len(clusters), 1)
+        self.assertEqual(sorted(clusters[0]), ["a", "b", "c"])
+
+
+class TestDHash(unittest.TestCase):
+
+    def test_resized_copy_is_near(self):
+        """Downscaled copy of an image keeps nearly the same dHash, a different image does not."""
+        original = Image.radial_gradient("L").resize((640, 480)).convert("RGB")
+        resized = original.resize((160, 120))
+        other = Image.linear_gradient("L").rotate(90).resize((640, 480)).convert("RGB")
+        self.assertLessEqual(hamming_distance(compute_dhash(original), compute_dhash(resized)), 4)
+        self.assertGreater(hamming_distance(compute_dhash(original), compute_dhash(other)), 10)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+import os
+import pstats
+import tempfile
+import unittest
+from unittest import mock
+from uuid import uuid4
+
+from service import profiling_service
+from vial.config import app_config
+
+
+def _profiled_work():
+    return sum(i * i for i in range(10000))
+
+
+class TestProfilingService(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        patcher = mock.patch.object(profiling_service, "get_profiles_path", return_value=self.temp_dir.name)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.temp_dir.cleanup)
+
+    def test_profile_saved_under_id(self):
+        """Profiled block is saved as pstats file named by the profile id."""
+        profile_id = uuid4()
+        with profiling_service.profiled(profile_id):
+            _profiled_work()
+
+        file_path = profiling_service.get_profile_path(profile_id)
+        self.assertEqual(os.path.join(self.temp_dir.name, f"{profile_id}.prof"), file_path)
+        functions = {function for _, _, function in pstats.Stats(file_path).stats}
+        self.assertIn("_profiled_work", functions)
+
+    def test_profile_saved_when_block_raises(self):
+        """Failed task run still leaves its profile."""
+        profile_id = uuid4()
+        with self.assertRaises(ValueError):
+            with profiling_service.profiled(profile_id):
+                raise ValueError("failed")
+
+        self.assertTrue(os.path.isfile(profiling_service.get_profile_path(profile_id)))
+
+    def test_summary(self):
+        """Summary lists profiled functions as text."""
+        profile_id = uuid4()
+        with profiling_service.profiled(profile_id):
+            _profiled_work()
+
+        summary = profiling_service.get_summary(profiling_service.get_profile_path(profile_id))
+        self.assertIn("cumulative", summary)
+        self.assertIn("_profiled_work", summary)
+
+
+class TestProfilesPath(unittest.TestCase):
+
+    def test_default_under_generated_path(self):
+        """Without profiling.path in config.json profiles go to <generated_path>/profiles."""
+        with mock.patch.object(app_config, "config_dict", {"generated_path": "/generated"}):
+            self.assertEqual(os.path.join("/generated", "profiles"), profiling_service.get_profiles_path())
+
+    def test_configured_path(self):
+        """profiling.path overrides the default."""
+        with mock.patch.object(app_config, "config_dict", {"generated_path": "/generated",
+                                                           "profiling": {"path": "/profiles"}}):
+            self.assertEqual("/profiles", profiling_service.get_profiles_path())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,116 @@
+import json
+import unittest
+from datetime import datetime
+
+from sqlalchemy.dialects import postgresql
+
+from domain.metadata import metadata_defined
+from domain.metadata.metadata_id import MetadataId
+from domain.metadata_index_type import MetadataIndexType
+from domain.search.search_criteria import SearchCriteria
+from domain.search.search_facet import SearchFacet
+from domain.search.search_operator import SearchOperator
+from domain.search.search_predicate import SearchPredicate
+from indexing.dbe.metadata_index import MetadataIndex
+from service import search_service
+
+
+def _compile(clause) -> str:
+    return str(clause.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+
+
+class TestSearchService(unittest.TestCase):
+
+    def test_jsonpath_with_g1(self):
+        """Exact g1 points directly to the tag."""
+        metadata_id = MetadataId("EXIF", "IFD0", "Make")
+        self.assertEqual(search_service.to_jsonpath(metadata_id), '$."EXIF"."g1"."IFD0"."Make"')
+
+    def test_jsonpath_without_g1(self):
+        """Missing g1 points to g0 tags, or to all g1 groups."""
+        self.assertEqual(search_service.to_jsonpath(metadata_defined.EXIF_MAKE), '$."EXIF"."tags"."Make"')
+        self.assertEqual(search_service.to_jsonpath(metadata_defined.EXIF_MAKE, any_g1=True), '$."EXIF"."g1".*."Make"')
+
+    def test_jsonpath_with_path(self):
+        """Nested structure path is split to keys."""
+        metadata_id = MetadataId("XMP", "XMP-crs", "Name", path="Look.Parameters")
+        self.assertEqual(search_service.to_jsonpath(metadata_id), '$."XMP"."g1"."XMP-crs"."Look"."Parameters"."Name"')
+
+    def test_jsonpath_quotes_keys(self):
+        """Keys can't break out of the jsonpath string."""
+        metadata_id = MetadataId("EXIF", 'IFD0" || true', "Make")
+        self.assertEqual(search_service.to_jsonpath(metadata_id), '$."EXIF"."g1"."IFD0\\" || true"."Make"')
+
+    def test_eq_uses_path_match(self):
+        """EQ with g1 is a single indexable @@ predicate."""
+        predicate = SearchPredicate(MetadataId("EXIF", "IFD0", "Model"), SearchOperator.EQ, "EOS R6")
+        sql = _compile(search_service.predicate_clause(MetadataIndex.exif_json, predicate))
+        self.assertEqual(sql, 'photo_metadata.exif_json @@ CAST(\'$."EXIF"."g1"."IFD0"."Model" == "EOS R6"\' AS JSONPATH)')
+
+    def test_eq_without_g1_searches_all_groups(self):
+        """EQ without g1 matches g0 tags or any g1 group."""
+        predicate = SearchPredicate(metadata_defined.EXIF_MODEL, SearchOperator.EQ, "EOS R6")
+        sql = _compile(search_service.predicate_clause(MetadataIndex.exif_json, predicate))
+        self.assertIn('$."EXIF"."tags"."Model" == "EOS R6"', sql)
+        self.assertIn('$."EXIF"."g1".*."Model" == "EOS R6"', sql)
+        self.assertIn(" OR ", sql)
+
+    def test_range(self):
+        """RANGE bounds are inclusive and either can be missing."""
+        metadata_id = MetadataId("EXIF", "ExifIFD", "ISO")
+        sql = _compile(search_service.predicate_clause(MetadataIndex.exif_json, SearchPredicate(metadata_id, SearchOperator.RANGE, value_from=100, value_to=800)))
+        self.assertIn('$."EXIF"."g1"."ExifIFD"."ISO" ? (@ >= 100 && @ <= 800)', sql)
+        sql = _compile(search_service.predicate_clause(MetadataIndex.exif_json, SearchPredicate(metadata_id, SearchOperator.RANGE, value_to=800)))
+        self.assertIn('$."EXIF"."g1"."ExifIFD"."ISO" ? (@ <= 800)', sql)
+
+    def test_exists(self):
+        """EXISTS checks the path."""
+        predicate = SearchPredicate(MetadataId("EXIF", "ExifIFD", "LensModel"), SearchOperator.EXISTS)
+        sql = _compile(search_service.predicate_clause(MetadataIndex.exif_json, predicate))
+        self.assertEqual(sql, 'photo_metadata.exif_json @? CAST(\'$."EXIF"."g1"."ExifIFD"."LensModel"\' AS JSONPATH)')
+
+    def test_unsupported_value(self):
+        """Only JSON scalars can be compared."""
+        predicate = SearchPredicate(MetadataId("EXIF", "IFD0", "Model"), SearchOperator.EQ, {"a": 1})
+        with self.assertRaises(ValueError):
+            search_service.predicate_clause(MetadataIndex.exif_json, predicate)
+
+    def test_effective_falls_back_to_exif(self):
+        """EFFECTIVE search uses exif_json for photos without effective index."""
+        criteria = SearchCriteria()
+        criteria.index_type = MetadataIndexType.EFFECTIVE
+        criteria.predicates.append(SearchPredicate(MetadataId("EXIF", "IFD0", "Model"), SearchOperator.EXISTS))
+        sql = _compile(search_service.build_filters(criteria)[0])
+        self.assertIn("photo_metadata.effective_json IS NOT NULL AND (photo_metadata.effective_json @?", sql)
+        self.assertIn("photo_metadata.effective_json IS NULL AND (photo_metadata.exif_json @?", sql)
+
+    def test_promoted_column_filters(self):
+        """Facet values filter promoted columns."""
+        criteria = SearchCriteria()
+        criteria.facet_values[SearchFacet.CAMERA_MODEL] = "EOS R6"
+        filters = search_service.build_filters(criteria)
+        self.assertEqual(len(filters), 1)
+        self.assertEqual(_compile(filters[0]), "photo_metadata.camera_model = 'EOS R6'")
+
+    def test_criteria_round_trip(self):
+        """Saved gallery criteria survive JSON serialization."""
+        criteria = SearchCriteria()
+        criteria.index_type = MetadataIndexType.EFFECTIVE
+        criteria.facet_values[SearchFacet.LENS_MODEL] = "RF50mm F1.8 STM"
+        criteria.created_from = datetime(2020, 1, 1)
+        criteria.predicates.append(SearchPredicate(MetadataId("EXIF", "ExifIFD", "ISO"), SearchOperator.RANGE, value_to=800))
+        criteria.predicates.append(SearchPredicate(metadata_defined.EXIF_MAKE, SearchOperator.EQ, "Canon"))
+
+        criteria_dict = json.loads(json.dumps(criteria.to_dict()))
+        restored = SearchCriteria.from_dict(criteria_dict)
+        self.assertEqual(restored.to_dict(), criteria.to_dict())
+        self.assertEqual(restored.created_from, datetime(2020, 1, 1))
+        self.assertIsNone(restored.predicates[1].metadata_id.group_1)
+        self.assertEqual(
+            [_compile(f) for f in search_service.build_filters(restored)],
+            [_compile(f) for f in search_service.build_filters(criteria)]
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+import unittest
+from unittest import mock
+
+from domain.task.throttle_policy import ThrottlePolicy
+from service import task_throttle
+from service.task_throttle import TaskThrottle
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 100.0
+        self.slept = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds: float):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+class TestTaskThrottle(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+
+    def _throttle(self, policy: ThrottlePolicy) -> TaskThrottle:
+        return TaskThrottle(policy, clock=self.clock, sleep=self.clock.sleep)
+
+    def test_files_per_second(self):
+        """Instant reads are spread to the configured rate."""
+        throttle = self._throttle(ThrottlePolicy(max_files_per_s=10))
+        for _ in range(30):
+            throttle.pace(1000)
+        self.assertAlmostEqual(3.0, self.clock.now - 100.0)
+
+    def test_megabytes_per_second(self):
+        """Larger of file and byte limits wins."""
+        throttle = self._throttle(ThrottlePolicy(max_files_per_s=1000, max_mb_per_s=2))
+        for _ in range(5):
+            throttle.pace(1024 * 1024)
+        self.assertAlmostEqual(2.5, self.clock.now - 100.0)
+
+    def test_slow_task_not_delayed(self):
+        """Task slower than the limit never sleeps."""
+        throttle = self._throttle(ThrottlePolicy(max_files_per_s=10))
+        for _ in range(10):
+            self.clock.now += 0.5
+            throttle.pace(1000)
+        self.assertEqual([], [s for s in self.clock.slept if s > 0])
+
+    def test_backoff_follows_web_latency(self):
+        """Backoff doubles up to the maximum while requests are slow, then decays to zero."""
+        throttle = self._throttle(ThrottlePolicy(latency_threshold_ms=500, max_backoff_s=0.2))
+        totals = [(0.0, 0)]
+
+        def histogram_totals(metric):
+            return totals[0]
+
+        def check(mean_s: float):
+            latency_sum, count = totals[0]
+            totals[0] = (latency_sum + mean_s * 10, count + 10)
+            self.clock.now += task_throttle.LATENCY_CHECK_INTERVAL_S
+            throttle.pace(0)
+            return throttle.backoff_s
+
+        with mock.patch.object(task_throttle.metrics_service, "histogram_totals", side_effect=histogram_totals):
+            throttle.pace(0) # first check only reads the baseline
+            self.clock.now += task_throttle.LATENCY_CHECK_INTERVAL_S
+            throttle.pace(0)
+            self.assertEqual([0.05, 0.1, 0.2, 0.2], [check(1.0) for _ in range(4)])
+            self.assertEqual([0.1, 0.05, 0.0], [check(0.01) for _ in range(3)])
+
+    def test_policy_ignores_unknown_keys(self):
+        """Settings with keys of other versions still load."""
+        policy = ThrottlePolicy.from_dict({"max_files_per_s": 5, "unknown": 1})
+        self.assertEqual(5, policy.max_files_per_s)
+        self.assertFalse(hasattr(policy, "unknown"))
@@ -0,0 +1,29 @@
+import sqlite3
+import unittest
+
+from sqlalchemy import exc
+
+from database import MeteredQueuePool, pool_metrics
+
+
+class TestMeteredQueuePool(unittest.TestCase):
+
+    def test_checkouts_and_timeouts_counted(self):
+        """Successful checkouts and checkouts that timed out waiting are both recorded."""
+        pool = MeteredQueuePool(lambda: sqlite3.connect(":memory:"), pool_size=1, max_overflow=0, timeout=0.05)
+        checkouts, timeouts = pool_metrics.checkouts, pool_metrics.timeouts
+
+        connection = pool.connect()
+        with self.assertRaises(exc.TimeoutError):
+            pool.connect()
+        connection.close()
+        pool.connect().close()
+
+        self.assertEqual(checkouts + 2, pool_metrics.checkouts)
+        self.assertEqual(timeouts + 1, pool_metrics.timeouts)
+        self.assertGreaterEqual(pool_metrics.max_wait_seconds, 0.05)
+        pool.dispose()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -5,11 +5,15 @@ from typing import Any, Optional
 from root import ROOT_DIR
 from vial.config.invalid_app_configuration_exception import InvalidAppConfigurationException
 
+# Alternative config file, e.g. for benchmarks against a throwaway database
+CONFIG_PATH_ENV = "VIAL_CONFIG_PATH"
+
 
 class AppConfig:
 
     def __init__(self):
-        with open(os.path.join(ROOT_DIR, "config.json")) as config_file:
+        config_path = os.environ.get(CONFIG_PATH_ENV, os.path.join(ROOT_DIR, "config.json"))
+        with open(config_path) as config_file:
             self.config_dict = json.load(config_file)
 
     def get(self, config_data: []) -> Any: